@@ -1,38 +1,139 @@
 import os
+import logging
+from typing import Any, Awaitable, Callable, Dict, List
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING
 from pymongo.server_api import ServerApi
+from utils.mongo_monitoring import PoolMetricsListener, CommandMetricsListener
+from utils.query_profiler import QueryProfilerListener
+
+logger = logging.getLogger(__name__)
+
+# Options du client MongoDB configurables via variables d'environnement
+# (non définies = valeurs par défaut du driver)
+MONGO_INT_OPTIONS = {
+    "maxPoolSize": "MONGODB_MAX_POOL_SIZE",
+    "minPoolSize": "MONGODB_MIN_POOL_SIZE",
+    "maxIdleTimeMS": "MONGODB_MAX_IDLE_TIME_MS",
+    "serverSelectionTimeoutMS": "MONGODB_SERVER_SELECTION_TIMEOUT_MS",
+    "connectTimeoutMS": "MONGODB_CONNECT_TIMEOUT_MS",
+    "waitQueueTimeoutMS": "MONGODB_WAIT_QUEUE_TIMEOUT_MS",
+}
 
 class Database:
     client: AsyncIOMotorClient = None
     database = None
+    pool_listener: PoolMetricsListener = None
+    connected: bool = False
 
 db = Database()
 
+# Initialisations à exécuter dès que MongoDB est joignable (au démarrage ou à la reprise)
+_connect_hooks: List[Callable[[Any], Awaitable[None]]] = []
+
 async def get_database():
     return db.database
 
+def get_client_options() -> Dict[str, Any]:
+    """Construit les options du client Motor à partir de l'environnement"""
+    options: Dict[str, Any] = {}
+
+    for option, env_var in MONGO_INT_OPTIONS.items():
+        value = os.getenv(env_var)
+        if value:
+            options[option] = int(value)
+
+    # Compression réseau, ex: "zstd,zlib" (zstandard est dans requirements.txt ; le driver
+    # ignore avec un avertissement les codecs non installés, comme snappy sans python-snappy)
+    compressors = os.getenv("MONGODB_COMPRESSORS")
+    if compressors:
+        options["compressors"] = compressors
+        zlib_level = os.getenv("MONGODB_ZLIB_LEVEL")
+        if zlib_level:
+            options["zlibCompressionLevel"] = int(zlib_level)
+
+    # Préférence de lecture, ex: "primaryPreferred", "secondaryPreferred"
+    read_preference = os.getenv("MONGODB_READ_PREFERENCE")
+    if read_preference:
+        options["readPreference"] = read_preference
+
+    return options
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Retourne les métriques du pool de connexions (vide si non connecté)"""
+    if db.pool_listener is None:
+        return {}
+    return db.pool_listener.snapshot()
+
+def supports_transactions(client) -> bool:
+    """Les transactions exigent un replica set ou un cluster shardé (pas un mongod autonome)"""
+    if not isinstance(client, AsyncIOMotorClient):
+        return False
+    return client.topology_description.topology_type_name in ("ReplicaSetWithPrimary", "Sharded")
+
+async def ensure_indexes(database):
+    """Crée les index utilisés par les services (idempotent)"""
+    await database.binders.create_index([("user_id", ASCENDING)])
+    await database.binder_pages.create_index(
+        [("binder_id", ASCENDING), ("page_number", ASCENDING)], unique=True
+    )
+    await database.card_locations.create_index([("user_card_id", ASCENDING), ("user_id", ASCENDING)])
+    await database.card_locations.create_index([("binder_id", ASCENDING), ("page_number", ASCENDING)])
+
+def on_connect(hook: Callable[[Any], Awaitable[None]]):
+    """Enregistre une initialisation post-connexion (reçoit la base ; doit être idempotente)"""
+    if hook not in _connect_hooks:
+        _connect_hooks.append(hook)
+
+async def mark_connected():
+    """Passe à l'état connecté après l'initialisation post-connexion (index, hooks)
+
+    Appelé par connect_to_mongo et par la readiness quand MongoDB redevient joignable
+    après un échec au démarrage : l'instance n'est prête qu'une fois initialisée.
+    """
+    if db.connected:
+        return
+    try:
+        await ensure_indexes(db.database)
+    except Exception as e:
+        logger.warning("Impossible de créer les index MongoDB: %s", e)
+    for hook in _connect_hooks:
+        try:
+            await hook(db.database)
+        except Exception as e:
+            logger.warning("Initialisation post-connexion %s échouée: %s", getattr(hook, "__qualname__", hook), e)
+    db.connected = True
+
 async def connect_to_mongo():
     """Créer une connexion à MongoDB"""
     mongodb_url = os.getenv("MONGODB_URL", "mongodb://localhost:27017/pokemon_binder")
-    
+
+    db.pool_listener = PoolMetricsListener()
     db.client = AsyncIOMotorClient(
         mongodb_url,
-        server_api=ServerApi('1')
+        server_api=ServerApi('1'),
+        event_listeners=[db.pool_listener, CommandMetricsListener(), QueryProfilerListener()],
+        **get_client_options()
     )
-    
+
     # Extraire le nom de la base de données de l'URL
-    db_name = mongodb_url.split("/")[-1] or "pokemon_binder"
+    db_name = mongodb_url.split("/")[-1].split("?")[0] or "pokemon_binder"
     db.database = db.client[db_name]
-    
+
     # Test de connexion
+    db.connected = False
     try:
         await db.client.admin.command('ping')
-        print("✅ Connexion à MongoDB réussie!")
+        logger.info("Connexion à MongoDB réussie")
     except Exception as e:
-        print(f"❌ Erreur de connexion à MongoDB: {e}")
+        logger.error("Erreur de connexion à MongoDB: %s", e)
+        return
+
+    await mark_connected()
 
 async def close_mongo_connection():
     """Fermer la connexion à MongoDB"""
     if db.client:
         db.client.close()
-        print("🔌 Connexion MongoDB fermée")
+        db.connected = False
+        logger.info("Connexion MongoDB fermée")
@@ -6,6 +6,7 @@ from utils.auth import verify_token
 from services.user_service import UserService
 from services.user_card_service import UserCardService
 from database import get_database
+from utils.cache import SharedCache, cache
 
 security = HTTPBearer()
 
@@ -19,6 +20,10 @@ async def get_user_card_service() -> UserCardService:
     database = await get_database()
     return UserCardService(database)
 
+async def get_cache() -> SharedCache:
+    """Obtenir le cache partagé (LRU en mémoire, Redis si configuré)"""
+    return cache
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     user_service: UserService = Depends(get_user_service)
@@ -0,0 +1,56 @@
+"""
+Configuration Gunicorn pour la production (workers Uvicorn multi-processus)
+
+Usage : gunicorn main:app -c gunicorn.conf.py
+Le développement local continue d'utiliser `uvicorn main:app --reload`.
+"""
+import multiprocessing
+import os
+import shutil
+
+# Écoute sur le port fourni par Render (PORT) ou 8000 par défaut
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Nombre de workers : WEB_CONCURRENCY sinon 2 x CPU + 1 (plafonné par MAX_WORKERS)
+_default_workers = multiprocessing.cpu_count() * 2 + 1
+_max_workers = int(os.getenv("MAX_WORKERS", "8"))
+workers = int(os.getenv("WEB_CONCURRENCY", min(_default_workers, _max_workers)))
+
+# UvicornWorker choisit automatiquement uvloop et httptools (uvicorn[standard])
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Les imports de l'application sont faits une seule fois dans le master puis partagés
+# par fork. Le client Motor est créé dans le lifespan, donc après le fork, par worker.
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# Arrêt gracieux : les requêtes en cours se terminent et le lifespan ferme Motor
+# (close_mongo_connection) avant l'arrêt du worker
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+# Recyclage périodique des workers pour borner la fragmentation mémoire
+max_requests = int(os.getenv("MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+
+accesslog = os.getenv("ACCESS_LOG", None)
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+
+
+def on_starting(server):
+    """Vide le répertoire des métriques Prometheus avant le démarrage des workers
+
+    Les fichiers d'un déploiement précédent (PID réutilisés) fausseraient l'agrégation de /metrics.
+    """
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Nettoie les fichiers de métriques Prometheus du worker terminé (mode multiprocess)"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
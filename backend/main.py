@@ -1,21 +1,46 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
 
-from database import connect_to_mongo, close_mongo_connection
-from routers import auth, users, user_cards, binders
+from database import db, connect_to_mongo, close_mongo_connection, get_pool_stats, on_connect
+from routers import auth, users, user_cards, binders, health, debug
+from middleware.metrics import MetricsMiddleware
+from middleware.query_profiler import QueryProfilerMiddleware
+from middleware.request_context import RequestContextMiddleware
+from middleware.compression import CompressionMiddleware
+from utils.metrics import render_metrics
+from utils.health import register_warmup, mark_warm
+from utils.logging_config import setup_logging
+from utils.loop_monitor import loop_monitor
+from services.change_feed import change_feed
+from utils.cache import cache
 
 # Charger les variables d'environnement
 load_dotenv()
 
+# Logs structurés écrits hors du chemin des requêtes (QueueHandler / QueueListener)
+setup_logging()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    register_warmup("mongo")
+    # Change stream des binders (replica set uniquement, sinon publication en mémoire),
+    # démarré à la connexion ou dès que la readiness voit MongoDB revenir
+    on_connect(change_feed.start)
     await connect_to_mongo()
+    mark_warm("mongo", db.connected)
+    if os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true":
+        await loop_monitor.start()
+    # Canal d'invalidation du cache entre workers (Redis uniquement)
+    await cache.start()
     yield
     # Shutdown
+    await change_feed.stop()
+    await cache.stop()
+    await loop_monitor.stop()
     await close_mongo_connection()
 
 app = FastAPI(
@@ -36,13 +61,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Request-ID", "Server-Timing"],
 )
 
+# Compression négociée (zstd/br/gzip) des réponses au-delà de COMPRESSION_MIN_SIZE
+app.add_middleware(CompressionMiddleware)
+
+# Profilage des requêtes MongoDB par requête HTTP (en-tête Server-Timing)
+app.add_middleware(QueryProfilerMiddleware)
+
+# Identifiant de requête propagé aux logs (en-tête X-Request-ID)
+app.add_middleware(RequestContextMiddleware)
+
+# Métriques par route (ajouté en dernier = middleware le plus externe)
+app.add_middleware(MetricsMiddleware)
+
 # Inclusion des routers
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(users.router, prefix="/users", tags=["users"])
 app.include_router(user_cards.router, prefix="/user", tags=["user-cards"])
 app.include_router(binders.router, prefix="", tags=["binders"])
+app.include_router(health.router, prefix="/health", tags=["health"])
+
+# Endpoints de diagnostic (blocages de la boucle), uniquement en mode debug
+if os.getenv("DEBUG", "False").lower() == "true":
+    app.include_router(debug.router, prefix="/debug", tags=["debug"])
 
 @app.get("/")
 async def root():
@@ -50,4 +93,10 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "mongo_pool": get_pool_stats()}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Métriques au format texte Prometheus"""
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
@@ -0,0 +1,5 @@
+# Ce fichier permet d'importer les middlewares comme un package
+from middleware.metrics import MetricsMiddleware
+from middleware.query_profiler import QueryProfilerMiddleware
+from middleware.request_context import RequestContextMiddleware
+from middleware.compression import CompressionMiddleware
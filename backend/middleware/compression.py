@@ -0,0 +1,211 @@
+"""
+Compression négociée des réponses (zstd, brotli, gzip) au-delà d'une taille minimale
+
+Les gros binders et collections sont du JSON très répétitif (slots vides, noms de sets).
+Les modules brotli et zstandard sont optionnels : sans eux seul gzip est proposé.
+"""
+import os
+import time
+import zlib
+from typing import Dict, List, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from middleware.metrics import resolve_route_template
+from utils.metrics import COMPRESSION_BYTES_IN, COMPRESSION_BYTES_OUT, COMPRESSION_SECONDS
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    zstandard = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "3"))
+
+# Types déjà compressés ou à diffuser sans mise en tampon
+EXCLUDED_CONTENT_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip", "text/event-stream")
+
+
+def available_encodings() -> List[str]:
+    """Encodages supportés, par ordre de préférence du serveur"""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    configured = os.getenv("COMPRESSION_ENCODINGS")
+    if configured:
+        allowed = [encoding.strip() for encoding in configured.split(",")]
+        encodings = [encoding for encoding in encodings if encoding in allowed]
+    return encodings
+
+
+def parse_accept_encoding(value: str) -> Dict[str, float]:
+    """Parse l'en-tête Accept-Encoding en {encodage: q}"""
+    accepted: Dict[str, float] = {}
+    for part in value.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: str, supported: List[str]) -> Optional[str]:
+    """Choisit l'encodage accepté par le client avec le meilleur q, puis la préférence serveur"""
+    accepted = parse_accept_encoding(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Compressor:
+    """Compresseur en flux pour un encodage donné"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        elif encoding == "br":
+            self._obj = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            # wbits=31 : en-tête et pied gzip
+            self._obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._obj.process(data)
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        if self.encoding == "br":
+            return self._obj.finish()
+        return self._obj.flush()
+
+
+def compress_bytes(data: bytes, encoding: str) -> bytes:
+    """Compresse un corps complet (utilisé aussi par les benchmarks)"""
+    compressor = _Compressor(encoding)
+    return compressor.compress(data) + compressor.flush()
+
+
+class CompressionMiddleware:
+    """Middleware ASGI de compression négociée avec seuil de taille"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Même sans encodage négocié, la réponse passe par le responder pour recevoir Vary
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        responder = _CompressionResponder(scope, send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, scope: Scope, send: Send, encoding: Optional[str], minimum_size: int):
+        self.scope = scope
+        self.send_downstream = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    async def send(self, message: Message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            headers = MutableHeaders(raw=message["headers"])
+            compressible = (
+                "content-encoding" not in headers
+                and not headers.get("content-type", "").startswith(EXCLUDED_CONTENT_TYPES)
+            )
+            if compressible and message["status"] != 204:
+                # La représentation dépend d'Accept-Encoding même quand elle n'est pas compressée
+                # (client sans encodage, corps sous le seuil, 304) : un cache partagé doit le savoir
+                headers.add_vary_header("Accept-Encoding")
+            self.passthrough = not compressible or self.encoding is None or message["status"] in (204, 304)
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self._flush_start()
+            await self.send_downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.minimum_size:
+                # Petite réponse : la compression coûte plus qu'elle ne rapporte
+                await self._flush_start()
+                await self.send_downstream(message)
+                return
+            self.compressor = _Compressor(self.encoding)
+
+        start = time.process_time()
+        compressed = self.compressor.compress(body)
+        if not more_body:
+            compressed += self.compressor.flush()
+        self.cpu_seconds += time.process_time() - start
+        self.bytes_in += len(body)
+        self.bytes_out += len(compressed)
+
+        if self.start_message is not None:
+            # Réponse complète en un message : Content-Length exact, sinon transfert par morceaux
+            self._prepare_headers(None if more_body else len(compressed))
+            await self._flush_start()
+        if not more_body:
+            self._record_metrics()
+        await self.send_downstream({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+    def _prepare_headers(self, content_length: Optional[int]):
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        if content_length is not None:
+            headers["Content-Length"] = str(content_length)
+        elif "content-length" in headers:
+            del headers["content-length"]
+        # Un ETag fort ne peut pas désigner la représentation compressée
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+    async def _flush_start(self):
+        if self.start_message is not None:
+            message, self.start_message = self.start_message, None
+            await self.send_downstream(message)
+
+    def _record_metrics(self):
+        route = resolve_route_template(self.scope)
+        COMPRESSION_BYTES_IN.labels(route, self.encoding).inc(self.bytes_in)
+        COMPRESSION_BYTES_OUT.labels(route, self.encoding).inc(self.bytes_out)
+        COMPRESSION_SECONDS.labels(route, self.encoding).observe(self.cpu_seconds)
@@ -0,0 +1,68 @@
+import time
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+from utils.metrics import HTTP_REQUESTS, HTTP_LATENCY, HTTP_IN_FLIGHT, HTTP_RESPONSE_SIZE
+
+# Label utilisé pour les chemins sans route (404), afin de borner la cardinalité
+UNMATCHED_ROUTE = "unmatched"
+
+
+def resolve_route_template(scope: Scope) -> str:
+    """Retourne le chemin déclaré de la route (ex: /user/binders/{binder_id}), mémorisé dans le scope"""
+    if "route_template" not in scope:
+        scope["route_template"] = _match_route_template(scope)
+    return scope["route_template"]
+
+
+def _match_route_template(scope: Scope) -> str:
+    app = scope.get("app")
+    router = getattr(app, "router", None)
+    if router is None:
+        return UNMATCHED_ROUTE
+
+    partial = None
+    for route in router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+        if match == Match.PARTIAL and partial is None:
+            partial = getattr(route, "path", None)
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Middleware ASGI : nombre de requêtes, latence, requêtes en cours et taille des réponses par route"""
+
+    def __init__(self, app: ASGIApp, excluded_paths: tuple = ("/metrics",)):
+        self.app = app
+        self.excluded_paths = excluded_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = resolve_route_template(scope)
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        in_flight = HTTP_IN_FLIGHT.labels(method, route)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            in_flight.dec()
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            HTTP_LATENCY.labels(method, route).observe(duration)
+            HTTP_RESPONSE_SIZE.labels(method, route).observe(response_size)
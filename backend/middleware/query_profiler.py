@@ -0,0 +1,43 @@
+import logging
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Receive, Scope, Send
+from utils.query_profiler import QueryProfile, current_profile
+
+logger = logging.getLogger("query_profiler")
+
+
+class QueryProfilerMiddleware:
+    """Middleware ASGI : profile les commandes MongoDB de chaque requête et ajoute l'en-tête Server-Timing"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = current_profile.set(profile)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                total_ms = (time.perf_counter() - start) * 1000
+                headers.append("Server-Timing", f"{profile.server_timing()}, app;dur={total_ms:.2f}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        "%s %s -> %s requêtes MongoDB (%.2f ms, %s docs) [%s]",
+                        scope["method"], scope["path"], profile.count,
+                        profile.total_ms, profile.docs, profile.summary()
+                    )
+                # Le corps (éventuellement un flux SSE) n'est plus profilé
+                profile.close()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
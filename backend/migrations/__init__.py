@@ -0,0 +1 @@
+# Ce fichier permet d'importer les migrations comme un package
@@ -0,0 +1,74 @@
+"""
+Migration : pages de binders au format creux
+
+Convertit les pages stockées avec tous leurs slots ({"slots": [...]}) au format
+{"cards": [...]} qui ne contient que les positions occupées. Le service lit les deux
+formats : la migration peut être lancée sans interruption de service.
+
+Usage (depuis backend/) : python -m migrations.m001_sparse_binder_pages [--dry-run]
+"""
+import asyncio
+import logging
+import sys
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+
+from models.binder import compact_page, page_cards
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+
+
+def convert_pages(pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convertit les pages d'un binder au format creux"""
+    return [
+        compact_page(page.get("page_number", idx), page_cards(page))
+        for idx, page in enumerate(pages, start=1)
+    ]
+
+
+async def migrate(database, batch_size: int = BATCH_SIZE, dry_run: bool = False) -> int:
+    """Convertit les binders encore à l'ancien format ; retourne le nombre de binders migrés"""
+    cursor = database.binders.find({"pages.slots": {"$exists": True}}, {"pages": 1, "version": 1})
+    operations = []
+    migrated = 0
+
+    async for binder in cursor:
+        # Filtre sur la version : une écriture concurrente garde la priorité
+        operations.append(UpdateOne(
+            {"_id": binder["_id"], "version": binder.get("version")},
+            {"$set": {"pages": convert_pages(binder.get("pages", []))}}
+        ))
+        if len(operations) >= batch_size:
+            migrated += await _flush(database, operations, dry_run)
+            operations = []
+
+    if operations:
+        migrated += await _flush(database, operations, dry_run)
+
+    logger.info("Migration des pages creuses terminée : %s binders convertis", migrated)
+    return migrated
+
+
+async def _flush(database, operations: list, dry_run: bool) -> int:
+    if dry_run:
+        return len(operations)
+    result = await database.binders.bulk_write(operations, ordered=False)
+    return result.modified_count
+
+
+async def main(dry_run: bool = False):
+    from database import connect_to_mongo, close_mongo_connection, db
+
+    await connect_to_mongo()
+    try:
+        await migrate(db.database, dry_run=dry_run)
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(dry_run="--dry-run" in sys.argv))
@@ -0,0 +1,99 @@
+"""
+Migration : pages des binders dans la collection binder_pages
+
+Déplace les pages embarquées dans les documents binders vers binder_pages
+(un document par page occupée, clé (binder_id, page_number)) et renseigne les
+compteurs page_count / card_count et l'aperçu. Le service lit encore les binders
+non migrés et les convertit à leur première écriture : la migration peut être
+lancée sans interruption de service.
+
+Usage (depuis backend/) : python -m migrations.m002_binder_pages_collection [--dry-run]
+"""
+import asyncio
+import logging
+import sys
+from typing import Any, Dict, List
+
+from pymongo import UpdateOne
+
+from database import ensure_indexes
+from models.binder import compact_page, page_cards
+from services.binder_service import PREVIEW_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+def split_binder(binder: Dict[str, Any]) -> Dict[str, Any]:
+    """Calcule les documents de pages et les compteurs d'un binder à pages embarquées"""
+    pages: List[Dict[str, Any]] = []
+    preview_cards: List[str] = []
+    preview_through = 0
+    card_count = 0
+    for idx, page in enumerate(binder.get("pages", []), start=1):
+        page_number = page.get("page_number", idx)
+        cards = page_cards(page)
+        if not cards:
+            continue
+        document = compact_page(page_number, cards)
+        pages.append(document)
+        card_count += len(cards)
+        for card in document["cards"]:
+            if len(preview_cards) < PREVIEW_SIZE:
+                preview_cards.append(card["card_id"])
+                preview_through = page_number
+    return {
+        "pages": pages,
+        "fields": {
+            "page_count": len(binder.get("pages", [])),
+            "card_count": card_count,
+            "preview_cards": preview_cards,
+            "preview_through": preview_through,
+        },
+    }
+
+
+async def migrate(database, dry_run: bool = False) -> int:
+    """Migre les binders à pages embarquées ; retourne le nombre de binders migrés"""
+    await ensure_indexes(database)
+    cursor = database.binders.find({"pages": {"$exists": True}}, {"pages": 1, "user_id": 1, "version": 1})
+    migrated = 0
+
+    async for binder in cursor:
+        split = split_binder(binder)
+        if dry_run:
+            migrated += 1
+            continue
+        # Les pages d'abord, puis le binder conditionné à la version lue. $setOnInsert :
+        # si le service a déjà converti ce binder (écriture concurrente), ses pages priment.
+        if split["pages"]:
+            await database.binder_pages.bulk_write([
+                UpdateOne(
+                    {"binder_id": binder["_id"], "page_number": page["page_number"]},
+                    {"$setOnInsert": {"user_id": binder["user_id"], "cards": page["cards"]}},
+                    upsert=True
+                )
+                for page in split["pages"]
+            ], ordered=False)
+        result = await database.binders.update_one(
+            {"_id": binder["_id"], "version": binder.get("version")},
+            {"$set": split["fields"], "$unset": {"pages": ""}}
+        )
+        migrated += result.modified_count
+
+    logger.info("Migration vers binder_pages terminée : %s binders migrés", migrated)
+    return migrated
+
+
+async def main(dry_run: bool = False):
+    from database import connect_to_mongo, close_mongo_connection, db
+
+    await connect_to_mongo()
+    try:
+        await migrate(db.database, dry_run=dry_run)
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(dry_run="--dry-run" in sys.argv))
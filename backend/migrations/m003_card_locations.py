@@ -0,0 +1,64 @@
+"""
+Migration : construction de l'index inverse card_locations
+
+Reconstruit les emplacements (user_card_id -> binder, page, position) à partir de
+binder_pages. Les binders encore à pages embarquées sont indexés à leur première
+écriture par le service : lancer m002 avant cette migration.
+
+Usage (depuis backend/) : python -m migrations.m003_card_locations [--dry-run]
+"""
+import asyncio
+import logging
+import sys
+
+from database import ensure_indexes
+from models.binder import page_cards
+from services.card_location_service import CardLocationService
+
+logger = logging.getLogger(__name__)
+
+
+async def migrate(database, dry_run: bool = False) -> int:
+    """Réindexe chaque binder de binder_pages ; retourne le nombre de binders indexés"""
+    await ensure_indexes(database)
+    locations = CardLocationService(database)
+    cursor = database.binder_pages.find(
+        {}, {"binder_id": 1, "user_id": 1, "page_number": 1, "cards": 1}
+    ).sort([("binder_id", 1), ("page_number", 1)])
+    indexed = 0
+
+    async def flush(binder_id, user_id, pages):
+        if not dry_run:
+            # reset : les emplacements existants du binder sont remplacés
+            await locations.replace_pages(binder_id, str(user_id), pages, reset=True)
+
+    # Les pages arrivent groupées par binder : un seul binder est gardé en mémoire
+    current, owner, pages = None, None, {}
+    async for page in cursor:
+        if page["binder_id"] != current:
+            if current is not None:
+                await flush(current, owner, pages)
+                indexed += 1
+            current, owner, pages = page["binder_id"], page["user_id"], {}
+        pages[page["page_number"]] = page_cards(page)
+    if current is not None:
+        await flush(current, owner, pages)
+        indexed += 1
+
+    logger.info("Index card_locations reconstruit : %s binders", indexed)
+    return indexed
+
+
+async def main(dry_run: bool = False):
+    from database import connect_to_mongo, close_mongo_connection, db
+
+    await connect_to_mongo()
+    try:
+        await migrate(db.database, dry_run=dry_run)
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(dry_run="--dry-run" in sys.argv))
@@ -0,0 +1,72 @@
+"""
+Migration : initialisation du compteur placed des user_cards
+
+Recalcule le nombre d'exemplaires rangés de chaque UserCard à partir de l'index
+card_locations : lancer m003 avant cette migration.
+
+Chaque carte est corrigée par sa propre mise à jour, conditionnée à la valeur lue :
+pas de remise à zéro globale pendant laquelle les compteurs seraient faux, et un
+placement concurrent (qui incrémente placed) n'est pas écrasé.
+
+Usage (depuis backend/) : python -m migrations.m004_placed_counters [--dry-run]
+"""
+import asyncio
+import logging
+import sys
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+async def migrate(database, dry_run: bool = False) -> int:
+    """Recalcule placed pour chaque UserCard ; retourne le nombre de compteurs corrigés"""
+    operations = []
+    corrected = 0
+    cursor = database.user_cards.aggregate([
+        {"$project": {"placed": 1}},
+        {"$lookup": {
+            "from": "card_locations",
+            "localField": "_id",
+            "foreignField": "user_card_id",
+            "pipeline": [{"$project": {"_id": 1}}],
+            "as": "locations",
+        }},
+        {"$project": {"placed": 1, "count": {"$size": "$locations"}}},
+    ])
+    async for card in cursor:
+        if card.get("placed", 0) == card["count"]:
+            continue
+        corrected += 1
+        if dry_run:
+            continue
+        # placed absent : le filtre None le désigne aussi
+        operations.append(UpdateOne(
+            {"_id": card["_id"], "placed": card.get("placed")},
+            {"$set": {"placed": card["count"]}}
+        ))
+        if len(operations) >= BATCH_SIZE:
+            await database.user_cards.bulk_write(operations, ordered=False)
+            operations = []
+    if operations:
+        await database.user_cards.bulk_write(operations, ordered=False)
+
+    logger.info("Compteur placed recalculé : %s cartes corrigées", corrected)
+    return corrected
+
+
+async def main(dry_run: bool = False):
+    from database import connect_to_mongo, close_mongo_connection, db
+
+    await connect_to_mongo()
+    try:
+        await migrate(db.database, dry_run=dry_run)
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(dry_run="--dry-run" in sys.argv))
@@ -1,7 +1,10 @@
 # Ce fichier permet d'importer les modèles comme un package
 from models.user import UserBase, UserCreate, UserLogin, UserInDB, UserResponse, PyObjectId
-from models.user_card import UserCardBase, UserCardCreate, UserCardUpdate, UserCardInDB, UserCardResponse
+from models.user_card import UserCardBase, UserCardCreate, UserCardUpdate, UserCardInDB, UserCardResponse, CardLocation
 from models.binder import (
-    BinderSize, CardSlot, BinderPage, BinderBase, BinderCreate, BinderUpdate, 
-    BinderInDB, BinderResponse, BinderSummary, AddCardToBinder, RemoveCardFromBinder, MoveCardInBinder
+    BinderSize, CardSlot, BinderPage, StoredCard, StoredPage, BinderBase, BinderCreate, BinderUpdate, 
+    BinderTemplateCard, MasterSetBinderCreate,
+    BinderInDB, BinderResponse, BinderSummary, AddCardToBinder, RemoveCardFromBinder, MoveCardInBinder,
+    MoveCardBetweenBinders, BinderSlotUpdate, BinderCardMoved,
+    BinderOperationType, BinderOperation, BinderOperations, BinderSortKey, ReorganizeBinder
 )
@@ -25,6 +25,52 @@ class BinderPage(BaseModel):
     page_number: int = Field(..., description="Numéro de la page (commence à 1)")
     slots: List[CardSlot] = Field(default_factory=list, description="Liste des slots de la page")
 
+class StoredCard(BaseModel):
+    """Carte placée, telle que stockée en base (seules les positions occupées sont enregistrées)"""
+    position: int
+    card_id: str
+    user_card_id: Optional[str] = None
+
+class StoredPage(BaseModel):
+    """Page stockée au format creux : la grille complète n'est construite qu'à la réponse"""
+    page_number: int
+    cards: List[StoredCard] = Field(default_factory=list)
+
+SLOTS_PER_PAGE = {"3x3": 9, "4x4": 16, "5x5": 25}
+
+def page_cards(page: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
+    """Retourne {position: carte} pour une page stockée (format creux ou ancien format à slots)"""
+    if "cards" in page:
+        return {card["position"]: card for card in page["cards"]}
+    # Ancien format : tous les slots sont matérialisés
+    return {
+        slot["position"]: {"position": slot["position"], "card_id": slot["card_id"], "user_card_id": slot.get("user_card_id")}
+        for slot in page.get("slots", [])
+        if slot.get("card_id")
+    }
+
+def compact_page(page_number: int, cards: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    """Construit le document creux d'une page à partir de {position: carte}"""
+    return {
+        "page_number": page_number,
+        "cards": [
+            {"position": position, "card_id": card["card_id"], "user_card_id": card.get("user_card_id")}
+            for position, card in sorted(cards.items())
+        ]
+    }
+
+def expand_slots(cards: Dict[int, Dict[str, Any]], slots_per_page: int) -> List[Dict[str, Any]]:
+    """Construit la grille complète des slots d'une page (slots vides inclus)"""
+    slots = []
+    for position in range(slots_per_page):
+        card = cards.get(position)
+        slots.append({
+            "position": position,
+            "card_id": card["card_id"] if card else None,
+            "user_card_id": card.get("user_card_id") if card else None
+        })
+    return slots
+
 class BinderBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=100, description="Nom du binder")
     size: BinderSize = Field(..., description="Taille du binder (3x3, 4x4, 5x5)")
@@ -35,6 +81,16 @@ class BinderCreate(BinderBase):
     """Modèle pour créer un nouveau binder"""
     pass
 
+class BinderTemplateCard(BaseModel):
+    """Carte du catalogue d'une extension (TCGdex : id et localId)"""
+    card_id: str = Field(..., description="ID de la carte TCGdex")
+    local_id: Optional[str] = Field(None, description="Numéro local de la carte dans l'extension")
+
+class MasterSetBinderCreate(BinderCreate):
+    """Modèle pour créer un binder « master set » : un emplacement réservé par carte de l'extension"""
+    set_id: str = Field(..., description="ID de l'extension")
+    cards: List[BinderTemplateCard] = Field(..., min_length=1, max_length=2000, description="Catalogue de l'extension")
+
 class BinderUpdate(BaseModel):
     """Modèle pour mettre à jour un binder"""
     name: Optional[str] = Field(None, min_length=1, max_length=100)
@@ -46,7 +102,13 @@ class BinderInDB(BinderBase):
     """Modèle pour le binder en base de données"""
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     user_id: PyObjectId = Field(..., description="ID de l'utilisateur propriétaire")
-    pages: List[BinderPage] = Field(default_factory=list, description="Pages du binder avec leurs slots")
+    pages: List[StoredPage] = Field(default_factory=list, description="Pages du binder (stockées dans binder_pages, pas dans ce document)")
+    page_count: int = Field(default=0, description="Nombre de pages")
+    card_count: int = Field(default=0, description="Nombre de cartes placées")
+    preview_cards: List[str] = Field(default_factory=list, description="IDs des premières cartes pour preview")
+    preview_through: int = Field(default=0, description="Dernière page contribuant à l'aperçu")
+    set_id: Optional[str] = Field(None, description="Extension du modèle master set (emplacements réservés)")
+    version: int = Field(default=1, description="Version du binder, incrémentée à chaque écriture")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -57,26 +119,27 @@ class BinderInDB(BinderBase):
 
     def get_slots_per_page(self) -> int:
         """Retourne le nombre de slots par page selon la taille"""
-        if self.size == BinderSize.SMALL:
-            return 9  # 3x3
-        elif self.size == BinderSize.MEDIUM:
-            return 16  # 4x4
-        elif self.size == BinderSize.LARGE:
-            return 25  # 5x5
-        return 9
+        return SLOTS_PER_PAGE.get(self.size, 9)
 
     def initialize_pages(self, num_pages: int = 1):
-        """Initialise les pages du binder avec des slots vides"""
+        """Initialise les pages du binder (vides : aucun slot n'est matérialisé)"""
+        self.pages = [StoredPage(page_number=page_num) for page_num in range(1, num_pages + 1)]
+        self.page_count = num_pages
+
+    def expanded_pages(self) -> List[BinderPage]:
+        """Pages avec la grille complète des slots, pour les réponses"""
         slots_per_page = self.get_slots_per_page()
-        self.pages = []
-        
-        for page_num in range(1, num_pages + 1):
-            slots = [
-                CardSlot(position=i, card_id=None, user_card_id=None)
-                for i in range(slots_per_page)
-            ]
-            page = BinderPage(page_number=page_num, slots=slots)
-            self.pages.append(page)
+        return [
+            BinderPage(
+                page_number=page.page_number,
+                slots=expand_slots(page_cards(page.dict()), slots_per_page)
+            )
+            for page in self.pages
+        ]
+
+    def to_document(self) -> Dict[str, Any]:
+        """Document de la collection binders (métadonnées et compteurs, sans les pages)"""
+        return self.dict(by_alias=True, exclude={"pages"})
 
 class BinderResponse(BinderBase):
     """Modèle de réponse pour un binder"""
@@ -87,6 +150,7 @@ class BinderResponse(BinderBase):
     updated_at: datetime
     total_pages: int = Field(..., description="Nombre total de pages")
     total_cards: int = Field(..., description="Nombre total de cartes dans le binder")
+    version: int = Field(default=0, description="Version du binder")
 
 class BinderSummary(BaseModel):
     """Modèle résumé pour la liste des binders"""
@@ -97,6 +161,7 @@ class BinderSummary(BaseModel):
     is_public: bool
     total_pages: int
     total_cards: int
+    version: int = 0
     created_at: datetime
     updated_at: datetime
     preview_cards: List[str] = Field(default_factory=list, description="IDs des premières cartes pour preview")
@@ -118,3 +183,65 @@ class MoveCardInBinder(BaseModel):
     source_position: int = Field(..., description="Position source dans la page")
     destination_page: int = Field(..., description="Numéro de la page destination")
     destination_position: int = Field(..., description="Position destination dans la page")
+
+class MoveCardBetweenBinders(BaseModel):
+    """Modèle pour déplacer une carte d'un binder à un autre"""
+    source_binder_id: str = Field(..., description="ID du binder source")
+    source_page: int = Field(..., description="Numéro de la page source")
+    source_position: int = Field(..., description="Position source dans la page")
+    destination_binder_id: str = Field(..., description="ID du binder destination")
+    destination_page: Optional[int] = Field(None, description="Page destination (optionnel pour placement automatique)")
+    destination_position: Optional[int] = Field(None, description="Position destination (optionnel pour placement automatique)")
+    source_version: Optional[int] = Field(None, description="Version attendue du binder source (équivalent de If-Match)")
+    destination_version: Optional[int] = Field(None, description="Version attendue du binder destination (équivalent de If-Match)")
+
+class BinderSlotUpdate(BaseModel):
+    """Slot modifié par une écriture, avec la nouvelle version de son binder"""
+    binder_id: str
+    version: int
+    page_number: int
+    slot: CardSlot
+
+class BinderCardMoved(BaseModel):
+    """Réponse d'un déplacement entre binders : uniquement les deux slots modifiés"""
+    source: BinderSlotUpdate
+    destination: BinderSlotUpdate
+
+# Nombre maximal d'opérations par requête POST /user/binders/{id}/ops
+MAX_BINDER_OPERATIONS = 500
+
+class BinderOperationType(str, Enum):
+    ADD = "add"
+    REMOVE = "remove"
+    MOVE = "move"
+    SWAP = "swap"
+    ADD_PAGE = "add_page"
+
+class BinderOperation(BaseModel):
+    """Opération d'un lot : les champs utilisés dépendent de op"""
+    op: BinderOperationType = Field(..., description="Type d'opération")
+    user_card_id: Optional[str] = Field(None, description="ID de la UserCard à ajouter (add)")
+    page_number: Optional[int] = Field(None, description="Numéro de page (add, remove)")
+    position: Optional[int] = Field(None, description="Position dans la page (add, remove)")
+    source_page: Optional[int] = Field(None, description="Page source (move, swap)")
+    source_position: Optional[int] = Field(None, description="Position source (move, swap)")
+    destination_page: Optional[int] = Field(None, description="Page destination (move, swap)")
+    destination_position: Optional[int] = Field(None, description="Position destination (move, swap)")
+
+class BinderOperations(BaseModel):
+    """Lot d'opérations appliquées dans l'ordre, en une seule écriture"""
+    operations: List[BinderOperation] = Field(..., min_length=1, max_length=MAX_BINDER_OPERATIONS)
+
+class BinderSortKey(str, Enum):
+    SET = "set"
+    RARITY = "rarity"
+    NAME = "name"
+    DATE_ADDED = "date_added"
+
+class ReorganizeBinder(BaseModel):
+    """Modèle pour trier et compacter les cartes d'un binder"""
+    sort_by: List[BinderSortKey] = Field(
+        default_factory=list,
+        description="Clés de tri successives (set = extension puis numéro) ; vide = compaction sans changer l'ordre"
+    )
+    descending: bool = Field(default=False, description="Ordre décroissant")
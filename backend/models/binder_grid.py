@@ -0,0 +1,260 @@
+"""
+Grille d'un binder en mémoire : tableaux plats et bitmap des slots
+
+Le slot (page, position) est à l'indice (page - 1) * slots_per_page + position.
+Un entier Python sert de bitmap des slots indisponibles (occupés ou dont la page
+n'est pas chargée) : la recherche du premier slot libre, la validation d'un
+déplacement et le comptage se font en O(1) ou O(mots) au lieu de parcourir des dicts.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Card = Dict[str, Optional[str]]
+
+
+class BinderGrid:
+    """Cartes placées dans un binder, pour les pages chargées"""
+
+    def __init__(self, slots_per_page: int, page_count: int, reservations: bool = False):
+        self.slots_per_page = slots_per_page
+        self.page_count = page_count
+        # Binder master set : les emplacements réservés (sans user_card_id) ne comptent pas comme cartes
+        self.reservations = reservations
+        size = page_count * slots_per_page
+        self.card_ids: List[Optional[str]] = [None] * size
+        self.user_card_ids: List[Optional[str]] = [None] * size
+        self._occupied = 0
+        # Pages non chargées : leurs slots sont indisponibles pour le placement automatique
+        self._unloaded = (1 << size) - 1
+        self._first_free = 0
+        self._initial_page_count = page_count
+        self.card_delta = 0
+        # Slots modifiés, dans l'ordre des opérations : {(page, position): None}
+        self._dirty: Dict[Tuple[int, int], None] = {}
+
+    @classmethod
+    def from_pages(
+        cls, slots_per_page: int, page_count: int, pages: Dict[int, Dict[int, Card]], reservations: bool = False
+    ) -> "BinderGrid":
+        """Construit la grille à partir de {page_number: {position: carte}} (pages chargées)"""
+        grid = cls(slots_per_page, page_count, reservations)
+        for page_number, cards in pages.items():
+            grid.load_page(page_number, cards)
+        return grid
+
+    @classmethod
+    def packed(cls, slots_per_page: int, cards: List[Card], min_pages: int = 1, reservations: bool = False) -> "BinderGrid":
+        """Grille où les cartes sont rangées à la suite, dans l'ordre donné, sans trou
+
+        Le nombre de pages est le minimum nécessaire (au moins min_pages).
+        """
+        page_count = max(min_pages, -(-len(cards) // slots_per_page))
+        grid = cls(slots_per_page, 0, reservations)
+        for _ in range(page_count):
+            grid.add_page()
+        for index, card in enumerate(cards):
+            grid._set(index, card)
+        grid.card_delta = sum(1 for card in cards if grid.counts(card))
+        return grid
+
+    # --- Indices et bitmap ---
+
+    def _page_mask(self, page_number: int) -> int:
+        return ((1 << self.slots_per_page) - 1) << ((page_number - 1) * self.slots_per_page)
+
+    def index(self, page_number: int, position: int) -> int:
+        """Indice plat d'un slot, avec les erreurs de validation du service"""
+        if page_number < 1 or page_number > self.page_count:
+            raise ValueError("Numéro de page invalide")
+        if position < 0 or position >= self.slots_per_page:
+            raise ValueError("Position invalide")
+        return (page_number - 1) * self.slots_per_page + position
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        page_index, position = divmod(index, self.slots_per_page)
+        return page_index + 1, position
+
+    def _check_loaded(self, page_number: int):
+        if self._unloaded & self._page_mask(page_number):
+            raise RuntimeError(f"Page {page_number} non chargée dans la grille")
+
+    def load_page(self, page_number: int, cards: Dict[int, Card]):
+        start = (page_number - 1) * self.slots_per_page
+        self._unloaded &= ~self._page_mask(page_number)
+        for position, card in cards.items():
+            if 0 <= position < self.slots_per_page:
+                index = start + position
+                self.card_ids[index] = card["card_id"]
+                self.user_card_ids[index] = card.get("user_card_id")
+                self._occupied |= 1 << index
+        self._first_free = min(self._first_free, start)
+
+    def is_loaded(self, page_number: int) -> bool:
+        return not self._unloaded & self._page_mask(page_number)
+
+    # --- Lecture ---
+
+    def get(self, page_number: int, position: int) -> Optional[Card]:
+        index = self.index(page_number, position)
+        if not self._occupied >> index & 1:
+            return None
+        return {"card_id": self.card_ids[index], "user_card_id": self.user_card_ids[index]}
+
+    def is_free(self, page_number: int, position: int) -> bool:
+        return not self._occupied >> self.index(page_number, position) & 1
+
+    @property
+    def count(self) -> int:
+        """Nombre de slots occupés dans les pages chargées (emplacements réservés compris)"""
+        return self._occupied.bit_count()
+
+    def counts(self, card: Card) -> bool:
+        """La carte compte dans card_count (un emplacement réservé n'est pas une carte)"""
+        return not self.reservations or bool(card.get("user_card_id"))
+
+    @property
+    def card_count(self) -> int:
+        """Nombre de cartes des pages chargées, emplacements réservés exclus"""
+        return sum(1 for _, _, card in self.cards_in_order() if self.counts(card))
+
+    def page_count_cards(self, page_number: int) -> int:
+        return (self._occupied & self._page_mask(page_number)).bit_count()
+
+    def first_free(self) -> Optional[Tuple[int, int]]:
+        """Premier slot libre (page, position) parmi les pages chargées, None si aucun"""
+        blocked = (self._occupied | self._unloaded) >> self._first_free
+        # Bit de poids faible à 0 : isoler le premier bit nul de blocked
+        free = ~blocked & (blocked + 1)
+        index = self._first_free + free.bit_length() - 1
+        if index >= self.page_count * self.slots_per_page:
+            self._first_free = self.page_count * self.slots_per_page
+            return None
+        self._first_free = index
+        return self._locate(index)
+
+    def page_cards(self, page_number: int) -> Dict[int, Card]:
+        """{position: carte} d'une page (format des documents binder_pages)"""
+        start = (page_number - 1) * self.slots_per_page
+        bits = (self._occupied >> start) & ((1 << self.slots_per_page) - 1)
+        cards = {}
+        while bits:
+            low = bits & -bits
+            position = low.bit_length() - 1
+            cards[position] = {"card_id": self.card_ids[start + position], "user_card_id": self.user_card_ids[start + position]}
+            bits ^= low
+        return cards
+
+    def cards_in_order(self) -> Iterable[Tuple[int, int, Card]]:
+        """(page, position, carte) dans l'ordre de lecture"""
+        bits = self._occupied
+        while bits:
+            low = bits & -bits
+            index = low.bit_length() - 1
+            page_number, position = self._locate(index)
+            yield page_number, position, {"card_id": self.card_ids[index], "user_card_id": self.user_card_ids[index]}
+            bits ^= low
+
+    # --- Écriture ---
+
+    def _set(self, index: int, card: Optional[Card]):
+        if card is None:
+            self.card_ids[index] = None
+            self.user_card_ids[index] = None
+            self._occupied &= ~(1 << index)
+            self._first_free = min(self._first_free, index)
+        else:
+            self.card_ids[index] = card["card_id"]
+            self.user_card_ids[index] = card.get("user_card_id")
+            self._occupied |= 1 << index
+        self._dirty[self._locate(index)] = None
+
+    def is_reserved(self, index: int, card_id: str) -> bool:
+        """Emplacement réservé à card_id par un modèle (carte du catalogue sans UserCard)"""
+        return bool(self._occupied >> index & 1) and self.user_card_ids[index] is None and self.card_ids[index] == card_id
+
+    def reserved_slot(self, card_id: str) -> Optional[Tuple[int, int]]:
+        """Premier emplacement réservé à card_id parmi les pages chargées"""
+        for index, reserved_id in enumerate(self.card_ids):
+            if reserved_id == card_id and self.user_card_ids[index] is None and self._occupied >> index & 1:
+                return self._locate(index)
+        return None
+
+    def place(self, page_number: int, position: int, card: Card):
+        index = self.index(page_number, position)
+        self._check_loaded(page_number)
+        previous = self.get(page_number, position)
+        if previous is not None and not self.is_reserved(index, card["card_id"]):
+            raise ValueError("Ce slot est déjà occupé")
+        self._set(index, card)
+        # Une carte qui prend son emplacement réservé compte si celui-ci ne comptait pas
+        self.card_delta += self.counts(card) - (previous is not None and self.counts(previous))
+
+    def place_first_free(self, card: Card) -> Tuple[int, int]:
+        """Place la carte dans le premier slot libre, en ajoutant une page si besoin"""
+        slot = self.first_free()
+        if slot is None:
+            slot = (self.add_page(), 0)
+        self.place(*slot, card)
+        return slot
+
+    def remove(self, page_number: int, position: int) -> Optional[Card]:
+        index = self.index(page_number, position)
+        self._check_loaded(page_number)
+        card = self.get(page_number, position)
+        if card is not None:
+            if self.reservations and card["user_card_id"]:
+                # Binder master set : la carte retirée rend son emplacement réservé (ordre de l'extension)
+                self._set(index, {"card_id": card["card_id"], "user_card_id": None})
+            else:
+                self._set(index, None)
+            if self.counts(card):
+                self.card_delta -= 1
+        else:
+            # Retrait d'un slot vide : la page est réécrite telle quelle (comportement historique)
+            self._dirty[(page_number, position)] = None
+        return card
+
+    def move(self, source_page: int, source_position: int, destination_page: int, destination_position: int):
+        source = self.index(source_page, source_position)
+        destination = self.index(destination_page, destination_position)
+        self._check_loaded(source_page)
+        self._check_loaded(destination_page)
+        if not self._occupied >> source & 1:
+            raise ValueError("Aucune carte à la position source")
+        if self._occupied >> destination & 1:
+            raise ValueError("La position de destination est déjà occupée")
+        card = self.get(source_page, source_position)
+        self._set(source, None)
+        self._set(destination, card)
+
+    def swap(self, page_a: int, position_a: int, page_b: int, position_b: int):
+        """Échange le contenu de deux slots (l'un des deux peut être vide)"""
+        a = self.index(page_a, position_a)
+        b = self.index(page_b, position_b)
+        self._check_loaded(page_a)
+        self._check_loaded(page_b)
+        card_a, card_b = self.get(page_a, position_a), self.get(page_b, position_b)
+        if card_a is None and card_b is None:
+            raise ValueError("Aucune carte à échanger")
+        self._set(a, card_b)
+        self._set(b, card_a)
+
+    def add_page(self) -> int:
+        """Ajoute une page vide (chargée) et retourne son numéro"""
+        self.page_count += 1
+        self.card_ids.extend([None] * self.slots_per_page)
+        self.user_card_ids.extend([None] * self.slots_per_page)
+        return self.page_count
+
+    # --- Résultat pour l'écriture ---
+
+    @property
+    def added_pages(self) -> List[int]:
+        return list(range(self._initial_page_count + 1, self.page_count + 1))
+
+    @property
+    def dirty_slots(self) -> List[Tuple[int, int]]:
+        return list(self._dirty)
+
+    def dirty_pages(self) -> Dict[int, Dict[int, Card]]:
+        """{page_number: {position: carte}} des pages modifiées, à écrire dans binder_pages"""
+        return {page_number: self.page_cards(page_number) for page_number in sorted({p for p, _ in self._dirty})}
@@ -37,6 +37,8 @@ class UserInDB(UserBase):
     is_active: bool = True
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    binders_version: int = Field(default=0, description="Version de la liste des binders (incrémentée à chaque écriture)")
+    cards_version: int = Field(default=0, description="Version de la collection de cartes (incrémentée à chaque écriture)")
 
     class Config:
         allow_population_by_field_name = True
@@ -38,5 +38,15 @@ class UserCardInDB(UserCardBase):
 class UserCardResponse(UserCardBase):
     id: str
     user_id: str
+    # Exemplaires rangés dans des binders / encore disponibles
+    placed: int = 0
+    available: Optional[int] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+
+class CardLocation(BaseModel):
+    """Emplacement d'une carte utilisateur dans un binder"""
+    binder_id: str
+    binder_name: str
+    page_number: int
+    position: int
@@ -3,3 +3,5 @@ from routers.auth import router as auth_router
 from routers.users import router as users_router
 from routers.user_cards import router as user_cards_router
 from routers.binders import router as binders_router
+from routers.health import router as health_router
+from routers.debug import router as debug_router
@@ -1,30 +1,131 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer
-from typing import List
+from bson import ObjectId
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import json
+import os
 import logging
 
 from dependencies import get_database, get_current_user
 from models.user import UserInDB
 from models.binder import (
-    BinderCreate, BinderUpdate, BinderResponse, BinderSummary,
-    AddCardToBinder, RemoveCardFromBinder, MoveCardInBinder
+    BinderCreate, BinderUpdate, BinderResponse, BinderSummary, MasterSetBinderCreate,
+    AddCardToBinder, RemoveCardFromBinder, MoveCardInBinder, MoveCardBetweenBinders, BinderCardMoved,
+    BinderOperations, ReorganizeBinder
+)
+from services.binder_service import BinderService, BinderVersionConflict
+from services.change_feed import BinderFeedSession, change_feed
+from utils.single_flight import SingleFlight
+from utils.response_cache import (
+    binder_response_key, binder_responses, binders_list_response_key, binders_list_responses, json_response
+)
+from utils.http_cache import (
+    binder_etag, binders_list_etag, etag_matches, if_match_version, not_modified, set_cache_headers
 )
-from services.binder_service import BinderService
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/user/binders", tags=["binders"])
 security = HTTPBearer()
 
+# Nombre maximal de pages renvoyées par une requête fenêtrée (?pages= / ?around=)
+MAX_PAGE_WINDOW = int(os.getenv("MAX_PAGE_WINDOW", "20"))
+
+# Lectures concurrentes identiques de GET /user/binders/{id} regroupées par worker
+binder_reads = SingleFlight("get_binder")
+
+# Intervalle des commentaires keepalive du flux SSE (proxies qui coupent les connexions inactives)
+BINDER_FEED_KEEPALIVE_SECONDS = float(os.getenv("BINDER_FEED_KEEPALIVE_SECONDS", "15"))
+
+
+def parse_page_range(pages: Optional[str], around: Optional[int], window: int) -> Optional[Tuple[int, int]]:
+    """Convertit ?pages=3-4 ou ?around=7&window=1 en (première, dernière) page ; None = toutes les pages"""
+    if pages is not None:
+        first, _, last = pages.partition("-")
+        page_range = (int(first), int(last or first))
+    elif around is not None:
+        page_range = (max(around - window, 1), around + window)
+    else:
+        return None
+    if page_range[0] < 1 or page_range[1] < page_range[0]:
+        raise ValueError("Plage de pages invalide")
+    if page_range[1] - page_range[0] + 1 > MAX_PAGE_WINDOW:
+        raise ValueError(f"Au plus {MAX_PAGE_WINDOW} pages par requête")
+    return page_range
+
+
+def parse_known_versions(since: List[str], last_event_id: Optional[str]) -> Dict[str, int]:
+    """Convertit ?since=<binder_id>:<version> (et Last-Event-ID) en {binder_id: version}"""
+    known: Dict[str, int] = {}
+    for value in since + ([last_event_id] if last_event_id else []):
+        binder_id, _, version = value.partition(":")
+        if not ObjectId.is_valid(binder_id) or not version.isdigit():
+            raise ValueError(f"Version de binder invalide: {value}")
+        known[binder_id] = max(known.get(binder_id, 0), int(version))
+    return known
+
+
+def sse_event(event: dict) -> str:
+    """Formate un événement SSE ; l'id permet la reprise via Last-Event-ID"""
+    name = "deleted" if event.get("deleted") else "changes"
+    lines = [f"event: {name}", f"data: {json.dumps(event)}"]
+    if "version" in event:
+        lines.insert(0, f"id: {event['binder_id']}:{event['version']}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def sse_stream(request: Request, session: BinderFeedSession, queue: asyncio.Queue, keepalive: float) -> AsyncIterator[str]:
+    """Rattrapage depuis les versions connues du client, puis notifications jusqu'à la déconnexion"""
+    for event in await session.catch_up():
+        yield sse_event(event)
+    while not await request.is_disconnected():
+        try:
+            notification = await asyncio.wait_for(queue.get(), timeout=keepalive)
+        except asyncio.TimeoutError:
+            yield ": keepalive\n\n"
+            continue
+        for event in await session.handle(notification):
+            yield sse_event(event)
+
+
+def version_conflict(binder_id: str, conflict: BinderVersionConflict, if_match: Optional[str]) -> HTTPException:
+    """412 si la précondition If-Match échoue, 409 si l'écriture concurrente a eu lieu sans précondition
+
+    Le corps contient la version courante et les modifications manquantes au client,
+    qui peut les appliquer à son état local au lieu de recharger tout le binder.
+    """
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED if if_match else status.HTTP_409_CONFLICT,
+        detail={
+            "message": str(conflict),
+            "current_version": conflict.current_version,
+            "changes": conflict.changes
+        },
+        headers={"ETag": binder_etag(binder_id, conflict.current_version)}
+    )
+
 @router.get("/", response_model=List[BinderSummary])
 async def get_user_binders(
+    request: Request,
     current_user: UserInDB = Depends(get_current_user),
     db = Depends(get_database)
 ):
     """Récupère tous les binders de l'utilisateur connecté"""
     try:
-        binder_service = BinderService(db)
-        binders = await binder_service.get_user_binders(str(current_user.id))
-        return binders
+        # La version de la liste est portée par le document utilisateur déjà chargé
+        user_id = str(current_user.id)
+        etag = binders_list_etag(user_id, current_user.binders_version)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+        
+        cache_key = binders_list_response_key(user_id, current_user.binders_version)
+        body = binders_list_responses.get(cache_key)
+        if body is None:
+            binder_service = BinderService(db)
+            binders = await binder_service.get_user_binders(user_id)
+            body = binders_list_responses.store(cache_key, binders)
+        return json_response(body, etag)
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des binders: {str(e)}")
         raise HTTPException(
@@ -51,9 +152,10 @@ async def create_binder(
             size=binder.size,
             description=binder.description,
             is_public=binder.is_public,
-            pages=binder.pages,
+            pages=binder.expanded_pages(),
             total_pages=len(binder.pages),
             total_cards=0,  # Nouveau binder, pas de cartes
+            version=binder.version,
             created_at=binder.created_at,
             updated_at=binder.updated_at
         )
@@ -64,16 +166,147 @@ async def create_binder(
             detail="Erreur lors de la création du binder"
         )
 
+@router.post("/templates/master-set", response_model=BinderResponse, status_code=status.HTTP_201_CREATED)
+async def create_master_set_binder(
+    template: MasterSetBinderCreate,
+    current_user: UserInDB = Depends(get_current_user),
+    db = Depends(get_database)
+):
+    """Crée un binder master set : un emplacement par carte de l'extension, rempli avec les cartes possédées"""
+    try:
+        binder_service = BinderService(db)
+        return await binder_service.create_master_set_binder(str(current_user.id), template)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Erreur lors de la création du binder master set: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur lors de la création du binder"
+        )
+
+@router.get("/changes")
+async def stream_binder_changes(
+    request: Request,
+    since: List[str] = Query(default=[], description="Versions connues des binders ouverts (<binder_id>:<version>)"),
+    last_event_id: Optional[str] = Header(None),
+    current_user: UserInDB = Depends(get_current_user),
+    db = Depends(get_database)
+):
+    """Flux SSE des modifications des binders de l'utilisateur (deltas de slots)
+
+    Les binders listés dans since (ou Last-Event-ID) sont d'abord rattrapés depuis le journal ;
+    un événement dont changes vaut null demande un rechargement complet du binder.
+    """
+    try:
+        known_versions = parse_known_versions(since, last_event_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    user_id = str(current_user.id)
+    session = BinderFeedSession(BinderService(db), user_id, known_versions)
+
+    async def events():
+        # Abonnement avant le rattrapage : aucune écriture ne passe entre les deux
+        async with change_feed.subscribe(user_id) as queue:
+            async for chunk in sse_stream(request, session, queue, BINDER_FEED_KEEPALIVE_SECONDS):
+                yield chunk
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/move", response_model=BinderCardMoved)
+async def move_card_between_binders(
+    move_data: MoveCardBetweenBinders,
+    current_user: UserInDB = Depends(get_current_user),
+    db = Depends(get_database)
+):
+    """Déplace une carte d'un binder à un autre en une seule écriture atomique
+
+    Seuls les deux slots modifiés sont renvoyés, avec la nouvelle version de chaque binder.
+    """
+    try:
+        binder_service = BinderService(db)
+        moved = await binder_service.move_card_between_binders(str(current_user.id), move_data)
+        
+        if not moved:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Binder non trouvé"
+            )
+        
+        return moved
+    except BinderVersionConflict as e:
+        # Les versions attendues du corps jouent le rôle de If-Match pour chaque binder
+        expected = move_data.source_version if e.binder_id == move_data.source_binder_id else move_data.destination_version
+        raise version_conflict(e.binder_id, e, binder_etag(e.binder_id, expected) if expected is not None else None)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur lors du déplacement de carte entre binders: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur lors du déplacement de la carte"
+        )
+
 @router.get("/{binder_id}", response_model=BinderResponse)
 async def get_binder(
     binder_id: str,
+    request: Request,
+    pages: Optional[str] = Query(None, pattern=r"^\d+(-\d+)?$", description="Plage de pages, ex: 3-4"),
+    around: Optional[int] = Query(None, ge=1, description="Page centrale de la fenêtre"),
+    window: int = Query(1, ge=0, description="Nombre de pages de part et d'autre de around"),
     current_user: UserInDB = Depends(get_current_user),
     db = Depends(get_database)
 ):
-    """Récupère un binder spécifique par son ID"""
+    """Récupère un binder spécifique par son ID (toutes les pages ou une fenêtre de pages)"""
     try:
+        try:
+            page_range = parse_page_range(pages, around, window)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
         binder_service = BinderService(db)
-        binder = await binder_service.get_binder_by_id(binder_id, str(current_user.id))
+        user_id = str(current_user.id)
+        
+        # Seule la version est lue avant tout enrichissement : requête conditionnelle et cache
+        version = await binder_service.get_binder_version(binder_id, user_id)
+        if version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Binder non trouvé"
+            )
+        etag = binder_etag(binder_id, version)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+        
+        # Binder inchangé depuis la dernière lecture de cette fenêtre : corps déjà encodé
+        body = binder_responses.get(binder_response_key(binder_id, version, page_range))
+        if body is not None:
+            return json_response(body, etag)
+        
+        # Un seul calcul par lecture identique en cours ; binders_version change à chaque écriture
+        # de binder de l'utilisateur, une lecture postérieure à une écriture ne partage donc rien d'antérieur
+        binder = await binder_reads.do(
+            (user_id, binder_id, page_range, current_user.binders_version),
+            lambda: binder_service.get_binder_by_id(binder_id, user_id, page_range)
+        )
         
         if not binder:
             raise HTTPException(
@@ -81,7 +314,9 @@ async def get_binder(
                 detail="Binder non trouvé"
             )
         
-        return binder
+        # Rangé sous la version réellement lue (une écriture a pu passer depuis get_binder_version)
+        body = binder_responses.store(binder_response_key(binder_id, binder.version, page_range), binder)
+        return json_response(body, binder_etag(binder_id, binder.version))
     except HTTPException:
         raise
     except Exception as e:
@@ -95,13 +330,16 @@ async def get_binder(
 async def update_binder(
     binder_id: str,
     update_data: BinderUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: UserInDB = Depends(get_current_user),
     db = Depends(get_database)
 ):
     """Met à jour un binder"""
     try:
         binder_service = BinderService(db)
-        binder = await binder_service.update_binder(binder_id, str(current_user.id), update_data)
+        expected_version = if_match_version(if_match, binder_id)
+        binder = await binder_service.update_binder(binder_id, str(current_user.id), update_data, expected_version)
         
         if not binder:
             raise HTTPException(
@@ -109,7 +347,10 @@ async def update_binder(
                 detail="Binder non trouvé"
             )
         
+        set_cache_headers(response, binder_etag(binder_id, binder.version))
         return binder
+    except BinderVersionConflict as e:
+        raise version_conflict(binder_id, e, if_match)
     except HTTPException:
         raise
     except Exception as e:
@@ -122,13 +363,16 @@ async def update_binder(
 @router.delete("/{binder_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_binder(
     binder_id: str,
+    if_match: Optional[str] = Header(None),
     current_user: UserInDB = Depends(get_current_user),
     db = Depends(get_database)
 ):
     """Supprime un binder"""
     try:
         binder_service = BinderService(db)
-        deleted = await binder_service.delete_binder(binder_id, str(current_user.id))
+        deleted = await binder_service.delete_binder(
+            binder_id, str(current_user.id), if_match_version(if_match, binder_id)
+        )
         
         if not deleted:
             raise HTTPException(
@@ -137,6 +381,8 @@ async def delete_binder(
             )
         
         return None
+    except BinderVersionConflict as e:
+        raise version_conflict(binder_id, e, if_match)
     except HTTPException:
         raise
     except Exception as e:
@@ -150,13 +396,16 @@ async def delete_binder(
 async def add_card_to_binder(
     binder_id: str,
     card_data: AddCardToBinder,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: UserInDB = Depends(get_current_user),
     db = Depends(get_database)
 ):
     """Ajoute une carte au binder"""
     try:
         binder_service = BinderService(db)
-        binder = await binder_service.add_card_to_binder(binder_id, str(current_user.id), card_data)
+        expected_version = if_match_version(if_match, binder_id)
+        binder = await binder_service.add_card_to_binder(binder_id, str(current_user.id), card_data, expected_version)
         
         if not binder:
             raise HTTPException(
@@ -164,7 +413,10 @@ async def add_card_to_binder(
                 detail="Binder non trouvé"
             )
         
+        set_cache_headers(response, binder_etag(binder_id, binder.version))
         return binder
+    except BinderVersionConflict as e:
+        raise version_conflict(binder_id, e, if_match)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -183,13 +435,16 @@ async def add_card_to_binder(
 async def remove_card_from_binder(
     binder_id: str,
     remove_data: RemoveCardFromBinder,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: UserInDB = Depends(get_current_user),
     db = Depends(get_database)
 ):
     """Retire une carte du binder"""
     try:
         binder_service = BinderService(db)
-        binder = await binder_service.remove_card_from_binder(binder_id, str(current_user.id), remove_data)
+        expected_version = if_match_version(if_match, binder_id)
+        binder = await binder_service.remove_card_from_binder(binder_id, str(current_user.id), remove_data, expected_version)
         
         if not binder:
             raise HTTPException(
@@ -197,7 +452,10 @@ async def remove_card_from_binder(
                 detail="Binder non trouvé"
             )
         
+        set_cache_headers(response, binder_etag(binder_id, binder.version))
         return binder
+    except BinderVersionConflict as e:
+        raise version_conflict(binder_id, e, if_match)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -215,13 +473,16 @@ async def remove_card_from_binder(
 @router.post("/{binder_id}/pages", response_model=BinderResponse)
 async def add_page_to_binder(
     binder_id: str,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: UserInDB = Depends(get_current_user),
     db = Depends(get_database)
 ):
     """Ajoute une nouvelle page au binder"""
     try:
         binder_service = BinderService(db)
-        binder = await binder_service.add_page_to_binder(binder_id, str(current_user.id))
+        expected_version = if_match_version(if_match, binder_id)
+        binder = await binder_service.add_page_to_binder(binder_id, str(current_user.id), expected_version)
         
         if not binder:
             raise HTTPException(
@@ -229,7 +490,10 @@ async def add_page_to_binder(
                 detail="Binder non trouvé"
             )
         
+        set_cache_headers(response, binder_etag(binder_id, binder.version))
         return binder
+    except BinderVersionConflict as e:
+        raise version_conflict(binder_id, e, if_match)
     except HTTPException:
         raise
     except Exception as e:
@@ -243,13 +507,16 @@ async def add_page_to_binder(
 async def move_card_in_binder(
     binder_id: str,
     move_data: MoveCardInBinder,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: UserInDB = Depends(get_current_user),
     db = Depends(get_database)
 ):
     """Déplace une carte dans le binder (drag & drop)"""
     try:
         binder_service = BinderService(db)
-        binder = await binder_service.move_card_in_binder(binder_id, str(current_user.id), move_data)
+        expected_version = if_match_version(if_match, binder_id)
+        binder = await binder_service.move_card_in_binder(binder_id, str(current_user.id), move_data, expected_version)
         
         if not binder:
             raise HTTPException(
@@ -257,7 +524,10 @@ async def move_card_in_binder(
                 detail="Binder non trouvé"
             )
         
+        set_cache_headers(response, binder_etag(binder_id, binder.version))
         return binder
+    except BinderVersionConflict as e:
+        raise version_conflict(binder_id, e, if_match)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -271,3 +541,76 @@ async def move_card_in_binder(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Erreur lors du déplacement de la carte"
         )
+
+@router.post("/{binder_id}/ops", response_model=BinderResponse)
+async def apply_binder_operations(
+    binder_id: str,
+    batch: BinderOperations,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user: UserInDB = Depends(get_current_user),
+    db = Depends(get_database)
+):
+    """Applique un lot d'opérations (add, remove, move, swap, add_page) en une seule écriture"""
+    try:
+        binder_service = BinderService(db)
+        expected_version = if_match_version(if_match, binder_id)
+        binder = await binder_service.apply_operations(binder_id, str(current_user.id), batch.operations, expected_version)
+        
+        if not binder:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Binder non trouvé"
+            )
+        
+        set_cache_headers(response, binder_etag(binder_id, binder.version))
+        return binder
+    except BinderVersionConflict as e:
+        raise version_conflict(binder_id, e, if_match)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur lors de l'application des opérations au binder {binder_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur lors de l'application des opérations"
+        )
+
+@router.post("/{binder_id}/reorganize", response_model=BinderResponse)
+async def reorganize_binder(
+    binder_id: str,
+    reorganize: ReorganizeBinder,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    current_user: UserInDB = Depends(get_current_user),
+    db = Depends(get_database)
+):
+    """Trie les cartes du binder (extension, rareté, nom, date d'ajout) et supprime les trous"""
+    try:
+        binder_service = BinderService(db)
+        expected_version = if_match_version(if_match, binder_id)
+        binder = await binder_service.reorganize_binder(binder_id, str(current_user.id), reorganize, expected_version)
+        
+        if not binder:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Binder non trouvé"
+            )
+        
+        set_cache_headers(response, binder_etag(binder_id, binder.version))
+        return binder
+    except BinderVersionConflict as e:
+        raise version_conflict(binder_id, e, if_match)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erreur lors de la réorganisation du binder {binder_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur lors de la réorganisation du binder"
+        )
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+
+from utils.loop_monitor import loop_monitor
+
+router = APIRouter()
+
+@router.get("/loop")
+async def get_loop_stalls():
+    """Lag de la boucle d'événements et derniers blocages avec leur pile d'appels"""
+    return loop_monitor.snapshot()
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from utils.health import check_loop, readiness_checker
+
+router = APIRouter()
+
+@router.get("/live")
+async def liveness():
+    """Le processus répond et sa boucle d'événements n'est pas bloquée"""
+    return {"status": "alive", "loop": await check_loop()}
+
+@router.get("/ready")
+async def readiness():
+    """L'instance peut recevoir du trafic (MongoDB, pool, boucle, initialisation)"""
+    result = await readiness_checker.check()
+    status_code = 200 if result["status"] == "ready" else 503
+    return JSONResponse(content=result, status_code=status_code)
@@ -1,19 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from typing import List
-from models.user_card import UserCardCreate, UserCardUpdate, UserCardResponse
+from models.user_card import UserCardCreate, UserCardUpdate, UserCardResponse, CardLocation
 from services.user_card_service import UserCardService
-from dependencies import get_current_active_user, get_user_card_service
+from services.version_service import BINDERS_VERSION
+from dependencies import get_cache, get_current_active_user, get_user_card_service
+from utils.cache import SharedCache, version_tag
+from utils.http_cache import cards_etag, etag_matches, not_modified, set_cache_headers
+from utils.single_flight import SingleFlight
 
 router = APIRouter()
 
+# Lectures concurrentes identiques de GET /user/cards regroupées par worker
+cards_reads = SingleFlight("get_user_cards")
+
 @router.get("/cards", response_model=List[UserCardResponse])
 async def get_user_cards(
+    request: Request,
+    response: Response,
     current_user = Depends(get_current_active_user),
     user_card_service: UserCardService = Depends(get_user_card_service)
 ):
     """Récupérer toutes les cartes de l'utilisateur connecté"""
     try:
-        cards = await user_card_service.get_user_cards(str(current_user.id))
+        # La version de la collection est portée par le document utilisateur déjà chargé
+        etag = cards_etag(str(current_user.id), current_user.cards_version)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+        
+        # Même version de collection : les requêtes concurrentes partagent une seule lecture
+        user_id = str(current_user.id)
+        cards = await cards_reads.do(
+            (user_id, current_user.cards_version),
+            lambda: user_card_service.get_user_cards(user_id)
+        )
+        set_cache_headers(response, etag)
         return cards
     except Exception as e:
         raise HTTPException(
@@ -75,6 +95,50 @@ async def get_user_card(
             detail=f"Erreur lors de la récupération de la carte: {str(e)}"
         )
 
+@router.get("/cards/{card_id}/locations", response_model=List[CardLocation])
+async def get_user_card_locations(
+    card_id: str,
+    current_user = Depends(get_current_active_user),
+    user_card_service: UserCardService = Depends(get_user_card_service),
+    shared_cache: SharedCache = Depends(get_cache)
+):
+    """Récupérer les binders et slots où la carte est rangée
+
+    Les emplacements ne changent qu'avec les binders : la réponse est mise en cache sous
+    la version des binders de l'utilisateur, et le tag correspondant est invalidé à chaque écriture.
+    """
+    try:
+        card = await user_card_service.get_user_card_by_id(card_id)
+        if not card:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Carte non trouvée"
+            )
+        
+        if card.user_id != str(current_user.id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Accès non autorisé à cette carte"
+            )
+        
+        user_id = str(current_user.id)
+
+        async def load_locations():
+            return [location.dict() for location in await user_card_service.get_card_locations(card_id, user_id)]
+
+        return await shared_cache.get_or_set(
+            f"card_locations:{user_id}:{current_user.binders_version}:{card_id}",
+            load_locations,
+            tags=[version_tag(BINDERS_VERSION, user_id)]
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de la récupération des emplacements: {str(e)}"
+        )
+
 @router.patch("/cards/{card_id}", response_model=UserCardResponse)
 async def update_user_card(
     card_id: str,
@@ -108,6 +172,11 @@ async def update_user_card(
         return result
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
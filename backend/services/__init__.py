@@ -2,3 +2,6 @@
 from services.user_service import UserService
 from services.user_card_service import UserCardService
 from services.binder_service import BinderService
+from services.version_service import VersionService
+from services.card_location_service import CardLocationService
+from services.change_feed import BinderChangeFeed, BinderFeedSession, change_feed
@@ -1,20 +1,396 @@
-from typing import List, Optional
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
 from models.binder import (
-    BinderInDB, BinderCreate, BinderUpdate, BinderResponse, BinderSummary,
-    AddCardToBinder, RemoveCardFromBinder, MoveCardInBinder, BinderPage, CardSlot
+    BinderInDB, BinderCreate, BinderUpdate, BinderResponse, BinderSummary, MasterSetBinderCreate,
+    AddCardToBinder, RemoveCardFromBinder, MoveCardInBinder, MoveCardBetweenBinders, BinderPage,
+    CardSlot, BinderSlotUpdate, BinderCardMoved,
+    BinderOperation, BinderOperationType, BinderSortKey, ReorganizeBinder,
+    SLOTS_PER_PAGE, page_cards, compact_page, expand_slots
 )
-from models.user_card import UserCardInDB
+from models.binder_grid import BinderGrid
+from database import supports_transactions
+from services.version_service import VersionService, BINDERS_VERSION, CARDS_VERSION
+from services.card_location_service import CardLocationService
+from services.change_feed import change_feed
 from datetime import datetime
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Nombre de cartes affichées en aperçu dans la liste des binders
+PREVIEW_SIZE = 4
+
+# Ordre des raretés pour le tri (anglais et français) ; les raretés inconnues viennent après
+RARITY_RANKS = {
+    rarity: rank for rank, names in enumerate([
+        ("common", "commune"),
+        ("uncommon", "peu commune"),
+        ("rare",),
+        ("rare holo", "holo rare"),
+        ("double rare", "rare holo ex", "rare holo gx", "rare holo v"),
+        ("ultra rare",),
+        ("illustration rare", "rare illustration"),
+        ("special illustration rare", "rare illustration spéciale"),
+        ("secret rare", "rare secrète", "hyper rare"),
+    ]) for rarity in names
+}
+
+# Nombre de modifications conservées dans le journal du binder (delta renvoyé en cas de conflit)
+CHANGE_LOG_SIZE = int(os.getenv("BINDER_CHANGE_LOG_SIZE", "200"))
+
+
+class BinderVersionConflict(Exception):
+    """Écriture refusée : le binder a été modifié depuis la version attendue"""
+
+    def __init__(self, current_version: int, changes: Optional[list], binder_id: Optional[str] = None):
+        super().__init__(f"Le binder a été modifié (version actuelle: {current_version})")
+        self.current_version = current_version
+        # Binder en conflit (utile quand une écriture touche plusieurs binders)
+        self.binder_id = binder_id
+        # None : le journal ne remonte pas assez loin, le client doit recharger le binder
+        self.changes = changes
+
+
+def _version_filter(version: int):
+    """Filtre sur la version ; les binders antérieurs au versioning n'ont pas le champ"""
+    return {"$in": [0, None]} if version == 0 else version
+
+
+def _card_count(binder: dict, pages: Dict[int, Dict[int, dict]]) -> int:
+    """Nombre de cartes de {page: {position: carte}} ; les emplacements réservés d'un master set sont exclus"""
+    if not binder.get("set_id"):
+        return sum(len(cards) for cards in pages.values())
+    return sum(1 for cards in pages.values() for card in cards.values() if card.get("user_card_id"))
+
+
+def _slot_change(page_number: int, position: int, slot: dict) -> dict:
+    return {
+        "op": "slot",
+        "page_number": page_number,
+        "position": position,
+        "card_id": slot.get("card_id"),
+        "user_card_id": slot.get("user_card_id")
+    }
+
+
+def _local_id_key(local_id: Optional[str]) -> tuple:
+    """Numéros locaux triés numériquement (« 2 » avant « 10 »), les numéros non numériques ensuite"""
+    local_id = local_id or ""
+    return (0, int(local_id), "") if local_id.isdigit() else (1, 0, local_id)
+
+
+def _card_sort_key(sort_by: List[BinderSortKey], user_card: dict) -> tuple:
+    key = []
+    for sort_key in sort_by:
+        if sort_key == BinderSortKey.SET:
+            key.extend((user_card.get("set_id") or "", _local_id_key(user_card.get("local_id"))))
+        elif sort_key == BinderSortKey.RARITY:
+            rarity = (user_card.get("rarity") or "").lower()
+            key.append((RARITY_RANKS.get(rarity, len(RARITY_RANKS)), rarity))
+        elif sort_key == BinderSortKey.NAME:
+            key.append((user_card.get("card_name") or "").casefold())
+        else:
+            key.append(user_card.get("created_at") or datetime.min)
+    return tuple(key)
+
+
 class BinderService:
     def __init__(self, database: AsyncIOMotorDatabase):
         self.database = database
         self.collection = database.binders
+        self.pages = database.binder_pages
+        self.versions = VersionService(database)
+        self.locations = CardLocationService(database)
+
+    async def _load_binder(self, binder_id: str, user_id: str, expected_version: Optional[int] = None, projection: Optional[dict] = None) -> Optional[dict]:
+        """Charge le binder (sans son journal) et vérifie la version attendue par le client (If-Match)"""
+        binder = await self.collection.find_one(
+            {"_id": ObjectId(binder_id), "user_id": ObjectId(user_id)},
+            projection or {"changes": 0}
+        )
+        if binder and expected_version is not None and binder.get("version", 0) != expected_version:
+            raise await self._conflict(binder_id, user_id, expected_version)
+        return binder
+
+    @staticmethod
+    def _page_count(binder: dict) -> int:
+        if "pages" in binder:
+            # Binder à pages embarquées (antérieur à la collection binder_pages)
+            return len(binder["pages"])
+        return binder.get("page_count", 0)
+
+    @staticmethod
+    def _embedded_pages(binder: dict) -> Dict[int, Dict[int, dict]]:
+        return {
+            page.get("page_number", idx): page_cards(page)
+            for idx, page in enumerate(binder.get("pages", []), start=1)
+        }
+
+    async def _load_pages(self, binder: dict, page_numbers: Optional[List[int]] = None) -> Dict[int, Dict[int, dict]]:
+        """Charge {page_number: {position: carte}} pour les pages demandées (toutes si None)
+
+        Une page sans document est une page vide.
+        """
+        if page_numbers is None:
+            page_numbers = list(range(1, self._page_count(binder) + 1))
+        pages = {page_number: {} for page_number in page_numbers}
+        if "pages" in binder:
+            embedded = self._embedded_pages(binder)
+            pages.update({n: embedded[n] for n in page_numbers if n in embedded})
+            return pages
+
+        query = {"binder_id": binder["_id"]}
+        if len(page_numbers) < self._page_count(binder):
+            query["page_number"] = {"$in": page_numbers}
+        cursor = self.pages.find(query, {"page_number": 1, "cards": 1}).sort("page_number", 1)
+        async for page in cursor:
+            if page["page_number"] in pages:
+                pages[page["page_number"]] = page_cards(page)
+        return pages
+
+    async def _first_free_page(self, binder: dict, slots_per_page: int) -> Optional[int]:
+        """Numéro de la première page ayant un slot libre (None si toutes sont pleines)"""
+        page_count = self._page_count(binder)
+        if "pages" in binder:
+            embedded = self._embedded_pages(binder)
+            full = {n for n, cards in embedded.items() if len(cards) >= slots_per_page}
+        else:
+            # Seuls les numéros des pages pleines sont lus
+            cursor = self.pages.find(
+                {"binder_id": binder["_id"], f"cards.{slots_per_page - 1}": {"$exists": True}},
+                {"page_number": 1}
+            )
+            full = {page["page_number"] async for page in cursor}
+        return next((n for n in range(1, page_count + 1) if n not in full), None)
+
+    async def _load_grid(self, binder: dict, page_numbers: Optional[List[int]] = None) -> BinderGrid:
+        """Grille du binder avec les pages demandées chargées (toutes si None)"""
+        page_count = self._page_count(binder)
+        if page_numbers is not None:
+            page_numbers = sorted({n for n in page_numbers if 1 <= n <= page_count})
+        pages = await self._load_pages(binder, page_numbers)
+        return BinderGrid.from_pages(
+            SLOTS_PER_PAGE.get(binder["size"], 9), page_count, pages, reservations=bool(binder.get("set_id"))
+        )
+
+    @staticmethod
+    def _grid_write(grid: BinderGrid, changes: Optional[List[dict]] = None) -> dict:
+        """Arguments d'écriture des pages modifiées de la grille, avec les slots touchés journalisés"""
+        changes = list(changes or [])
+        changes.extend({"op": "page_added", "page_number": n} for n in grid.added_pages)
+        changes.extend(
+            _slot_change(page_number, position, grid.get(page_number, position) or {})
+            for page_number, position in grid.dirty_slots
+        )
+        return {
+            "changes": changes,
+            "pages": grid.dirty_pages(),
+            "page_count": grid.page_count if grid.added_pages else None,
+            "card_delta": grid.card_delta,
+        }
+
+    async def _commit_grid(self, binder: dict, user_id: str, grid: BinderGrid, changes: Optional[List[dict]] = None, **kwargs):
+        """Écrit les pages modifiées de la grille et journalise les slots touchés"""
+        await self._commit(binder, user_id, **self._grid_write(grid, changes), **kwargs)
+
+    @asynccontextmanager
+    async def _write_session(self):
+        """Transaction si le déploiement la supporte (replica set), sinon écritures successives"""
+        client = getattr(self.database, "client", None)
+        if not supports_transactions(client):
+            yield None
+            return
+        async with await client.start_session() as session:
+            async with session.start_transaction():
+                yield session
+
+    async def _commit(
+        self,
+        binder: dict,
+        user_id: str,
+        changes: List[dict],
+        pages: Optional[Dict[int, Dict[int, dict]]] = None,
+        page_count: Optional[int] = None,
+        card_delta: int = 0,
+        fields: Optional[dict] = None,
+        reset: bool = False
+    ):
+        """Écrit une modification du binder : réserve la version suivante puis n'écrit que les pages touchées
+
+        La réservation est conditionnée à la version lue : un écrivain concurrent provoque un conflit.
+        reset supprime toutes les pages existantes avant d'écrire les pages fournies.
+        """
+        try:
+            async with self._write_session() as session:
+                deltas = await self._write(
+                    binder, user_id, changes, pages=pages, page_count=page_count,
+                    card_delta=card_delta, fields=fields, reset=reset, session=session
+                )
+        except OperationFailure as e:
+            if e.has_error_label("TransientTransactionError"):
+                raise await self._conflict(str(binder["_id"]), user_id, binder.get("version", 0))
+            raise
+
+        # Le compteur placed figure dans GET /user/cards : son ETag change aussi
+        await self.versions.bump(user_id, BINDERS_VERSION, *([CARDS_VERSION] if deltas else []))
+        change_feed.notify(user_id, str(binder["_id"]), binder.get("version", 0) + 1)
+
+    async def _write(
+        self,
+        binder: dict,
+        user_id: str,
+        changes: List[dict],
+        pages: Optional[Dict[int, Dict[int, dict]]] = None,
+        page_count: Optional[int] = None,
+        card_delta: int = 0,
+        fields: Optional[dict] = None,
+        reset: bool = False,
+        session=None,
+        enforce: bool = True
+    ) -> Dict[str, int]:
+        """Écritures d'une modification dans la session fournie ; retourne les variations du compteur placed
+
+        enforce contrôle la quantité des exemplaires placés (inutile pour un déplacement).
+        """
+        binder_id = binder["_id"]
+        version = binder.get("version", 0)
+        new_version = version + 1
+        pages = dict(pages or {})
+        if len(changes) > CHANGE_LOG_SIZE:
+            # Le journal ne contiendrait qu'une partie de la modification : le client doit recharger
+            changes = [{"op": "reset"}]
+        for change in changes:
+            change["version"] = new_version
+
+        update = {
+            "$set": {"version": new_version, "updated_at": datetime.utcnow(), **(fields or {})},
+            "$push": {"changes": {"$each": changes, "$slice": -CHANGE_LOG_SIZE}}
+        }
+        if "pages" in binder:
+            # Première écriture d'un binder à pages embarquées : elles passent dans binder_pages
+            if not reset:
+                pages = {**self._embedded_pages(binder), **pages}
+            update["$unset"] = {"pages": ""}
+            page_count = page_count if page_count is not None else len(binder["pages"])
+            update["$set"]["card_count"] = _card_count(binder, pages)
+        elif reset:
+            update["$set"]["card_count"] = _card_count(binder, pages)
+        elif card_delta:
+            update["$inc"] = {"card_count": card_delta}
+        if page_count is not None:
+            update["$set"]["page_count"] = page_count
+
+        deltas = {}
+        if reset or pages:
+            # Exemplaires placés réservés avant l'écriture ; pas de contrôle pour la
+            # conversion d'un binder à pages embarquées (antérieur au compteur)
+            deltas = await self.locations.placement_deltas(binder_id, pages, reset=reset, session=session)
+            await self.locations.apply_placements(user_id, deltas, enforce=enforce and "pages" not in binder, session=session)
+        try:
+            result = await self.collection.update_one(
+                {"_id": binder_id, "version": _version_filter(version)},
+                update,
+                session=session
+            )
+            if result.matched_count == 0:
+                # Écriture concurrente entre la lecture et la mise à jour
+                raise await self._conflict(str(binder_id), user_id, version)
+
+            if reset:
+                await self.pages.delete_many({"binder_id": binder_id}, session=session)
+            if pages:
+                await self.pages.bulk_write([
+                    UpdateOne(
+                        {"binder_id": binder_id, "page_number": page_number},
+                        {"$set": {"user_id": ObjectId(user_id), "cards": compact_page(page_number, cards)["cards"]}},
+                        upsert=True
+                    )
+                    for page_number, cards in sorted(pages.items())
+                ], ordered=False, session=session)
+            if reset or pages:
+                await self.locations.replace_pages(binder_id, user_id, pages, reset=reset, session=session)
+
+            if reset or "pages" in binder or self._touches_preview(binder, pages):
+                await self._refresh_preview(binder_id, new_version, bool(binder.get("set_id")), session)
+        except Exception:
+            if session is None:
+                # Sans transaction : rendre les exemplaires réservés
+                await self.locations.revert_placements(user_id, deltas)
+            raise
+        return deltas
+
+    @staticmethod
+    def _touches_preview(binder: dict, pages: Dict[int, Dict[int, dict]]) -> bool:
+        """L'aperçu ne dépend que des premières pages occupées"""
+        if not pages:
+            return False
+        if len(binder.get("preview_cards", [])) < PREVIEW_SIZE:
+            return True
+        return min(pages) <= binder.get("preview_through", 0)
+
+    async def _refresh_preview(self, binder_id: ObjectId, version: int, reservations: bool = False, session=None):
+        """Aperçu : premières cartes dans l'ordre des pages (hors emplacements réservés d'un master set)"""
+        preview_cards, preview_through = [], 0
+        query = {"binder_id": binder_id, "cards.0": {"$exists": True}}
+        if reservations:
+            # Les pages d'un master set sans carte possédée n'ont que des emplacements réservés
+            query = {"binder_id": binder_id, "cards": {"$elemMatch": {"user_card_id": {"$ne": None}}}}
+        cursor = self.pages.find(
+            query,
+            {"page_number": 1, "cards": 1},
+            session=session
+        ).sort("page_number", 1).limit(PREVIEW_SIZE)
+        async for page in cursor:
+            for card in page["cards"]:
+                if (not reservations or card.get("user_card_id")) and len(preview_cards) < PREVIEW_SIZE:
+                    preview_cards.append(card["card_id"])
+                    preview_through = page["page_number"]
+        await self.collection.update_one(
+            {"_id": binder_id, "version": version},
+            {"$set": {"preview_cards": preview_cards, "preview_through": preview_through}},
+            session=session
+        )
+
+    async def _conflict(self, binder_id: str, user_id: str, since_version: int) -> BinderVersionConflict:
+        delta = await self.get_changes_since(binder_id, user_id, since_version)
+        if delta is None:
+            return BinderVersionConflict(0, None, binder_id)
+        return BinderVersionConflict(delta["version"], delta["changes"], binder_id)
+
+    async def get_changes_since(self, binder_id: str, user_id: str, since_version: int) -> Optional[dict]:
+        """Retourne la version courante et les modifications postérieures à since_version
+
+        changes vaut None si le journal ne couvre pas tout l'intervalle (rechargement complet nécessaire).
+        """
+        binder_data = await self.collection.find_one(
+            {"_id": ObjectId(binder_id), "user_id": ObjectId(user_id)},
+            {"version": 1, "changes": 1}
+        )
+        if not binder_data:
+            return None
+        current_version = binder_data.get("version", 0)
+        if since_version < 0 or since_version > current_version:
+            return {"version": current_version, "changes": None}
+        changes = [c for c in binder_data.get("changes", []) if c.get("version", 0) > since_version]
+        # Chaque incrément de version journalise au moins une modification
+        if since_version < current_version and (not changes or changes[0]["version"] != since_version + 1):
+            changes = None
+        return {"version": current_version, "changes": changes}
+
+    async def get_binder_version(self, binder_id: str, user_id: str) -> Optional[int]:
+        """Retourne la version d'un binder (lecture indexée, sans les pages)"""
+        binder_data = await self.collection.find_one(
+            {"_id": ObjectId(binder_id), "user_id": ObjectId(user_id)},
+            {"version": 1}
+        )
+        if not binder_data:
+            return None
+        return binder_data.get("version", 0)
 
     async def create_binder(self, user_id: str, binder_data: BinderCreate) -> BinderInDB:
         """Crée un nouveau binder pour l'utilisateur"""
@@ -28,9 +404,10 @@ class BinderService:
             # Initialiser avec une page par défaut
             binder.initialize_pages(num_pages=1)
             
-            # Insérer en base
-            result = await self.collection.insert_one(binder.dict(by_alias=True))
+            # Insérer en base (une page vide n'a pas de document dans binder_pages)
+            result = await self.collection.insert_one(binder.to_document())
             binder.id = result.inserted_id
+            await self.versions.bump(user_id, BINDERS_VERSION)
             
             logger.info(f"Binder créé avec succès: {result.inserted_id} pour l'utilisateur {user_id}")
             return binder
@@ -39,23 +416,93 @@ class BinderService:
             logger.error(f"Erreur lors de la création du binder: {str(e)}")
             raise
 
+    async def create_master_set_binder(self, user_id: str, template: MasterSetBinderCreate) -> BinderResponse:
+        """Crée un binder avec un emplacement par carte de l'extension, dans l'ordre des numéros
+
+        Les cartes possédées sont placées (une seule requête sur user_cards), les autres
+        gardent un emplacement réservé (card_id sans user_card_id) rempli lors de leur ajout.
+        """
+        try:
+            # Catalogue trié par numéro local, sans doublon
+            catalog = []
+            for card in sorted(template.cards, key=lambda c: _local_id_key(c.local_id)):
+                if card.card_id not in catalog:
+                    catalog.append(card.card_id)
+            
+            # Seules les cartes ayant un exemplaire non placé remplissent leur emplacement
+            owned = {}
+            cursor = self.database.user_cards.find(
+                {"user_id": ObjectId(user_id), "card_id": {"$in": catalog}},
+                {"card_id": 1, "quantity": 1, "placed": 1}
+            ).sort("created_at", 1)
+            async for user_card in cursor:
+                if user_card.get("placed", 0) < user_card.get("quantity", 1):
+                    owned.setdefault(user_card["card_id"], str(user_card["_id"]))
+            
+            grid = BinderGrid.packed(
+                SLOTS_PER_PAGE.get(template.size, 9),
+                [{"card_id": card_id, "user_card_id": owned.get(card_id)} for card_id in catalog],
+                reservations=True
+            )
+            preview = [entry for entry in grid.cards_in_order() if grid.counts(entry[2])][:PREVIEW_SIZE]
+            binder = BinderInDB(
+                **template.dict(exclude={"cards"}),
+                user_id=ObjectId(user_id),
+                page_count=grid.page_count,
+                card_count=grid.card_delta,
+                preview_cards=[card["card_id"] for _, _, card in preview],
+                preview_through=preview[-1][0] if preview else 0
+            )
+            
+            # Le binder et toutes ses pages sont écrits ensemble (transaction si disponible)
+            async with self._write_session() as session:
+                await self.locations.apply_placements(user_id, {user_card_id: 1 for user_card_id in owned.values()}, session=session)
+                await self.collection.insert_one(binder.to_document(), session=session)
+                await self.pages.insert_many([
+                    {"binder_id": binder.id, "user_id": ObjectId(user_id), **compact_page(page_number, cards)}
+                    for page_number, cards in grid.dirty_pages().items()
+                ], ordered=False, session=session)
+                if owned:
+                    await self.locations.replace_pages(binder.id, user_id, grid.dirty_pages(), session=session)
+            await self.versions.bump(user_id, BINDERS_VERSION, *([CARDS_VERSION] if owned else []))
+            
+            logger.info(f"Binder master set créé: {binder.id} ({len(owned)}/{len(catalog)} cartes possédées)")
+            return await self.get_binder_by_id(str(binder.id), user_id)
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la création du binder master set: {str(e)}")
+            raise
+
+    async def _reserved_page(self, binder: dict, card_id: str) -> Optional[int]:
+        """Page contenant un emplacement réservé à card_id (binders master set uniquement)"""
+        if not binder.get("set_id") or "pages" in binder:
+            return None
+        page = await self.pages.find_one(
+            {"binder_id": binder["_id"], "cards": {"$elemMatch": {"card_id": card_id, "user_card_id": None}}},
+            {"page_number": 1},
+            sort=[("page_number", 1)]
+        )
+        return page["page_number"] if page else None
+
     async def get_user_binders(self, user_id: str) -> List[BinderSummary]:
         """Récupère tous les binders d'un utilisateur avec un résumé"""
         try:
-            cursor = self.collection.find({"user_id": ObjectId(user_id)})
+            # Les compteurs et l'aperçu sont portés par le document : aucune page n'est lue
+            cursor = self.collection.find({"user_id": ObjectId(user_id)}, {"changes": 0})
             binders_summary = []
             
             async for binder_data in cursor:
-                # Compter les cartes
-                total_cards = 0
-                preview_cards = []
-                
-                for page in binder_data.get("pages", []):
-                    for slot in page.get("slots", []):
-                        if slot.get("card_id"):
-                            total_cards += 1
-                            if len(preview_cards) < 4:  # Limiter à 4 cartes pour la preview
-                                preview_cards.append(slot["card_id"])
+                if "pages" in binder_data:
+                    # Binder à pages embarquées : compter les cartes
+                    cards = [
+                        card for _, page in sorted(self._embedded_pages(binder_data).items())
+                        for _, card in sorted(page.items())
+                    ]
+                    total_cards = len(cards)
+                    preview_cards = [card["card_id"] for card in cards[:PREVIEW_SIZE]]
+                else:
+                    total_cards = binder_data.get("card_count", 0)
+                    preview_cards = binder_data.get("preview_cards", [])
                 
                 binder_summary = BinderSummary(
                     id=str(binder_data["_id"]),
@@ -63,8 +510,9 @@ class BinderService:
                     size=binder_data["size"],
                     description=binder_data.get("description"),
                     is_public=binder_data.get("is_public", False),
-                    total_pages=len(binder_data.get("pages", [])),
+                    total_pages=self._page_count(binder_data),
                     total_cards=total_cards,
+                    version=binder_data.get("version", 0),
                     preview_cards=preview_cards,
                     created_at=binder_data["created_at"],
                     updated_at=binder_data["updated_at"]
@@ -77,52 +525,47 @@ class BinderService:
             logger.error(f"Erreur lors de la récupération des binders: {str(e)}")
             raise
 
-    async def get_binder_by_id(self, binder_id: str, user_id: str) -> Optional[BinderResponse]:
-        """Récupère un binder spécifique par son ID"""
+    async def get_binder_by_id(self, binder_id: str, user_id: str, page_range: Optional[Tuple[int, int]] = None) -> Optional[BinderResponse]:
+        """Récupère un binder spécifique par son ID
+
+        page_range (première, dernière page incluses) limite les pages lues, enrichies et
+        renvoyées ; total_pages et total_cards portent toujours sur le binder complet.
+        """
         try:
-            binder_data = await self.collection.find_one({
-                "_id": ObjectId(binder_id),
-                "user_id": ObjectId(user_id)
-            })
+            binder_data = await self.collection.find_one(
+                {"_id": ObjectId(binder_id), "user_id": ObjectId(user_id)},
+                {"changes": 0}
+            )
             
             if not binder_data:
                 return None
             
-            # Enrichir les slots avec les métadonnées des cartes
-            user_cards_collection = self.database.user_cards
-            total_cards = 0
-            
-            for page in binder_data.get("pages", []):
-                for slot in page.get("slots", []):
-                    if slot.get("card_id"):
-                        total_cards += 1
-                        # Récupérer les métadonnées de la carte depuis user_cards
-                        user_card_id = slot.get("user_card_id")
-                        if user_card_id:
-                            try:
-                                user_card = await user_cards_collection.find_one({
-                                    "_id": ObjectId(user_card_id)
-                                })
-                                if user_card:
-                                    slot["card_name"] = user_card.get("card_name", "")
-                                    slot["card_image"] = user_card.get("card_image", "")
-                                    slot["set_name"] = user_card.get("set_name", "")
-                                    slot["rarity"] = user_card.get("rarity", "")
-                            except Exception as e:
-                                logger.warning(f"Impossible de charger les métadonnées pour user_card_id {user_card_id}: {e}")
-            
-            # Valider et reconstruire les pages pour s'assurer que page_number existe
+            page_count = self._page_count(binder_data)
+            page_numbers = None
+            if page_range is not None:
+                first, last = page_range
+                page_numbers = list(range(max(first, 1), min(last, page_count) + 1))
+            pages = await self._load_pages(binder_data, page_numbers)
+            
+            if "pages" in binder_data:
+                total_cards = sum(len(cards) for cards in self._embedded_pages(binder_data).values())
+            else:
+                total_cards = binder_data.get("card_count", 0)
+            
+            # Développer la grille complète (format creux en base) des pages demandées
+            slots_per_page = SLOTS_PER_PAGE.get(binder_data["size"], 9)
             validated_pages = []
-            for idx, page_data in enumerate(binder_data.get("pages", []), start=1):
-                # S'assurer que page_number existe, sinon utiliser l'index
-                page_number = page_data.get("page_number", idx)
-                logger.info(f"Processing page {idx}: page_number from DB = {page_data.get('page_number')}, using {page_number}")
-                validated_pages.append(BinderPage(
-                    page_number=page_number,
-                    slots=page_data.get("slots", [])
-                ))
+            for page_number, cards in sorted(pages.items()):
+                slots = expand_slots(cards, slots_per_page)
+                validated_pages.append((page_number, slots))
             
-            logger.info(f"Validated {len(validated_pages)} pages for binder {binder_id}")
+            # Enrichir les slots occupés avec les métadonnées des cartes (une seule requête)
+            await self._enrich_slots([
+                slot for _, slots in validated_pages for slot in slots if slot.get("user_card_id")
+            ])
+            validated_pages = [BinderPage(page_number=n, slots=slots) for n, slots in validated_pages]
+            
+            logger.debug("Validated %s pages for binder %s", len(validated_pages), binder_id)
             
             binder_response = BinderResponse(
                 id=str(binder_data["_id"]),
@@ -132,20 +575,48 @@ class BinderService:
                 description=binder_data.get("description"),
                 is_public=binder_data.get("is_public", False),
                 pages=validated_pages,
-                total_pages=len(validated_pages),
+                total_pages=page_count,
                 total_cards=total_cards,
+                version=binder_data.get("version", 0),
                 created_at=binder_data["created_at"],
                 updated_at=binder_data["updated_at"]
             )
             
-            logger.info(f"Binder response created with {len(binder_response.pages)} pages")
+            logger.debug("Binder response created with %s pages", len(binder_response.pages))
             return binder_response
             
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du binder {binder_id}: {str(e)}")
             raise
 
-    async def update_binder(self, binder_id: str, user_id: str, update_data: BinderUpdate) -> Optional[BinderInDB]:
+    async def _enrich_slots(self, slots: List[dict]):
+        """Ajoute nom, image, set et rareté depuis user_cards aux slots occupés"""
+        user_card_ids = set()
+        for slot in slots:
+            try:
+                user_card_ids.add(ObjectId(slot["user_card_id"]))
+            except Exception as e:
+                logger.warning("Impossible de charger les métadonnées pour user_card_id %s: %s", slot["user_card_id"], e)
+        if not user_card_ids:
+            return
+        
+        user_cards = {}
+        cursor = self.database.user_cards.find(
+            {"_id": {"$in": list(user_card_ids)}},
+            {"card_name": 1, "card_image": 1, "set_name": 1, "rarity": 1}
+        )
+        async for user_card in cursor:
+            user_cards[str(user_card["_id"])] = user_card
+        
+        for slot in slots:
+            user_card = user_cards.get(slot["user_card_id"])
+            if user_card:
+                slot["card_name"] = user_card.get("card_name", "")
+                slot["card_image"] = user_card.get("card_image", "")
+                slot["set_name"] = user_card.get("set_name", "")
+                slot["rarity"] = user_card.get("rarity", "")
+
+    async def update_binder(self, binder_id: str, user_id: str, update_data: BinderUpdate, expected_version: Optional[int] = None) -> Optional[BinderInDB]:
         """Met à jour un binder"""
         try:
             # Préparer les données de mise à jour
@@ -158,56 +629,88 @@ class BinderService:
                 # Aucune mise à jour à effectuer
                 return await self.get_binder_by_id(binder_id, user_id)
             
-            # Ajouter la date de modification
-            update_dict["updated_at"] = datetime.utcnow()
+            existing_binder = await self._load_binder(binder_id, user_id, expected_version)
+            if not existing_binder:
+                return None
             
-            # Si la taille change, on doit réinitialiser les pages
-            if "size" in update_dict:
-                existing_binder = await self.collection.find_one({
-                    "_id": ObjectId(binder_id),
-                    "user_id": ObjectId(user_id)
-                })
-                
-                if existing_binder and existing_binder["size"] != update_dict["size"]:
-                    # Créer un binder temporaire pour initialiser les pages
-                    temp_binder = BinderInDB(
-                        name=existing_binder["name"],
-                        size=update_dict["size"],
-                        user_id=ObjectId(user_id)
-                    )
-                    temp_binder.initialize_pages(len(existing_binder.get("pages", [1])))
-                    update_dict["pages"] = [page.dict() for page in temp_binder.pages]
+            changes = [{"op": "metadata", "fields": dict(update_dict)}]
             
-            # Effectuer la mise à jour
-            result = await self.collection.update_one(
-                {"_id": ObjectId(binder_id), "user_id": ObjectId(user_id)},
-                {"$set": update_dict}
-            )
-            
-            if result.matched_count == 0:
-                return None
+            # Si la taille change, les cartes sont redistribuées sur la nouvelle grille
+            if "size" in update_dict and existing_binder["size"] != update_dict["size"]:
+                grid = await self._reflow(existing_binder, update_dict["size"])
+                # Toutes les pages changent : le client doit recharger le binder
+                changes.append({"op": "reset"})
+                await self._commit(
+                    existing_binder, user_id, changes,
+                    pages=grid.dirty_pages(), page_count=grid.page_count,
+                    fields=update_dict, reset=True
+                )
+            else:
+                await self._commit(existing_binder, user_id, changes, fields=update_dict)
             
             return await self.get_binder_by_id(binder_id, user_id)
             
+        except BinderVersionConflict:
+            raise
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour du binder {binder_id}: {str(e)}")
             raise
 
-    async def delete_binder(self, binder_id: str, user_id: str) -> bool:
-        """Supprime un binder"""
+    async def _reflow(self, binder: dict, new_size: str) -> BinderGrid:
+        """Range les cartes du binder sur une grille de la nouvelle taille, dans l'ordre de lecture"""
+        grid = await self._load_grid(binder)
+        cards = [card for _, _, card in grid.cards_in_order()]
+        return BinderGrid.packed(SLOTS_PER_PAGE.get(new_size, 9), cards, reservations=grid.reservations)
+
+    async def delete_binder(self, binder_id: str, user_id: str, expected_version: Optional[int] = None) -> bool:
+        """Supprime un binder et ses pages"""
         try:
-            result = await self.collection.delete_one({
-                "_id": ObjectId(binder_id),
-                "user_id": ObjectId(user_id)
-            })
+            query = {"_id": ObjectId(binder_id), "user_id": ObjectId(user_id)}
+            if expected_version is not None:
+                query["version"] = _version_filter(expected_version)
+            result = await self.collection.delete_one(query)
             
-            return result.deleted_count > 0
+            if result.deleted_count == 0:
+                if expected_version is not None and await self.get_binder_version(binder_id, user_id) is not None:
+                    raise await self._conflict(binder_id, user_id, expected_version)
+                return False
             
+            # Les exemplaires rangés dans ce binder redeviennent disponibles
+            deltas = await self.locations.placement_deltas(ObjectId(binder_id), {}, reset=True)
+            await self.pages.delete_many({"binder_id": ObjectId(binder_id)})
+            await self.locations.clear_binder(ObjectId(binder_id))
+            await self.locations.apply_placements(user_id, deltas, enforce=False)
+            await self.versions.bump(user_id, BINDERS_VERSION, *([CARDS_VERSION] if deltas else []))
+            change_feed.notify_deleted(user_id, binder_id)
+            return True
+            
+        except BinderVersionConflict:
+            raise
         except Exception as e:
             logger.error(f"Erreur lors de la suppression du binder {binder_id}: {str(e)}")
             raise
 
-    async def add_card_to_binder(self, binder_id: str, user_id: str, card_data: AddCardToBinder) -> Optional[BinderResponse]:
+    async def _place_card(self, binder: dict, card: dict, page_number: Optional[int], position: Optional[int]) -> Tuple[BinderGrid, Tuple[int, int]]:
+        """Place la carte dans la grille du binder ; seules les pages utiles sont chargées"""
+        if page_number is not None and position is not None:
+            # Placement manuel (la grille valide la page, la position et le slot libre)
+            grid = await self._load_grid(binder, [page_number])
+            slot = (page_number, position)
+            grid.place(*slot, card)
+        elif (reserved_page := await self._reserved_page(binder, card["card_id"])) is not None:
+            # Binder master set : la carte prend l'emplacement qui lui est réservé
+            grid = await self._load_grid(binder, [reserved_page])
+            slot = grid.reserved_slot(card["card_id"])
+            grid.place(*slot, card)
+        else:
+            # Placement automatique : seule la première page non pleine est chargée,
+            # une nouvelle page est ajoutée si toutes sont pleines
+            first_free = await self._first_free_page(binder, SLOTS_PER_PAGE.get(binder["size"], 9))
+            grid = await self._load_grid(binder, [first_free] if first_free else [])
+            slot = grid.place_first_free(card)
+        return grid, slot
+
+    async def add_card_to_binder(self, binder_id: str, user_id: str, card_data: AddCardToBinder, expected_version: Optional[int] = None) -> Optional[BinderResponse]:
         """Ajoute une carte au binder"""
         try:
             # Vérifier que la UserCard appartient bien à l'utilisateur
@@ -221,220 +724,354 @@ class BinderService:
                 raise ValueError("Carte utilisateur non trouvée ou non autorisée")
             
             # Récupérer le binder
-            binder = await self.collection.find_one({
-                "_id": ObjectId(binder_id),
-                "user_id": ObjectId(user_id)
-            })
+            binder = await self._load_binder(binder_id, user_id, expected_version)
             
             if not binder:
                 return None
             
-            # Déterminer la position d'insertion
-            if card_data.page_number is not None and card_data.position is not None:
-                # Placement manuel
-                page_index = card_data.page_number - 1
-                if page_index >= len(binder["pages"]):
-                    raise ValueError("Numéro de page invalide")
-                
-                page = binder["pages"][page_index]
-                if card_data.position >= len(page["slots"]):
-                    raise ValueError("Position invalide")
-                
-                # Vérifier que le slot est libre
-                if page["slots"][card_data.position]["card_id"]:
-                    raise ValueError("Ce slot est déjà occupé")
-                
-                # Placer la carte
-                page["slots"][card_data.position]["card_id"] = user_card["card_id"]
-                page["slots"][card_data.position]["user_card_id"] = str(user_card["_id"])
-                
-            else:
-                # Placement automatique - trouver le premier slot libre
-                placed = False
-                for page in binder["pages"]:
-                    for slot in page["slots"]:
-                        if not slot["card_id"]:
-                            slot["card_id"] = user_card["card_id"]
-                            slot["user_card_id"] = str(user_card["_id"])
-                            placed = True
-                            break
-                    if placed:
-                        break
-                
-                if not placed:
-                    # Créer une nouvelle page
-                    temp_binder = BinderInDB(
-                        name=binder["name"],
-                        size=binder["size"],
-                        user_id=ObjectId(user_id)
-                    )
-                    temp_binder.initialize_pages(1)
-                    new_page = temp_binder.pages[0]
-                    new_page.page_number = len(binder["pages"]) + 1
-                    new_page.slots[0].card_id = user_card["card_id"]
-                    new_page.slots[0].user_card_id = str(user_card["_id"])
-                    binder["pages"].append(new_page.dict())
+            card = {"card_id": user_card["card_id"], "user_card_id": str(user_card["_id"])}
+            grid, _ = await self._place_card(binder, card, card_data.page_number, card_data.position)
             
-            # Mettre à jour en base
-            await self.collection.update_one(
-                {"_id": ObjectId(binder_id)},
-                {
-                    "$set": {
-                        "pages": binder["pages"],
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-            )
+            # Mettre à jour en base (seule la page modifiée est écrite)
+            await self._commit_grid(binder, user_id, grid)
             
             return await self.get_binder_by_id(binder_id, user_id)
             
+        except BinderVersionConflict:
+            raise
         except Exception as e:
             logger.error(f"Erreur lors de l'ajout de carte au binder {binder_id}: {str(e)}")
             raise
 
-    async def remove_card_from_binder(self, binder_id: str, user_id: str, remove_data: RemoveCardFromBinder) -> Optional[BinderResponse]:
+    async def remove_card_from_binder(self, binder_id: str, user_id: str, remove_data: RemoveCardFromBinder, expected_version: Optional[int] = None) -> Optional[BinderResponse]:
         """Retire une carte du binder"""
         try:
             # Récupérer le binder
-            binder = await self.collection.find_one({
-                "_id": ObjectId(binder_id),
-                "user_id": ObjectId(user_id)
-            })
+            binder = await self._load_binder(binder_id, user_id, expected_version)
             
             if not binder:
                 return None
             
-            # Valider la page et la position
-            page_index = remove_data.page_number - 1
-            if page_index >= len(binder["pages"]):
-                raise ValueError("Numéro de page invalide")
-            
-            page = binder["pages"][page_index]
-            if remove_data.position >= len(page["slots"]):
-                raise ValueError("Position invalide")
-            
-            # Retirer la carte
-            page["slots"][remove_data.position]["card_id"] = None
-            page["slots"][remove_data.position]["user_card_id"] = None
+            # Retirer la carte (la grille valide la page et la position)
+            grid = await self._load_grid(binder, [remove_data.page_number])
+            grid.remove(remove_data.page_number, remove_data.position)
             
             # Mettre à jour en base
-            await self.collection.update_one(
-                {"_id": ObjectId(binder_id)},
-                {
-                    "$set": {
-                        "pages": binder["pages"],
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-            )
+            await self._commit_grid(binder, user_id, grid)
             
             return await self.get_binder_by_id(binder_id, user_id)
             
+        except BinderVersionConflict:
+            raise
         except Exception as e:
             logger.error(f"Erreur lors de la suppression de carte du binder {binder_id}: {str(e)}")
             raise
 
-    async def add_page_to_binder(self, binder_id: str, user_id: str) -> Optional[BinderResponse]:
+    async def add_page_to_binder(self, binder_id: str, user_id: str, expected_version: Optional[int] = None) -> Optional[BinderResponse]:
         """Ajoute une nouvelle page au binder"""
         try:
-            binder = await self.collection.find_one({
-                "_id": ObjectId(binder_id),
-                "user_id": ObjectId(user_id)
-            })
+            binder = await self._load_binder(binder_id, user_id, expected_version)
             
             if not binder:
                 return None
             
-            # Créer une nouvelle page
-            temp_binder = BinderInDB(
-                name=binder["name"],
-                size=binder["size"],
-                user_id=ObjectId(user_id)
-            )
-            temp_binder.initialize_pages(1)
-            new_page = temp_binder.pages[0]
-            new_page.page_number = len(binder["pages"]) + 1
-            
-            # Ajouter la page
-            binder["pages"].append(new_page.dict())
+            # Une page vide n'a pas de document : seul le compteur change
+            grid = await self._load_grid(binder, [])
+            grid.add_page()
             
             # Mettre à jour en base
-            await self.collection.update_one(
-                {"_id": ObjectId(binder_id)},
-                {
-                    "$set": {
-                        "pages": binder["pages"],
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-            )
+            await self._commit_grid(binder, user_id, grid)
             
             return await self.get_binder_by_id(binder_id, user_id)
             
+        except BinderVersionConflict:
+            raise
         except Exception as e:
             logger.error(f"Erreur lors de l'ajout de page au binder {binder_id}: {str(e)}")
             raise
 
-    async def move_card_in_binder(self, binder_id: str, user_id: str, move_data: MoveCardInBinder) -> Optional[BinderResponse]:
+    async def move_card_in_binder(self, binder_id: str, user_id: str, move_data: MoveCardInBinder, expected_version: Optional[int] = None) -> Optional[BinderResponse]:
         """Déplace une carte dans le binder (drag & drop)"""
         try:
             # Récupérer le binder
-            binder = await self.collection.find_one({
-                "_id": ObjectId(binder_id),
-                "user_id": ObjectId(user_id)
-            })
+            binder = await self._load_binder(binder_id, user_id, expected_version)
             
             if not binder:
                 return None
             
-            # Valider les paramètres de déplacement
-            source_page_index = move_data.source_page - 1
-            dest_page_index = move_data.destination_page - 1
+            # Seules les pages source et destination sont chargées ; la grille valide
+            # les pages, les positions, la carte source et la destination libre
+            grid = await self._load_grid(binder, [move_data.source_page, move_data.destination_page])
+            grid.move(
+                move_data.source_page, move_data.source_position,
+                move_data.destination_page, move_data.destination_position
+            )
             
-            if (source_page_index >= len(binder["pages"]) or 
-                dest_page_index >= len(binder["pages"]) or
-                source_page_index < 0 or dest_page_index < 0):
-                raise ValueError("Numéro de page invalide")
+            # Mettre à jour en base
+            await self._commit_grid(binder, user_id, grid)
             
-            source_page = binder["pages"][source_page_index]
-            dest_page = binder["pages"][dest_page_index]
+            return await self.get_binder_by_id(binder_id, user_id)
             
-            if (move_data.source_position >= len(source_page["slots"]) or
-                move_data.destination_position >= len(dest_page["slots"]) or
-                move_data.source_position < 0 or move_data.destination_position < 0):
-                raise ValueError("Position invalide")
+        except BinderVersionConflict:
+            raise
+        except Exception as e:
+            logger.error(f"Erreur lors du déplacement de carte dans le binder {binder_id}: {str(e)}")
+            raise
+
+    async def move_card_between_binders(self, user_id: str, move_data: MoveCardBetweenBinders) -> Optional[BinderCardMoved]:
+        """Déplace une carte d'un binder à un autre
+
+        Les deux binders sont écrits dans une même transaction quand le déploiement la supporte.
+        Sinon la destination est écrite en premier et la carte en est retirée si l'écriture de la
+        source échoue : une panne entre les deux écritures ne fait jamais disparaître la carte.
+        """
+        if move_data.source_binder_id == move_data.destination_binder_id:
+            raise ValueError("Les binders source et destination sont identiques")
+        try:
+            source = await self._load_binder(move_data.source_binder_id, user_id, move_data.source_version)
+            destination = await self._load_binder(move_data.destination_binder_id, user_id, move_data.destination_version)
+            
+            if not source or not destination:
+                return None
             
-            # Vérifier qu'il y a une carte à la position source
-            source_slot = source_page["slots"][move_data.source_position]
-            if not source_slot["card_id"]:
+            source_grid = await self._load_grid(source, [move_data.source_page])
+            card = source_grid.get(move_data.source_page, move_data.source_position)
+            if not card or not card.get("user_card_id"):
+                # Un emplacement réservé de master set n'est pas une carte possédée
                 raise ValueError("Aucune carte à la position source")
+            source_grid.remove(move_data.source_page, move_data.source_position)
+            destination_grid, slot = await self._place_card(
+                destination, card, move_data.destination_page, move_data.destination_position
+            )
             
-            # Vérifier que la destination est libre
-            dest_slot = dest_page["slots"][move_data.destination_position]
-            if dest_slot["card_id"]:
-                raise ValueError("La position de destination est déjà occupée")
+            try:
+                async with self._write_session() as session:
+                    # Le nombre d'exemplaires placés ne change pas : pas de contrôle de quantité
+                    await self._write(destination, user_id, **self._grid_write(destination_grid), session=session, enforce=False)
+                    try:
+                        await self._write(source, user_id, **self._grid_write(source_grid), session=session, enforce=False)
+                    except Exception:
+                        if session is None:
+                            await self._remove_slots(move_data.destination_binder_id, user_id, card["user_card_id"], [slot])
+                        raise
+            except OperationFailure as e:
+                if e.has_error_label("TransientTransactionError"):
+                    raise await self._conflict(move_data.source_binder_id, user_id, source.get("version", 0))
+                raise
             
-            # Effectuer le déplacement
-            dest_slot["card_id"] = source_slot["card_id"]
-            dest_slot["user_card_id"] = source_slot["user_card_id"]
+            await self.versions.bump(user_id, BINDERS_VERSION)
+            change_feed.notify(user_id, move_data.destination_binder_id, destination.get("version", 0) + 1)
+            change_feed.notify(user_id, move_data.source_binder_id, source.get("version", 0) + 1)
             
-            # Vider la position source
-            source_slot["card_id"] = None
-            source_slot["user_card_id"] = None
+            moved = {"position": slot[1], **card}
+            await self._enrich_slots([moved])
+            return BinderCardMoved(
+                source=BinderSlotUpdate(
+                    binder_id=move_data.source_binder_id,
+                    version=source.get("version", 0) + 1,
+                    page_number=move_data.source_page,
+                    slot=CardSlot(position=move_data.source_position)
+                ),
+                destination=BinderSlotUpdate(
+                    binder_id=move_data.destination_binder_id,
+                    version=destination.get("version", 0) + 1,
+                    page_number=slot[0],
+                    slot=CardSlot(**moved)
+                )
+            )
             
-            # Mettre à jour en base
-            await self.collection.update_one(
-                {"_id": ObjectId(binder_id)},
-                {
-                    "$set": {
-                        "pages": binder["pages"],
-                        "updated_at": datetime.utcnow()
-                    }
-                }
+        except BinderVersionConflict:
+            raise
+        except Exception as e:
+            logger.error(f"Erreur lors du déplacement de carte entre les binders {move_data.source_binder_id} et {move_data.destination_binder_id}: {str(e)}")
+            raise
+
+    @staticmethod
+    def _operation_pages(operations: List[BinderOperation]) -> Optional[List[int]]:
+        """Pages à charger pour un lot (None : toutes, un placement automatique doit voir tout le binder)"""
+        page_numbers = set()
+        for operation in operations:
+            if operation.op == BinderOperationType.ADD and (operation.page_number is None or operation.position is None):
+                return None
+            page_numbers.update(
+                n for n in (operation.page_number, operation.source_page, operation.destination_page) if n is not None
             )
+        return sorted(page_numbers)
+
+    @staticmethod
+    def _required(operation: BinderOperation, *fields: str) -> list:
+        missing = [field for field in fields if getattr(operation, field) is None]
+        if missing:
+            raise ValueError(f"Champs manquants: {', '.join(missing)}")
+        return [getattr(operation, field) for field in fields]
+
+    def _apply_operation(self, grid: BinderGrid, operation: BinderOperation, user_cards: Dict[str, dict], reserved: bool = False):
+        if operation.op == BinderOperationType.ADD:
+            user_card_id, = self._required(operation, "user_card_id")
+            user_card = user_cards.get(user_card_id)
+            if not user_card:
+                raise ValueError("Carte utilisateur non trouvée ou non autorisée")
+            card = {"card_id": user_card["card_id"], "user_card_id": user_card_id}
+            if operation.page_number is not None and operation.position is not None:
+                grid.place(operation.page_number, operation.position, card)
+            elif reserved and (slot := grid.reserved_slot(card["card_id"])):
+                grid.place(*slot, card)
+            else:
+                grid.place_first_free(card)
+        elif operation.op == BinderOperationType.REMOVE:
+            grid.remove(*self._required(operation, "page_number", "position"))
+        elif operation.op == BinderOperationType.ADD_PAGE:
+            grid.add_page()
+        else:
+            slots = self._required(operation, "source_page", "source_position", "destination_page", "destination_position")
+            if operation.op == BinderOperationType.MOVE:
+                grid.move(*slots)
+            else:
+                grid.swap(*slots)
+
+    async def apply_operations(self, binder_id: str, user_id: str, operations: List[BinderOperation], expected_version: Optional[int] = None) -> Optional[BinderResponse]:
+        """Applique un lot d'opérations dans l'ordre puis écrit le résultat en une seule modification
+
+        Tout le lot est validé sur la grille en mémoire avant l'écriture : une opération
+        invalide rejette le lot entier (ValueError indiquant son numéro).
+        """
+        try:
+            binder = await self._load_binder(binder_id, user_id, expected_version)
+            
+            if not binder:
+                return None
+            
+            # Vérifier en une seule requête que les UserCards ajoutées appartiennent à l'utilisateur
+            user_cards = {}
+            user_card_ids = set()
+            for operation in operations:
+                if operation.op == BinderOperationType.ADD and operation.user_card_id and ObjectId.is_valid(operation.user_card_id):
+                    user_card_ids.add(ObjectId(operation.user_card_id))
+            if user_card_ids:
+                cursor = self.database.user_cards.find(
+                    {"_id": {"$in": list(user_card_ids)}, "user_id": ObjectId(user_id)},
+                    {"card_id": 1}
+                )
+                async for user_card in cursor:
+                    user_cards[str(user_card["_id"])] = user_card
+            
+            grid = await self._load_grid(binder, self._operation_pages(operations))
+            for index, operation in enumerate(operations, start=1):
+                try:
+                    self._apply_operation(grid, operation, user_cards, reserved=bool(binder.get("set_id")))
+                except ValueError as e:
+                    raise ValueError(f"Opération {index} ({operation.op.value}): {e}")
+            
+            # Une seule écriture pour tout le lot : seules les pages modifiées sont réécrites
+            await self._commit_grid(binder, user_id, grid)
             
             return await self.get_binder_by_id(binder_id, user_id)
             
+        except BinderVersionConflict:
+            raise
         except Exception as e:
-            logger.error(f"Erreur lors du déplacement de carte dans le binder {binder_id}: {str(e)}")
+            logger.error(f"Erreur lors de l'application des opérations au binder {binder_id}: {str(e)}")
+            raise
+
+    async def reorganize_binder(self, binder_id: str, user_id: str, reorganize: ReorganizeBinder, expected_version: Optional[int] = None) -> Optional[BinderResponse]:
+        """Trie les cartes du binder et les range sans trou, en une seule écriture
+
+        Sans clé de tri, l'ordre de lecture est conservé (compaction). Les cartes sans
+        métadonnées (UserCard supprimée) sont placées à la fin. Les pages vides en fin de
+        binder sont conservées.
+        """
+        try:
+            binder = await self._load_binder(binder_id, user_id, expected_version)
+            
+            if not binder:
+                return None
+            
+            grid = await self._load_grid(binder)
+            cards = [card for _, _, card in grid.cards_in_order()]
+            
+            if reorganize.sort_by:
+                # Métadonnées de toutes les cartes en une seule requête
+                user_cards = {}
+                user_card_ids = [ObjectId(c["user_card_id"]) for c in cards if ObjectId.is_valid(c.get("user_card_id") or "")]
+                cursor = self.database.user_cards.find(
+                    {"_id": {"$in": user_card_ids}, "user_id": ObjectId(user_id)},
+                    {"set_id": 1, "local_id": 1, "rarity": 1, "card_name": 1, "created_at": 1}
+                )
+                async for user_card in cursor:
+                    user_cards[str(user_card["_id"])] = user_card
+                
+                known = [c for c in cards if c.get("user_card_id") in user_cards]
+                unknown = [c for c in cards if c.get("user_card_id") not in user_cards]
+                # Tri stable : à clés égales, l'ordre de lecture actuel est conservé
+                known.sort(
+                    key=lambda c: _card_sort_key(reorganize.sort_by, user_cards[c["user_card_id"]]),
+                    reverse=reorganize.descending
+                )
+                cards = known + unknown
+            
+            layout = BinderGrid.packed(grid.slots_per_page, cards, min_pages=grid.page_count, reservations=grid.reservations)
+            
+            # Seules les pages dont le contenu change sont réécrites
+            pages = {}
+            changes = []
+            for page_number in range(1, layout.page_count + 1):
+                before, after = grid.page_cards(page_number), layout.page_cards(page_number)
+                if before != after:
+                    pages[page_number] = after
+                    changes.extend(
+                        _slot_change(page_number, position, after.get(position, {}))
+                        for position in sorted(set(before) | set(after))
+                        if before.get(position) != after.get(position)
+                    )
+            
+            if changes:
+                await self._commit(binder, user_id, changes, pages=pages)
+            
+            return await self.get_binder_by_id(binder_id, user_id)
+            
+        except BinderVersionConflict:
             raise
+        except Exception as e:
+            logger.error(f"Erreur lors de la réorganisation du binder {binder_id}: {str(e)}")
+            raise
+
+    async def remove_user_card_everywhere(self, user_id: str, user_card_id: str, max_attempts: int = 3) -> int:
+        """Retire une UserCard supprimée de tous les binders où l'index la situe
+
+        Seules les pages concernées sont lues et réécrites ; dans un binder master set,
+        l'emplacement redevient réservé. Retourne le nombre de slots libérés.
+        """
+        by_binder: Dict[ObjectId, List[Tuple[int, int]]] = {}
+        for location in await self.locations.get_locations(user_card_id, user_id):
+            by_binder.setdefault(location["binder_id"], []).append((location["page_number"], location["position"]))
+        
+        removed = 0
+        for binder_id, slots in by_binder.items():
+            for attempt in range(max_attempts):
+                try:
+                    removed += await self._remove_slots(str(binder_id), user_id, user_card_id, slots)
+                    break
+                except BinderVersionConflict:
+                    # Écriture concurrente sur ce binder : relire et recommencer
+                    if attempt == max_attempts - 1:
+                        logger.warning(f"Binder {binder_id} modifié pendant le retrait de la carte {user_card_id}")
+        return removed
+
+    async def _remove_slots(self, binder_id: str, user_id: str, user_card_id: str, slots: List[Tuple[int, int]]) -> int:
+        binder = await self._load_binder(binder_id, user_id)
+        if not binder:
+            return 0
+        grid = await self._load_grid(binder, [page_number for page_number, _ in slots])
+        removed = 0
+        for page_number, position in slots:
+            if not 1 <= page_number <= grid.page_count or not 0 <= position < grid.slots_per_page:
+                continue
+            card = grid.get(page_number, position)
+            # L'index peut être en retard sur le binder : ne retirer que la carte attendue
+            if not card or card["user_card_id"] != user_card_id:
+                continue
+            grid.remove(page_number, position)
+            removed += 1
+        if removed:
+            await self._commit_grid(binder, user_id, grid)
+        return removed
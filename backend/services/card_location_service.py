@@ -0,0 +1,99 @@
+"""
+Index inverse des emplacements : user_card_id -> (binder, page, position)
+
+Maintenu par BinderService à chaque écriture de pages, dans la même session que
+l'écriture du binder, pour répondre à « où est rangée cette carte ? » sans lire les binders.
+Le compteur placed des user_cards (exemplaires rangés) est tenu à jour avec l'index.
+"""
+from collections import Counter
+from typing import Dict, List, Optional
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import DeleteMany, InsertOne
+
+
+class CardLocationService:
+    def __init__(self, database: AsyncIOMotorDatabase):
+        self.collection = database.card_locations
+        self.user_cards = database.user_cards
+
+    @staticmethod
+    def _scope(binder_id: ObjectId, pages: Dict[int, Dict[int, dict]], reset: bool) -> dict:
+        scope = {"binder_id": binder_id}
+        if not reset:
+            scope["page_number"] = {"$in": sorted(pages)}
+        return scope
+
+    async def replace_pages(self, binder_id: ObjectId, user_id: str, pages: Dict[int, Dict[int, dict]], reset: bool = False, session=None):
+        """Remplace les emplacements des pages réécrites (de tout le binder si reset)"""
+        operations = [DeleteMany(self._scope(binder_id, pages, reset))]
+        for page_number, cards in sorted(pages.items()):
+            for position, card in sorted(cards.items()):
+                user_card_id = card.get("user_card_id")
+                # Les emplacements réservés (sans UserCard) ne sont pas indexés
+                if user_card_id and ObjectId.is_valid(user_card_id):
+                    operations.append(InsertOne({
+                        "user_card_id": ObjectId(user_card_id),
+                        "user_id": ObjectId(user_id),
+                        "binder_id": binder_id,
+                        "page_number": page_number,
+                        "position": position
+                    }))
+        await self.collection.bulk_write(operations, ordered=True, session=session)
+
+    async def placement_deltas(self, binder_id: ObjectId, pages: Dict[int, Dict[int, dict]], reset: bool = False, session=None) -> Dict[str, int]:
+        """Variation du nombre d'exemplaires placés par UserCard si ces pages sont réécrites"""
+        deltas = Counter()
+        cursor = self.collection.find(self._scope(binder_id, pages, reset), {"user_card_id": 1}, session=session)
+        async for location in cursor:
+            deltas[str(location["user_card_id"])] -= 1
+        for cards in pages.values():
+            for card in cards.values():
+                user_card_id = card.get("user_card_id")
+                if user_card_id and ObjectId.is_valid(user_card_id):
+                    deltas[user_card_id] += 1
+        return {user_card_id: delta for user_card_id, delta in deltas.items() if delta}
+
+    async def apply_placements(self, user_id: str, deltas: Dict[str, int], enforce: bool = True, session=None):
+        """Applique les variations du compteur placed
+
+        Avec enforce, une hausse n'est appliquée que s'il reste assez d'exemplaires
+        (placed + delta <= quantity), sinon ValueError. Hors transaction, les variations
+        déjà appliquées sont annulées avant de lever l'erreur.
+        """
+        applied = {}
+        try:
+            # Les baisses d'abord : un déplacement entre binders libère avant de réserver
+            for user_card_id, delta in sorted(deltas.items(), key=lambda item: item[1]):
+                query = {"_id": ObjectId(user_card_id), "user_id": ObjectId(user_id)}
+                if enforce and delta > 0:
+                    query["$expr"] = {"$lte": [
+                        {"$add": [{"$ifNull": ["$placed", 0]}, delta]},
+                        {"$ifNull": ["$quantity", 1]}
+                    ]}
+                result = await self.user_cards.update_one(query, {"$inc": {"placed": delta}}, session=session)
+                if enforce and delta > 0 and result.matched_count == 0:
+                    raise ValueError("Tous les exemplaires de cette carte sont déjà placés dans des binders")
+                applied[user_card_id] = delta
+        except Exception:
+            if session is None and applied:
+                await self.revert_placements(user_id, applied)
+            raise
+
+    async def revert_placements(self, user_id: str, deltas: Optional[Dict[str, int]]):
+        """Annule des variations appliquées hors transaction (écriture du binder échouée)"""
+        for user_card_id, delta in (deltas or {}).items():
+            await self.user_cards.update_one(
+                {"_id": ObjectId(user_card_id), "user_id": ObjectId(user_id)},
+                {"$inc": {"placed": -delta}}
+            )
+
+    async def clear_binder(self, binder_id: ObjectId, session=None):
+        await self.collection.delete_many({"binder_id": binder_id}, session=session)
+
+    async def get_locations(self, user_card_id: str, user_id: str) -> List[dict]:
+        cursor = self.collection.find(
+            {"user_card_id": ObjectId(user_card_id), "user_id": ObjectId(user_id)},
+            {"_id": 0, "binder_id": 1, "page_number": 1, "position": 1}
+        ).sort([("binder_id", 1), ("page_number", 1), ("position", 1)])
+        return [location async for location in cursor]
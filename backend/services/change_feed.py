@@ -0,0 +1,162 @@
+"""
+Flux des modifications de binders par utilisateur (Server-Sent Events)
+
+Chaque écriture d'un binder produit une notification (binder_id, version). Sur un replica
+set, un change stream MongoDB alimente le flux avec les écritures de toutes les instances
+de l'API ; sinon BinderService publie en mémoire après chaque écriture. Les deltas de slots
+envoyés aux clients sont lus dans le journal du binder (get_changes_since) : une connexion
+rattrape ainsi les versions manquées à la reconnexion, et une notification reçue deux fois
+(change stream et publication locale) n'est envoyée qu'une fois.
+
+Les suppressions ne sont publiées qu'en mémoire : l'événement delete du change stream ne
+contient pas le propriétaire du binder.
+"""
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+from database import supports_transactions
+
+logger = logging.getLogger(__name__)
+
+# Notifications en attente par connexion ; au-delà, la connexion se resynchronise sur le journal
+BINDER_FEED_QUEUE_SIZE = int(os.getenv("BINDER_FEED_QUEUE_SIZE", "100"))
+CHANGE_STREAM_RETRY_SECONDS = float(os.getenv("CHANGE_STREAM_RETRY_SECONDS", "1"))
+
+# Seules les réservations de version intéressent le flux (pas la mise à jour de l'aperçu)
+CHANGE_STREAM_PIPELINE = [
+    {"$match": {"operationType": "update", "updateDescription.updatedFields.version": {"$exists": True}}},
+    {"$project": {"documentKey": 1, "fullDocument.user_id": 1, "updateDescription.updatedFields.version": 1}},
+]
+
+
+class BinderChangeFeed:
+    """Pub/sub des notifications de modification, par utilisateur"""
+
+    def __init__(self, queue_size: int = BINDER_FEED_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def watching(self) -> bool:
+        """Un change stream alimente le flux (la publication locale est alors inutile)"""
+        return self._task is not None and not self._task.done()
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: str) -> AsyncIterator[asyncio.Queue]:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(user_id, set())
+            queues.discard(queue)
+            if not queues:
+                self._subscribers.pop(user_id, None)
+
+    def publish(self, user_id: str, event: dict):
+        for queue in list(self._subscribers.get(user_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Connexion trop lente : ses notifications sont remplacées par un rattrapage complet
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"resync": True})
+
+    def notify(self, user_id: str, binder_id: str, version: int):
+        """Publication locale d'une écriture, sauf si le change stream s'en charge"""
+        if not self.watching:
+            self.publish(user_id, {"binder_id": binder_id, "version": version})
+
+    def notify_deleted(self, user_id: str, binder_id: str):
+        self.publish(user_id, {"binder_id": binder_id, "deleted": True})
+
+    async def start(self, database):
+        """Démarre le change stream si le déploiement le permet (replica set requis)"""
+        if self.watching or not supports_transactions(getattr(database, "client", None)):
+            return
+        self._task = asyncio.create_task(self._watch(database))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self, database):
+        resume_token = None
+        while True:
+            try:
+                async with database.binders.watch(
+                    CHANGE_STREAM_PIPELINE, full_document="updateLookup", resume_after=resume_token
+                ) as stream:
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self._dispatch(change)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Change stream des binders interrompu: %s", e)
+                await asyncio.sleep(CHANGE_STREAM_RETRY_SECONDS)
+
+    def _dispatch(self, change: dict):
+        document = change.get("fullDocument") or {}
+        if "user_id" not in document:
+            # Binder supprimé entre l'écriture et la lecture du document
+            return
+        self.publish(str(document["user_id"]), {
+            "binder_id": str(change["documentKey"]["_id"]),
+            "version": change["updateDescription"]["updatedFields"]["version"],
+        })
+
+
+class BinderFeedSession:
+    """État d'une connexion au flux : dernière version envoyée pour chaque binder suivi"""
+
+    def __init__(self, binder_service, user_id: str, known_versions: Optional[Dict[str, int]] = None):
+        self.binder_service = binder_service
+        self.user_id = user_id
+        self.known_versions = dict(known_versions or {})
+
+    async def catch_up(self) -> List[dict]:
+        """Modifications manquées par le client depuis les versions qu'il connaît"""
+        events = []
+        for binder_id, version in list(self.known_versions.items()):
+            events.extend(await self._delta(binder_id, version))
+        return events
+
+    async def handle(self, notification: dict) -> List[dict]:
+        if notification.get("resync"):
+            return await self.catch_up()
+        binder_id = notification["binder_id"]
+        if notification.get("deleted"):
+            self.known_versions.pop(binder_id, None)
+            return [{"binder_id": binder_id, "deleted": True}]
+        # Binder pas encore suivi : seule la modification notifiée est envoyée
+        since = self.known_versions.get(binder_id, notification["version"] - 1)
+        if notification["version"] <= since:
+            # Déjà envoyée (rattrapage ou double notification)
+            return []
+        return await self._delta(binder_id, since)
+
+    async def _delta(self, binder_id: str, since: int) -> List[dict]:
+        delta = await self.binder_service.get_changes_since(binder_id, self.user_id, since)
+        if delta is None:
+            # Binder supprimé ou appartenant à un autre utilisateur
+            self.known_versions.pop(binder_id, None)
+            return []
+        if delta["version"] == since:
+            return []
+        self.known_versions[binder_id] = delta["version"]
+        # changes vaut None si le journal ne remonte pas assez loin : le client recharge le binder
+        return [{"binder_id": binder_id, "version": delta["version"], "changes": delta["changes"]}]
+
+
+change_feed = BinderChangeFeed()
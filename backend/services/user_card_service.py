@@ -1,13 +1,21 @@
 from typing import List, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from models.user_card import UserCardCreate, UserCardInDB, UserCardUpdate, UserCardResponse
+from models.user_card import UserCardCreate, UserCardInDB, UserCardUpdate, UserCardResponse, CardLocation
+from services.version_service import VersionService, CARDS_VERSION
+from services.card_location_service import CardLocationService
+from services.binder_service import BinderService
 from bson import ObjectId
 from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 class UserCardService:
     def __init__(self, database: AsyncIOMotorDatabase):
         self.database = database
         self.collection = database.user_cards
+        self.versions = VersionService(database)
+        self.locations = CardLocationService(database)
 
     async def get_user_cards(self, user_id: str) -> List[UserCardResponse]:
         """Récupérer toutes les cartes d'un utilisateur"""
@@ -24,6 +32,8 @@ class UserCardService:
                     set_id=card["set_id"],
                     set_name=card["set_name"],
                     quantity=card["quantity"],
+                    placed=card.get("placed", 0),
+                    available=card["quantity"] - card.get("placed", 0),
                     condition=card["condition"],
                     version=card.get("version"),
                     rarity=card.get("rarity"),
@@ -33,7 +43,7 @@ class UserCardService:
                 ))
             return user_cards
         except Exception as e:
-            print(f"Erreur lors de la récupération des cartes: {e}")
+            logger.error("Erreur lors de la récupération des cartes: %s", e)
             return []
 
     async def add_user_card(self, user_id: str, card_data: UserCardCreate) -> Optional[UserCardResponse]:
@@ -62,29 +72,48 @@ class UserCardService:
                 
                 result = await self.collection.insert_one(card_dict)
                 card_dict["_id"] = result.inserted_id
+                await self.versions.bump(user_id, CARDS_VERSION)
                 
                 return UserCardResponse(
                     id=str(result.inserted_id),
                     user_id=user_id,
+                    available=card_data.quantity,
                     **card_data.dict()
                 )
         except Exception as e:
-            print(f"Erreur lors de l'ajout de la carte: {e}")
+            logger.error("Erreur lors de l'ajout de la carte: %s", e)
             return None
 
     async def update_user_card(self, card_id: str, update_data: UserCardUpdate) -> Optional[UserCardResponse]:
-        """Modifier les informations d'une carte utilisateur"""
+        """Modifier les informations d'une carte utilisateur
+
+        La quantité ne peut pas descendre sous le nombre d'exemplaires rangés dans des
+        binders (ValueError) : il faut d'abord les retirer.
+        """
         try:
             update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
             update_dict["updated_at"] = datetime.utcnow()
             
+            query = {"_id": ObjectId(card_id)}
+            if update_data.quantity is not None:
+                # Condition dans la même écriture : un placement concurrent ne peut pas passer entre les deux
+                query["$expr"] = {"$lte": [{"$ifNull": ["$placed", 0]}, update_data.quantity]}
             result = await self.collection.find_one_and_update(
-                {"_id": ObjectId(card_id)},
+                query,
                 {"$set": update_dict},
                 return_document=True
             )
             
+            if not result and "$expr" in query:
+                current = await self.collection.find_one({"_id": query["_id"]}, {"placed": 1})
+                if current:
+                    raise ValueError(
+                        f"{current.get('placed', 0)} exemplaire(s) de cette carte sont rangés dans des binders : "
+                        "retirez-les avant de réduire la quantité"
+                    )
+            
             if result:
+                await self.versions.bump(str(result["user_id"]), CARDS_VERSION)
                 return UserCardResponse(
                     id=str(result["_id"]),
                     user_id=str(result["user_id"]),
@@ -94,6 +123,8 @@ class UserCardService:
                     set_id=result["set_id"],
                     set_name=result["set_name"],
                     quantity=result["quantity"],
+                    placed=result.get("placed", 0),
+                    available=result["quantity"] - result.get("placed", 0),
                     condition=result["condition"],
                     version=result.get("version"),
                     rarity=result.get("rarity"),
@@ -102,17 +133,28 @@ class UserCardService:
                     updated_at=result["updated_at"]
                 )
             return None
+        except ValueError:
+            raise
         except Exception as e:
-            print(f"Erreur lors de la mise à jour de la carte: {e}")
+            logger.error("Erreur lors de la mise à jour de la carte: %s", e)
             return None
 
     async def delete_user_card(self, card_id: str) -> bool:
         """Supprimer une carte de la collection d'un utilisateur"""
         try:
-            result = await self.collection.delete_one({"_id": ObjectId(card_id)})
-            return result.deleted_count > 0
+            deleted = await self.collection.find_one_and_delete({"_id": ObjectId(card_id)})
+            if not deleted:
+                return False
+            await self.versions.bump(str(deleted["user_id"]), CARDS_VERSION)
+            
+            # Retirer la carte des binders où elle est rangée (pages concernées uniquement)
+            try:
+                await BinderService(self.database).remove_user_card_everywhere(str(deleted["user_id"]), card_id)
+            except Exception as e:
+                logger.warning("Carte %s supprimée mais non retirée des binders: %s", card_id, e)
+            return True
         except Exception as e:
-            print(f"Erreur lors de la suppression de la carte: {e}")
+            logger.error("Erreur lors de la suppression de la carte: %s", e)
             return False
 
     async def get_user_card_by_id(self, card_id: str) -> Optional[UserCardResponse]:
@@ -129,6 +171,8 @@ class UserCardService:
                     set_id=card["set_id"],
                     set_name=card["set_name"],
                     quantity=card["quantity"],
+                    placed=card.get("placed", 0),
+                    available=card["quantity"] - card.get("placed", 0),
                     condition=card["condition"],
                     version=card.get("version"),
                     rarity=card.get("rarity"),
@@ -138,14 +182,39 @@ class UserCardService:
                 )
             return None
         except Exception as e:
-            print(f"Erreur lors de la récupération de la carte: {e}")
+            logger.error("Erreur lors de la récupération de la carte: %s", e)
             return None
 
+    async def get_card_locations(self, card_id: str, user_id: str) -> List[CardLocation]:
+        """Récupérer les binders et slots où une carte est rangée (index card_locations)"""
+        locations = await self.locations.get_locations(card_id, user_id)
+        if not locations:
+            return []
+        
+        binder_names = {}
+        cursor = self.database.binders.find(
+            {"_id": {"$in": list({location["binder_id"] for location in locations})}},
+            {"name": 1}
+        )
+        async for binder in cursor:
+            binder_names[binder["_id"]] = binder["name"]
+        
+        return [
+            CardLocation(
+                binder_id=str(location["binder_id"]),
+                binder_name=binder_names[location["binder_id"]],
+                page_number=location["page_number"],
+                position=location["position"]
+            )
+            for location in locations
+            if location["binder_id"] in binder_names
+        ]
+
     async def get_cards_count(self, user_id: str) -> int:
         """Récupérer le nombre total de cartes d'un utilisateur"""
         try:
             count = await self.collection.count_documents({"user_id": ObjectId(user_id)})
             return count
         except Exception as e:
-            print(f"Erreur lors du comptage des cartes: {e}")
+            logger.error("Erreur lors du comptage des cartes: %s", e)
             return 0
@@ -0,0 +1,23 @@
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from utils.cache import cache, version_tag
+
+# Compteurs de version par utilisateur, stockés dans le document users
+BINDERS_VERSION = "binders_version"
+CARDS_VERSION = "cards_version"
+
+class VersionService:
+    """Compteurs de version des collections d'un utilisateur (ETag des listes)"""
+
+    def __init__(self, database: AsyncIOMotorDatabase):
+        self.database = database
+        self.collection = database.users
+
+    async def bump(self, user_id: str, *counters: str):
+        """Incrémente atomiquement les compteurs indiqués et invalide les entrées de cache qui en dérivent"""
+        await self.collection.update_one(
+            {"_id": ObjectId(user_id)},
+            {"$inc": {counter: 1 for counter in counters}}
+        )
+        await cache.invalidate_tags(*(version_tag(counter, user_id) for counter in counters))
+
@@ -0,0 +1,318 @@
+"""
+Cache partagé : niveau LRU en mémoire borné, niveau Redis optionnel et invalidation entre workers
+
+Chaque worker Uvicorn/Gunicorn garde un niveau en mémoire (LRU borné en entrées et en octets,
+TTL par entrée, index des tags). Si CACHE_REDIS_URL est défini et le module redis installé,
+un second niveau Redis est partagé par tous les workers, et les suppressions/invalidations
+sont diffusées sur un canal pub/sub pour que les autres workers vident leur niveau en mémoire.
+Sans Redis, chaque worker a son propre cache : le TTL borne alors la durée d'incohérence.
+
+Les valeurs du niveau Redis doivent être des bytes ou sérialisables en JSON ; None signifie
+« absent » et n'est donc pas mis en cache.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from utils.metrics import CACHE_EVICTIONS, CACHE_INVALIDATIONS, CACHE_REQUESTS
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_DEFAULT_TTL = float(os.getenv("CACHE_DEFAULT_TTL", "300"))
+CACHE_REDIS_PREFIX = os.getenv("CACHE_REDIS_PREFIX", "pokemon_binder:cache:")
+CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "pokemon_binder:cache:invalidations")
+
+
+class MemoryCache:
+    """LRU en mémoire borné en nombre d'entrées et en octets (valeurs bytes/str), avec TTL et tags"""
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        max_bytes: int = CACHE_MAX_BYTES,
+        default_ttl: float = CACHE_DEFAULT_TTL,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self.size_bytes = 0
+        # clé -> (valeur, expiration, tags, taille)
+        self._entries: "OrderedDict[str, Tuple[Any, float, Tuple[str, ...], int]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _weight(value: Any) -> int:
+        return len(value) if isinstance(value, (bytes, str)) else 0
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= self.clock():
+            self._discard(key)
+            CACHE_EVICTIONS.labels(reason="expired").inc()
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()):
+        if value is None:
+            return
+        weight = self._weight(value)
+        if weight > self.max_bytes:
+            # Plus grande que tout le cache : ne pas vider les autres entrées pour elle
+            self._discard(key)
+            return
+        self._discard(key)
+        tags = tuple(tags)
+        self._entries[key] = (value, self.clock() + (self.default_ttl if ttl is None else ttl), tags, weight)
+        self.size_bytes += weight
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)))
+            CACHE_EVICTIONS.labels(reason="size").inc()
+        while self.size_bytes > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+            CACHE_EVICTIONS.labels(reason="bytes").inc()
+
+    def delete(self, *keys: str) -> int:
+        return sum(self._discard(key) for key in keys)
+
+    def invalidate_tags(self, *tags: str) -> int:
+        return self.delete(*{key for tag in tags for key in self._tags.get(tag, ())})
+
+    def clear(self):
+        self._entries.clear()
+        self._tags.clear()
+        self.size_bytes = 0
+
+    def _discard(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.size_bytes -= entry[3]
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+
+def _encode(value: Any, tags: Tuple[str, ...]) -> bytes:
+    """Type (b: bytes, j: JSON), tags en JSON sur une ligne, puis la valeur"""
+    header = json.dumps(list(tags)).encode() + b"\n"
+    if isinstance(value, bytes):
+        return b"b" + header + value
+    return b"j" + header + json.dumps(value, default=str).encode()
+
+
+def _decode(data: bytes) -> Tuple[Any, Tuple[str, ...]]:
+    header, _, payload = data[1:].partition(b"\n")
+    tags = tuple(json.loads(header))
+    if data[:1] == b"b":
+        return payload, tags
+    return json.loads(payload), tags
+
+
+class RedisCache:
+    """Niveau partagé sur un serveur parlant le protocole Redis (redis.asyncio ou équivalent)"""
+
+    def __init__(self, client, prefix: str = CACHE_REDIS_PREFIX, default_ttl: float = CACHE_DEFAULT_TTL):
+        self.client = client
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    async def get(self, key: str) -> Optional[Tuple[Any, Tuple[str, ...]]]:
+        """(valeur, tags) ou None ; les tags permettent d'indexer la copie en mémoire"""
+        data = await self.client.get(self._key(key))
+        return None if data is None else _decode(data)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()):
+        tags = tuple(tags)
+        ttl = max(int(self.default_ttl if ttl is None else ttl), 1)
+        await self.client.set(self._key(key), _encode(value, tags), ex=ttl)
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            await self.client.sadd(tag_key, key)
+            # L'index du tag vit au moins aussi longtemps que sa plus longue entrée
+            await self.client.expire(tag_key, ttl, nx=True)
+            await self.client.expire(tag_key, ttl, gt=True)
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self.client.delete(*(self._key(key) for key in keys))
+
+    async def invalidate_tags(self, *tags: str):
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            members = await self.client.smembers(tag_key)
+            keys = [member.decode() if isinstance(member, bytes) else member for member in members]
+            await self.client.delete(tag_key, *(self._key(key) for key in keys))
+
+
+class SharedCache:
+    """Cache à deux niveaux utilisé par les routes (via dependencies.get_cache)
+
+    L'instance du processus (`cache`) est démarrée et arrêtée par le lifespan de main.
+    """
+
+    def __init__(
+        self,
+        local: Optional[MemoryCache] = None,
+        remote: Optional[RedisCache] = None,
+        channel: str = CACHE_INVALIDATION_CHANNEL
+    ):
+        self.local = local or MemoryCache()
+        self.remote = remote
+        self.channel = channel
+        # Identifie ce worker : ses propres messages d'invalidation sont ignorés
+        self.instance_id = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls) -> "SharedCache":
+        redis_url = os.getenv("CACHE_REDIS_URL")
+        if redis_url and redis_asyncio is None:
+            logger.warning("CACHE_REDIS_URL défini mais le module redis n'est pas installé : cache en mémoire seul")
+        remote = RedisCache(redis_asyncio.from_url(redis_url)) if redis_url and redis_asyncio else None
+        return cls(remote=remote)
+
+    async def get(self, key: str) -> Any:
+        value = self.local.get(key)
+        if value is not None:
+            CACHE_REQUESTS.labels(tier="memory", result="hit").inc()
+            return value
+        CACHE_REQUESTS.labels(tier="memory", result="miss").inc()
+        if self.remote is None:
+            return None
+        try:
+            entry = await self.remote.get(key)
+        except Exception as e:
+            logger.warning("Lecture du cache Redis impossible (%s): %s", key, e)
+            return None
+        CACHE_REQUESTS.labels(tier="redis", result="miss" if entry is None else "hit").inc()
+        if entry is None:
+            return None
+        # Les invalidations diffusées gardent cette copie cohérente ; le TTL local borne le reste
+        value, tags = entry
+        self.local.set(key, value, tags=tags)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()):
+        tags = tuple(tags)
+        self.local.set(key, value, ttl, tags)
+        if self.remote is not None and value is not None:
+            # Les autres workers peuvent garder en mémoire une valeur précédente de cette clé
+            await self._remote_invalidate(self.remote.set(key, value, ttl, tags), {"keys": [key]})
+
+    async def get_or_set(
+        self, key: str, factory: Callable[[], Awaitable[Any]], ttl: Optional[float] = None, tags: Iterable[str] = ()
+    ) -> Any:
+        value = await self.get(key)
+        if value is None:
+            value = await factory()
+            await self.set(key, value, ttl, tags)
+        return value
+
+    async def delete(self, *keys: str):
+        self.local.delete(*keys)
+        CACHE_INVALIDATIONS.labels(source="local").inc()
+        if self.remote is not None:
+            await self._remote_invalidate(self.remote.delete(*keys), {"keys": list(keys)})
+
+    async def invalidate_tags(self, *tags: str):
+        self.local.invalidate_tags(*tags)
+        CACHE_INVALIDATIONS.labels(source="local").inc()
+        if self.remote is not None:
+            await self._remote_invalidate(self.remote.invalidate_tags(*tags), {"tags": list(tags)})
+
+    async def _remote_invalidate(self, write: Awaitable[Any], message: dict):
+        """Applique l'écriture au niveau Redis puis diffuse l'invalidation aux autres workers"""
+        try:
+            await write
+            await self.remote.client.publish(self.channel, json.dumps({"origin": self.instance_id, **message}))
+        except Exception as e:
+            logger.warning("Mise à jour du cache Redis impossible (%s): %s", message, e)
+
+    def handle_message(self, data) -> bool:
+        """Applique au niveau en mémoire une invalidation diffusée par un autre worker"""
+        message = json.loads(data)
+        if message.get("origin") == self.instance_id:
+            return False
+        self.local.delete(*message.get("keys", []))
+        self.local.invalidate_tags(*message.get("tags", []))
+        CACHE_INVALIDATIONS.labels(source="remote").inc()
+        return True
+
+    @property
+    def listening(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.remote is None or self.listening:
+            return
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self):
+        while True:
+            pubsub = self.remote.client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Messages manqués pendant une coupure : le niveau en mémoire n'est plus sûr
+                self.local.clear()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.handle_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Canal d'invalidation du cache interrompu: %s", e)
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+
+def version_tag(counter: str, user_id: str) -> str:
+    """Tag des entrées dérivées d'une collection versionnée (invalidé par VersionService.bump)"""
+    return f"{counter}:{user_id}"
+
+
+cache = SharedCache.from_env()
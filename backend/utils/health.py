@@ -0,0 +1,136 @@
+"""
+Vérifications de santé (liveness / readiness) avec résultats mis en cache
+
+Les sondes du load balancer peuvent être fréquentes : le résultat de readiness est
+réutilisé pendant HEALTH_CACHE_TTL_SECONDS pour ne pas solliciter MongoDB à chaque appel.
+"""
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional
+
+from database import db, get_pool_stats, mark_connected
+from utils.loop_monitor import loop_monitor
+
+HEALTH_CACHE_TTL_SECONDS = float(os.getenv("HEALTH_CACHE_TTL_SECONDS", "2"))
+HEALTH_MONGO_TIMEOUT_SECONDS = float(os.getenv("HEALTH_MONGO_TIMEOUT_SECONDS", "1"))
+HEALTH_MONGO_MAX_LATENCY_MS = float(os.getenv("HEALTH_MONGO_MAX_LATENCY_MS", "250"))
+HEALTH_POOL_MAX_UTILIZATION = float(os.getenv("HEALTH_POOL_MAX_UTILIZATION", "0.9"))
+HEALTH_LOOP_MAX_LAG_MS = float(os.getenv("HEALTH_LOOP_MAX_LAG_MS", "200"))
+
+# Composants qui doivent être "chauds" (initialisés) avant d'accepter du trafic
+_warm_components: Dict[str, bool] = {}
+
+
+def register_warmup(name: str):
+    """Déclare un composant à initialiser avant que l'instance soit prête"""
+    _warm_components.setdefault(name, False)
+
+
+def mark_warm(name: str, warm: bool = True):
+    """Indique qu'un composant est initialisé (ou ne l'est plus)"""
+    _warm_components[name] = warm
+
+
+def warmup_state() -> Dict[str, bool]:
+    return dict(_warm_components)
+
+
+async def measure_loop_lag() -> float:
+    """Retard (ms) de la boucle d'événements pour reprendre une tâche prête"""
+    start = time.perf_counter()
+    await asyncio.sleep(0)
+    return (time.perf_counter() - start) * 1000
+
+
+async def check_mongo() -> Dict[str, Any]:
+    """Ping MongoDB et mesure la latence"""
+    if db.client is None:
+        return {"ok": False, "error": "client non initialisé"}
+
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(db.client.admin.command("ping"), timeout=HEALTH_MONGO_TIMEOUT_SECONDS)
+    except Exception as e:
+        return {"ok": False, "error": str(e) or e.__class__.__name__}
+
+    latency_ms = (time.perf_counter() - start) * 1000
+    # MongoDB joignable : l'instance peut devenir prête même si le ping de démarrage a échoué,
+    # après l'initialisation que connect_to_mongo n'a pas pu faire (index, change stream)
+    await mark_connected()
+    if "mongo" in _warm_components:
+        mark_warm("mongo")
+    return {
+        "ok": latency_ms <= HEALTH_MONGO_MAX_LATENCY_MS,
+        "latency_ms": round(latency_ms, 2),
+    }
+
+
+def check_pool() -> Dict[str, Any]:
+    """Saturation du pool de connexions"""
+    stats = get_pool_stats()
+    utilization = stats.get("utilization")
+    return {
+        # Pool non borné ou pas encore créé : pas de saturation possible
+        "ok": utilization is None or utilization < HEALTH_POOL_MAX_UTILIZATION,
+        "utilization": utilization,
+        "checked_out": stats.get("checked_out", 0),
+        "max_pool_size": stats.get("max_pool_size", 0),
+    }
+
+
+async def check_loop() -> Dict[str, Any]:
+    # Le moniteur donne le pire lag récent ; sinon mesure ponctuelle
+    if loop_monitor.running:
+        lag_ms = loop_monitor.recent_max_lag_ms()
+    else:
+        lag_ms = await measure_loop_lag()
+    return {"ok": lag_ms <= HEALTH_LOOP_MAX_LAG_MS, "lag_ms": round(lag_ms, 3)}
+
+
+def check_warmup() -> Dict[str, Any]:
+    state = warmup_state()
+    return {"ok": all(state.values()), "components": state}
+
+
+class ReadinessChecker:
+    """Exécute les vérifications de readiness et met le résultat en cache"""
+
+    def __init__(self, ttl_seconds: float = HEALTH_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def check(self) -> Dict[str, Any]:
+        if self._is_fresh():
+            return self._result
+
+        # Une seule vérification à la fois : les sondes concurrentes réutilisent son résultat
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._is_fresh():
+                return self._result
+
+            checks = {
+                "mongo": await check_mongo(),
+                "pool": check_pool(),
+                "loop": await check_loop(),
+                "warmup": check_warmup(),
+            }
+            self._result = {
+                "status": "ready" if all(check["ok"] for check in checks.values()) else "not_ready",
+                "checks": checks,
+            }
+            self._checked_at = time.monotonic()
+            return self._result
+
+    def _is_fresh(self) -> bool:
+        return self._result is not None and time.monotonic() - self._checked_at < self.ttl_seconds
+
+    def invalidate(self):
+        self._result = None
+
+
+readiness_checker = ReadinessChecker()
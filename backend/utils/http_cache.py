@@ -0,0 +1,66 @@
+from typing import Optional
+from fastapi import Response, status
+
+# Les clients doivent revalider à chaque fois (If-None-Match) ; réponses propres à l'utilisateur
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Construit un ETag fort à partir d'identifiants et de numéros de version"""
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def binder_etag(binder_id: str, version: int) -> str:
+    return make_etag("b", binder_id, version)
+
+
+def binders_list_etag(user_id: str, version: int) -> str:
+    return make_etag("bl", user_id, version)
+
+
+def cards_etag(user_id: str, version: int) -> str:
+    return make_etag("c", user_id, version)
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparaison faible (RFC 9110) : la compression peut avoir affaibli l'ETag envoyé"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    expected = _opaque(etag)
+    return any(_opaque(candidate) == expected for candidate in if_none_match.split(","))
+
+
+def if_match_version(if_match: Optional[str], binder_id: str) -> Optional[int]:
+    """Extrait la version attendue d'un en-tête If-Match portant l'ETag d'un binder
+
+    None si l'en-tête est absent ou vaut "*" ; -1 si l'ETag ne désigne pas ce binder
+    (la précondition échoue alors toujours).
+    """
+    if not if_match or if_match.strip() == "*":
+        return None
+    prefix = f"b-{binder_id}-"
+    for candidate in if_match.split(","):
+        opaque = _opaque(candidate).strip('"')
+        if opaque.startswith(prefix) and opaque[len(prefix):].isdigit():
+            return int(opaque[len(prefix):])
+    return -1
+
+
+def not_modified(etag: str) -> Response:
+    """Réponse 304 sans corps"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+
+def set_cache_headers(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,141 @@
+"""
+Configuration des logs : pipeline asynchrone par file (QueueHandler / QueueListener)
+
+Sur le chemin de la requête, un log ne fait qu'enrichir l'enregistrement (request id,
+route), appliquer l'échantillonnage et le déposer dans une file. Le formatage JSON et
+l'écriture sur stdout se font dans le thread du QueueListener.
+
+Variables d'environnement :
+- LOG_LEVEL : niveau racine (INFO par défaut)
+- LOG_FORMAT : "json" (défaut) ou "text"
+- LOG_SAMPLE_RATES : échantillonnage par route des logs < WARNING,
+  ex: "/user/binders/{binder_id}=0.1,/user/cards=0.5"
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+route_var: ContextVar[Optional[str]] = ContextVar("route", default=None)
+
+# Attributs standards d'un LogRecord, exclus des champs supplémentaires en JSON
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formate chaque enregistrement en une ligne JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Ajoute request_id et route (portés par des ContextVar) à chaque enregistrement"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.route = route_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Échantillonne les logs < WARNING par route ; les WARNING et plus passent toujours"""
+
+    def __init__(self, rates: Dict[str, float], rng: Optional[random.Random] = None):
+        super().__init__()
+        self.rates = rates
+        self.random = (rng or random.Random()).random
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self.rates.get(route_var.get())
+        if rate is None:
+            return True
+        return self.random() < rate
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse "route=taux,route=taux" en dictionnaire"""
+    rates: Dict[str, float] = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        route, rate = item.rsplit("=", 1)
+        rates[route.strip()] = float(rate)
+    return rates
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler qui conserve les champs supplémentaires de l'enregistrement"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Fusionne message et arguments une seule fois ; le formatage final reste dans le listener
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """Installe le pipeline de logs sur le logger racine (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if os.getenv("LOG_FORMAT", "json").lower() == "text":
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+        ))
+    else:
+        stream_handler.setFormatter(JsonFormatter())
+
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))))
+    queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    # Les threads ne survivent pas au fork (gunicorn --preload) : redémarrer dans chaque worker
+    os.register_at_fork(after_in_child=_restart_listener)
+    atexit.register(stop_logging)
+    return _listener
+
+
+def _restart_listener():
+    if _listener is not None:
+        _listener._thread = None
+        _listener.start()
+
+
+def stop_logging():
+    """Vide la file et arrête le thread d'écriture"""
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
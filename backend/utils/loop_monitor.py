@@ -0,0 +1,158 @@
+"""
+Surveillance du retard de la boucle d'événements et détection des appels bloquants
+
+Une tâche asyncio se réveille à intervalle régulier et mesure son retard (lag). Un
+thread de surveillance vérifie que ce battement progresse : si la boucle est bloquée
+au-delà du seuil, il capture la pile du thread de la boucle pendant le blocage, ce qui
+désigne le code fautif (bcrypt, validation Pydantic volumineuse, boucles CPU...) et la
+requête en cours.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from utils.metrics import LOOP_LAG, LOOP_STALLS
+
+LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "100"))
+LOOP_STALL_THRESHOLD_MS = float(os.getenv("LOOP_STALL_THRESHOLD_MS", "200"))
+LOOP_STALL_HISTORY = int(os.getenv("LOOP_STALL_HISTORY", "50"))
+STACK_LIMIT = 30
+
+
+def _find_request(frame) -> Dict[str, Any]:
+    """Remonte la pile bloquée jusqu'au middleware de contexte pour identifier la requête"""
+    from middleware.request_context import RequestContextMiddleware
+
+    target = RequestContextMiddleware.__call__.__code__
+    while frame is not None:
+        if frame.f_code is target:
+            scope = frame.f_locals.get("scope") or {}
+            return {
+                "request_id": frame.f_locals.get("request_id"),
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "route": scope.get("route_template"),
+            }
+        frame = frame.f_back
+    return {}
+
+
+class LoopMonitor:
+    """Mesure le lag de la boucle et enregistre les blocages avec leur pile d'appels"""
+
+    def __init__(
+        self,
+        interval_ms: float = LOOP_MONITOR_INTERVAL_MS,
+        stall_threshold_ms: float = LOOP_STALL_THRESHOLD_MS,
+        history: int = LOOP_STALL_HISTORY
+    ):
+        self.interval = interval_ms / 1000
+        self.stall_threshold = stall_threshold_ms / 1000
+        self.stalls: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._recent_lags: Deque[float] = deque(maxlen=50)
+        self._heartbeat = 0.0
+        # Écrit par le thread de surveillance, consommé par la boucle : protégé par _stall_lock
+        self._pending_stall: Optional[Dict[str, Any]] = None
+        self._stall_lock = threading.Lock()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._tick())
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    async def _tick(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            self._record_lag(max(0.0, now - expected))
+
+    def _record_lag(self, lag: float):
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self._recent_lags.append(lag)
+        LOOP_LAG.observe(lag)
+
+        # La capture éventuelle appartient à ce battement, qu'il soit ou non compté comme blocage
+        with self._stall_lock:
+            pending, self._pending_stall = self._pending_stall, None
+        if lag < self.stall_threshold:
+            return
+        LOOP_STALLS.inc()
+        stall = pending or {"captured": False, "started_at": time.time() - lag}
+        stall["duration_ms"] = round(lag * 1000, 2)
+        self.stalls.append(stall)
+
+    def _watch(self):
+        """Thread de surveillance : capture la pile quand le battement ne progresse plus"""
+        while not self._stop.wait(self.interval / 2):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            if blocked_for < self.stall_threshold:
+                continue
+            with self._stall_lock:
+                # Battement repris entre-temps (la boucle a consommé ou va consommer l'état) ou déjà capturé
+                if self._heartbeat != heartbeat or self._pending_stall is not None:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is None:
+                    continue
+                self._pending_stall = {
+                    "captured": True,
+                    "started_at": time.time() - blocked_for,
+                    **_find_request(frame),
+                    "stack": traceback.format_stack(frame, limit=STACK_LIMIT),
+                }
+
+    def recent_max_lag_ms(self) -> float:
+        """Lag maximal (ms) sur les derniers battements"""
+        return max(self._recent_lags, default=0.0) * 1000
+
+    def snapshot(self) -> Dict[str, Any]:
+        stalls: List[Dict[str, Any]] = list(self.stalls)
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "stall_threshold_ms": self.stall_threshold * 1000,
+            "last_lag_ms": round(self.last_lag * 1000, 3),
+            "recent_max_lag_ms": round(self.recent_max_lag_ms(), 3),
+            "max_lag_ms": round(self.max_lag * 1000, 3),
+            "stalls": stalls[::-1],
+        }
+
+
+loop_monitor = LoopMonitor()
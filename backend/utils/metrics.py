@@ -0,0 +1,137 @@
+"""
+Métriques Prometheus de l'API (requêtes HTTP, commandes MongoDB, pool de connexions)
+
+En production multi-workers (Gunicorn), définir PROMETHEUS_MULTIPROC_DIR pour que
+/metrics agrège les valeurs de tous les workers.
+"""
+import os
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY,
+    CONTENT_TYPE_LATEST, generate_latest
+)
+from prometheus_client import multiprocess
+
+# Buckets adaptés à une API JSON (de 1 ms à 10 s)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "Nombre de requêtes HTTP traitées",
+    ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latence des requêtes HTTP",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requêtes HTTP en cours de traitement",
+    ["method", "route"],
+    multiprocess_mode="livesum"
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Taille des corps de réponse HTTP",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS
+)
+
+MONGO_COMMAND_LATENCY = Histogram(
+    "mongodb_command_duration_seconds",
+    "Durée des commandes MongoDB",
+    ["command", "collection"],
+    buckets=LATENCY_BUCKETS
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongodb_command_failures_total",
+    "Commandes MongoDB en échec",
+    ["command", "collection"]
+)
+
+MONGO_POOL_CHECKED_OUT = Gauge(
+    "mongodb_pool_checked_out_connections",
+    "Connexions MongoDB actuellement empruntées au pool",
+    multiprocess_mode="livesum"
+)
+MONGO_POOL_OPEN = Gauge(
+    "mongodb_pool_open_connections",
+    "Connexions MongoDB ouvertes",
+    multiprocess_mode="livesum"
+)
+MONGO_POOL_CHECKOUT_WAIT = Histogram(
+    "mongodb_pool_checkout_wait_seconds",
+    "Temps d'attente pour obtenir une connexion du pool",
+    buckets=LATENCY_BUCKETS
+)
+MONGO_POOL_CHECKOUT_FAILURES = Counter(
+    "mongodb_pool_checkout_failures_total",
+    "Échecs d'obtention d'une connexion du pool"
+)
+
+LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Retard de la boucle d'événements mesuré à chaque battement",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+LOOP_STALLS = Counter(
+    "event_loop_stalls_total",
+    "Blocages de la boucle d'événements au-delà du seuil"
+)
+
+COMPRESSION_BYTES_IN = Counter(
+    "http_compression_input_bytes_total",
+    "Octets de réponse avant compression",
+    ["route", "encoding"]
+)
+COMPRESSION_BYTES_OUT = Counter(
+    "http_compression_output_bytes_total",
+    "Octets de réponse après compression (envoyés sur le réseau)",
+    ["route", "encoding"]
+)
+COMPRESSION_SECONDS = Histogram(
+    "http_compression_cpu_seconds",
+    "Temps CPU de compression par réponse",
+    ["route", "encoding"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Lectures du cache partagé par niveau (memory, redis) et résultat (hit, miss)",
+    ["tier", "result"]
+)
+CACHE_EVICTIONS = Counter(
+    "cache_evictions_total",
+    "Entrées retirées du cache en mémoire (size, bytes, expired)",
+    ["reason"]
+)
+CACHE_INVALIDATIONS = Counter(
+    "cache_invalidations_total",
+    "Invalidations appliquées au cache en mémoire (local, remote : message d'un autre worker)",
+    ["source"]
+)
+
+SINGLE_FLIGHT_REQUESTS = Counter(
+    "single_flight_requests_total",
+    "Lectures identiques concurrentes : calcul lancé (leader) ou résultat partagé (coalesced)",
+    ["name", "role"]
+)
+
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests_total",
+    "Réponses JSON déjà encodées servies depuis le cache (hit) ou recalculées (miss)",
+    ["name", "result"]
+)
+
+
+def render_metrics() -> tuple:
+    """Retourne (contenu, content-type) au format texte Prometheus"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,141 @@
+import threading
+import time
+from typing import Dict, Any
+from pymongo import monitoring
+from pymongo.common import MAX_POOL_SIZE
+from utils.metrics import (
+    MONGO_COMMAND_LATENCY, MONGO_COMMAND_FAILURES, MONGO_POOL_CHECKED_OUT,
+    MONGO_POOL_OPEN, MONGO_POOL_CHECKOUT_WAIT, MONGO_POOL_CHECKOUT_FAILURES
+)
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Collecte l'utilisation du pool de connexions MongoDB et le temps d'attente au checkout"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Le checkout démarre et se termine sur le même thread (executor Motor)
+        self._local = threading.local()
+        # Défaut du driver : l'événement pool_created ne contient que les options passées
+        self.max_pool_size = MAX_POOL_SIZE
+        self.min_pool_size = 0
+        self.open_connections = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.pool_clears = 0
+
+    def pool_created(self, event):
+        with self._lock:
+            self.max_pool_size = event.options.get("maxPoolSize", MAX_POOL_SIZE)
+            self.min_pool_size = event.options.get("minPoolSize", self.min_pool_size)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+        MONGO_POOL_OPEN.inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections = max(0, self.open_connections - 1)
+        MONGO_POOL_OPEN.dec()
+
+    def connection_check_out_started(self, event):
+        self._local.started_at = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        self._record_wait()
+        with self._lock:
+            self.checkout_failures += 1
+        MONGO_POOL_CHECKOUT_FAILURES.inc()
+
+    def connection_checked_out(self, event):
+        wait = self._record_wait()
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            self.checkout_wait_total += wait
+            self.checkout_wait_max = max(self.checkout_wait_max, wait)
+        MONGO_POOL_CHECKED_OUT.inc()
+        MONGO_POOL_CHECKOUT_WAIT.observe(wait)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+        MONGO_POOL_CHECKED_OUT.dec()
+
+    def _record_wait(self) -> float:
+        started_at = getattr(self._local, "started_at", None)
+        self._local.started_at = None
+        if started_at is None:
+            return 0.0
+        return time.perf_counter() - started_at
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Retourne un instantané des métriques du pool"""
+        with self._lock:
+            # maxPoolSize=0 : pool non borné, l'utilisation n'a pas de sens (None plutôt que 0)
+            utilization = (
+                round(self.checked_out / self.max_pool_size, 4) if self.max_pool_size else None
+            )
+            avg_wait = self.checkout_wait_total / self.checkouts if self.checkouts else 0.0
+            return {
+                "max_pool_size": self.max_pool_size,
+                "min_pool_size": self.min_pool_size,
+                "open_connections": self.open_connections,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "utilization": utilization,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "checkout_wait_avg_ms": round(avg_wait * 1000, 3),
+                "checkout_wait_max_ms": round(self.checkout_wait_max * 1000, 3),
+                "pool_clears": self.pool_clears,
+            }
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Mesure la durée de chaque commande MongoDB par nom de commande et collection"""
+
+    def __init__(self):
+        # request_id -> collection ; seul l'événement "started" contient la commande
+        self._collections: Dict[int, str] = {}
+
+    def started(self, event):
+        self._collections[event.request_id] = command_collection(event.command_name, event.command)
+
+    def succeeded(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        MONGO_COMMAND_LATENCY.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        MONGO_COMMAND_LATENCY.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(event.command_name, collection).inc()
+
+
+def command_collection(command_name: str, command: Dict[str, Any]) -> str:
+    """Extrait le nom de collection d'une commande (ex: {"find": "binders", ...})"""
+    value = command.get(command_name)
+    if isinstance(value, str):
+        return value
+    # getMore porte le nom de collection dans "collection"
+    collection = command.get("collection")
+    return collection if isinstance(collection, str) else ""
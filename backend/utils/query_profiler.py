@@ -0,0 +1,161 @@
+"""
+Profilage des commandes MongoDB par requête HTTP
+
+Le profil courant est porté par une ContextVar : Motor copie le contexte vers son
+executor, donc le CommandListener (exécuté dans le thread du driver) voit le profil
+de la requête qui a émis la commande.
+"""
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from pymongo import monitoring
+from utils.mongo_monitoring import command_collection
+
+# Commandes internes du driver à ne pas compter comme requêtes applicatives
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue"}
+
+
+class QueryRecord:
+    """Une commande MongoDB exécutée pendant la requête"""
+    __slots__ = ("command", "collection", "duration_ms", "docs", "failed")
+
+    def __init__(self, command: str, collection: str, duration_ms: float, docs: int, failed: bool = False):
+        self.command = command
+        self.collection = collection
+        self.duration_ms = duration_ms
+        self.docs = docs
+        self.failed = failed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "command": self.command,
+            "collection": self.collection,
+            "duration_ms": self.duration_ms,
+            "docs": self.docs,
+            "failed": self.failed,
+        }
+
+
+class QueryProfile:
+    """Ensemble des commandes MongoDB émises pendant une requête"""
+
+    def __init__(self):
+        self.queries: List[QueryRecord] = []
+        self.closed = False
+        self._pending: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def close(self):
+        """Arrête l'enregistrement : les commandes suivantes ne sont plus comptées
+
+        Appelé une fois l'en-tête Server-Timing envoyé ; une réponse en flux (SSE) peut
+        durer des heures et ne doit pas accumuler ses commandes en mémoire.
+        """
+        with self._lock:
+            self.closed = True
+            self._pending.clear()
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(query.duration_ms for query in self.queries)
+
+    @property
+    def docs(self) -> int:
+        return sum(query.docs for query in self.queries)
+
+    def summary(self) -> str:
+        """Résumé lisible : 'find binders x1, find user_cards x12'"""
+        counts: Dict[str, int] = {}
+        for query in self.queries:
+            key = f"{query.command} {query.collection}".strip()
+            counts[key] = counts.get(key, 0) + 1
+        return ", ".join(f"{key} x{count}" for key, count in counts.items())
+
+    def server_timing(self) -> str:
+        """Valeur de l'en-tête Server-Timing"""
+        return f'db;dur={self.total_ms:.2f};desc="{self.count} queries"'
+
+
+current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("query_profile", default=None)
+
+
+def returned_docs(reply: Dict[str, Any]) -> int:
+    """Nombre de documents retournés ou affectés par une commande"""
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch", []))
+        return len(batch)
+    n = reply.get("n")
+    return n if isinstance(n, int) else 0
+
+
+class QueryProfilerListener(monitoring.CommandListener):
+    """Alimente le profil de la requête courante avec chaque commande MongoDB"""
+
+    def started(self, event):
+        profile = current_profile.get()
+        if profile is None or event.command_name in IGNORED_COMMANDS:
+            return
+        with profile._lock:
+            if profile.closed:
+                return
+            profile._pending[event.request_id] = command_collection(event.command_name, event.command)
+
+    def succeeded(self, event):
+        self._finish(event, returned_docs(event.reply), failed=False)
+
+    def failed(self, event):
+        self._finish(event, 0, failed=True)
+
+    def _finish(self, event, docs: int, failed: bool):
+        profile = current_profile.get()
+        if profile is None:
+            return
+        with profile._lock:
+            collection = profile._pending.pop(event.request_id, None)
+            if collection is None:
+                return
+            profile.queries.append(QueryRecord(
+                command=event.command_name,
+                collection=collection,
+                duration_ms=event.duration_micros / 1000,
+                docs=docs,
+                failed=failed
+            ))
+
+
+@contextmanager
+def profile_queries():
+    """Active un profil de requêtes pour le bloc (services, scripts, tests)"""
+    profile = QueryProfile()
+    token = current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        current_profile.reset(token)
+
+
+_SERVER_TIMING_COUNT = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+def query_count_from_headers(headers) -> int:
+    """Extrait le nombre de requêtes MongoDB de l'en-tête Server-Timing d'une réponse"""
+    match = _SERVER_TIMING_COUNT.search(headers.get("server-timing", ""))
+    if match is None:
+        raise AssertionError("En-tête Server-Timing absent : le profilage des requêtes est-il activé ?")
+    return int(match.group(1))
+
+
+def assert_max_queries(response, max_queries: int) -> int:
+    """Vérifie qu'un endpoint a émis au plus max_queries commandes MongoDB"""
+    count = query_count_from_headers(response.headers)
+    assert count <= max_queries, (
+        f"{count} requêtes MongoDB émises (maximum attendu : {max_queries})"
+    )
+    return count
@@ -0,0 +1,87 @@
+"""
+Cache des réponses JSON déjà encodées (binder, liste des binders)
+
+Servir un binder inchangé coûte sinon la lecture des pages, l'enrichissement, la validation
+de BinderResponse et la sérialisation de chaque slot. Ici le corps final est gardé en bytes,
+sous une clé qui contient la version des données (version du binder, binders_version de
+l'utilisateur) : une écriture incrémente la version, les requêtes suivantes utilisent une
+nouvelle clé et l'ancienne entrée n'est plus jamais lue ; le LRU borné en octets l'évince.
+
+Aucune invalidation n'est donc nécessaire, ni entre workers : chaque worker garde son
+propre niveau en mémoire, sans aller-retour Redis sur le chemin chaud.
+"""
+import json
+import os
+from typing import Any, Optional, Tuple
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+from utils.cache import MemoryCache
+from utils.http_cache import CACHE_CONTROL
+from utils.metrics import RESPONSE_CACHE_REQUESTS
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2000"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+
+
+def binder_response_key(binder_id: str, version: int, page_range: Optional[Tuple[int, int]]) -> str:
+    window = "all" if page_range is None else f"{page_range[0]}-{page_range[1]}"
+    return f"binder:{binder_id}:{version}:{window}"
+
+
+def binders_list_response_key(user_id: str, version: int) -> str:
+    return f"binders:{user_id}:{version}"
+
+
+def encode_json(content: Any) -> bytes:
+    """Même encodage que la JSONResponse de FastAPI pour un response_model"""
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+def json_response(body: bytes, etag: str) -> Response:
+    """Réponse 200 construite directement depuis le corps encodé, avec ses en-têtes de cache"""
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+
+class ResponseCache:
+    """LRU des corps JSON encodés, borné en octets"""
+
+    def __init__(self, name: str, memory: MemoryCache):
+        self.name = name
+        self.memory = memory
+
+    def __len__(self) -> int:
+        return len(self.memory)
+
+    def get(self, key: str) -> Optional[bytes]:
+        body = self.memory.get(key)
+        RESPONSE_CACHE_REQUESTS.labels(name=self.name, result="miss" if body is None else "hit").inc()
+        return body
+
+    def store(self, key: str, content: Any) -> bytes:
+        """Encode la réponse, la garde sous `key` et retourne le corps"""
+        body = encode_json(content)
+        self.memory.set(key, body)
+        return body
+
+
+# Une seule borne mémoire pour les binders et les listes de binders
+_memory = MemoryCache(
+    max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=RESPONSE_CACHE_MAX_BYTES,
+    default_ttl=RESPONSE_CACHE_TTL
+)
+binder_responses = ResponseCache("binder", _memory)
+binders_list_responses = ResponseCache("binders_list", _memory)
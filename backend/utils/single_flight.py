@@ -0,0 +1,43 @@
+"""
+Regroupement des lectures identiques concurrentes (single-flight)
+
+Pendant un drag & drop ou une navigation entre pages, le frontend émet souvent plusieurs
+GET identiques qui se chevauchent. Dans un worker, le premier lance le calcul ; les
+suivants arrivés avant la fin attendent le même résultat au lieu de relancer requêtes et
+enrichissement. La clé doit contenir la version des données lues : une lecture émise
+après une écriture ne rejoint jamais un calcul commencé avant elle.
+
+Le calcul tourne dans sa propre tâche : l'annulation de la requête qui l'a lancé (client
+déconnecté) n'interrompt pas les autres. Le résultat est partagé, il ne doit pas être modifié.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from utils.metrics import SINGLE_FLIGHT_REQUESTS
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            SINGLE_FLIGHT_REQUESTS.labels(name=self.name, role="leader").inc()
+        else:
+            SINGLE_FLIGHT_REQUESTS.labels(name=self.name, role="coalesced").inc()
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Erreur consommée même si toutes les requêtes en attente ont été annulées
+            task.exception()
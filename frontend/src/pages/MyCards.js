@@ -520,6 +520,14 @@ const MyCards = () => {
                     }}
                   />
                   <div className="quantity-badge">{card.quantity}x</div>
+                  {card.placed > 0 && (
+                    <div
+                      className={`available-badge ${card.available === 0 ? 'none-left' : ''}`}
+                      title={`${card.placed} exemplaire(s) rangé(s) dans des binders`}
+                    >
+                      {card.available} non rangé{card.available > 1 ? 's' : ''}
+                    </div>
+                  )}
                   {binderMode && (
                     <div className={`selection-badge ${isSelected ? 'selected' : ''}`}>
                       {isSelected ? '✓' : '+'}
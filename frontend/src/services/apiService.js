@@ -30,14 +30,21 @@ class ApiService {
       (response) => response,
       (error) => {
         if (error.response?.status === 401) {
-          localStorage.removeItem('token');
-          window.location.href = (process.env.PUBLIC_URL || '') + '/login';
+          this.redirectToLogin();
         }
         return Promise.reject(error);
       }
     );
   }
 
+  /**
+   * Jeton expiré ou invalide : le supprime et renvoie vers la page de connexion
+   */
+  redirectToLogin() {
+    localStorage.removeItem('token');
+    window.location.href = (process.env.PUBLIC_URL || '') + '/login';
+  }
+
   async get(url, config = {}) {
     const response = await this.client.get(url, config);
     return response.data;
@@ -37,12 +37,34 @@ class BinderService {
     }
   }
 
+  /**
+   * Crée un binder master set : un emplacement par carte de l'extension
+   * @param {Object} binderData - { name, size, description, set_id }
+   * @param {Array} setCards - cartes de l'extension (TCGdexService.getCardsBySet)
+   */
+  async createMasterSetBinder(binderData, setCards) {
+    try {
+      const response = await this.apiService.post('/user/binders/templates/master-set', {
+        ...binderData,
+        cards: setCards.map(card => ({ card_id: card.id, local_id: card.localId }))
+      });
+      return response; // apiService.post retourne déjà response.data
+    } catch (error) {
+      console.error('Erreur lors de la création du binder master set:', error);
+      throw new Error(
+        error.response?.data?.detail || 
+        'Erreur lors de la création du binder'
+      );
+    }
+  }
+
   /**
    * Récupère un binder spécifique par son ID
+   * @param {Object} [options] - { pages: '3-4' } ou { around: 7, window: 1 } pour ne charger qu'une fenêtre de pages
    */
-  async getBinderById(binderId) {
+  async getBinderById(binderId, options = {}) {
     try {
-      const response = await this.apiService.get(`/user/binders/${binderId}`);
+      const response = await this.apiService.get(`/user/binders/${binderId}`, { params: options });
       return response; // apiService.get retourne déjà response.data
     } catch (error) {
       console.error('Erreur lors de la récupération du binder:', error);
@@ -151,6 +173,143 @@ class BinderService {
     }
   }
 
+  /**
+   * S'abonne au flux SSE des modifications des binders (GET /user/binders/changes)
+   * fetch est utilisé plutôt qu'EventSource, qui ne permet pas d'envoyer le jeton d'authentification.
+   * @param {Object} knownVersions - { [binderId]: version } des binders ouverts, mis à jour à chaque événement
+   * @param {Function} onEvent - reçoit { binder_id, version, changes } ou { binder_id, deleted };
+   *   changes vaut null quand le binder doit être rechargé entièrement
+   * Un refus 4xx arrête le flux (401 : retour à la connexion) ; une erreur serveur ou réseau
+   * est retentée avec un délai croissant, remis à zéro dès qu'une connexion aboutit.
+   * @returns {Function} désabonnement
+   */
+  subscribeToChanges(knownVersions, onEvent) {
+    const baseURL = this.apiService.client?.defaults.baseURL;
+    if (!baseURL) {
+      return () => {}; // Mode statique : pas de flux
+    }
+    const controller = new AbortController();
+    const minRetryDelay = 2000;
+    const maxRetryDelay = 60000;
+    let retryDelay = minRetryDelay;
+
+    const connect = async () => {
+      const since = Object.entries(knownVersions)
+        .map(([binderId, version]) => `since=${binderId}:${version}`)
+        .join('&');
+      const response = await fetch(`${baseURL}/user/binders/changes?${since}`, {
+        headers: { Authorization: `Bearer ${localStorage.getItem('token')}` },
+        signal: controller.signal,
+      });
+      if (!response.ok) {
+        const error = new Error(`Flux des modifications refusé (HTTP ${response.status})`);
+        error.status = response.status;
+        throw error;
+      }
+      retryDelay = minRetryDelay;
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const blocks = buffer.split('\n\n');
+        buffer = blocks.pop();
+        for (const block of blocks) {
+          const data = block.split('\n').find(line => line.startsWith('data: '));
+          if (!data) continue; // keepalive
+          const event = JSON.parse(data.slice(6));
+          if (event.deleted) {
+            delete knownVersions[event.binder_id];
+          } else {
+            knownVersions[event.binder_id] = event.version;
+          }
+          onEvent(event);
+        }
+      }
+    };
+
+    const run = async () => {
+      while (!controller.signal.aborted) {
+        try {
+          await connect();
+        } catch (error) {
+          if (controller.signal.aborted) return;
+          if (error.status === 401) {
+            this.apiService.redirectToLogin();
+            return;
+          }
+          if (error.status >= 400 && error.status < 500) {
+            // Requête refusée : la reconnexion obtiendrait la même réponse
+            console.error('Flux des modifications abandonné:', error);
+            return;
+          }
+          console.error('Flux des modifications interrompu:', error);
+        }
+        // Reconnexion depuis les dernières versions reçues, espacée tant que le serveur échoue
+        const delay = retryDelay * (0.5 + Math.random() / 2);
+        retryDelay = Math.min(retryDelay * 2, maxRetryDelay);
+        await new Promise(resolve => setTimeout(resolve, delay));
+      }
+    };
+    run();
+    return () => controller.abort();
+  }
+
+  /**
+   * Déplace une carte d'un binder à un autre en une seule requête atomique
+   * @param {Object} moveData - { source_binder_id, source_page, source_position, destination_binder_id, destination_page?, destination_position? }
+   * @returns {Object} { source, destination } : les deux slots modifiés et la nouvelle version de chaque binder
+   */
+  async moveCardBetweenBinders(moveData) {
+    try {
+      const response = await this.apiService.post('/user/binders/move', moveData);
+      return response; // apiService.post retourne déjà response.data
+    } catch (error) {
+      console.error('Erreur lors du déplacement de carte entre binders:', error);
+      throw new Error(
+        error.response?.data?.detail?.message ||
+        error.response?.data?.detail ||
+        'Erreur lors du déplacement de la carte'
+      );
+    }
+  }
+
+  /**
+   * Applique un lot d'opérations en une seule requête (réorganisation)
+   * @param {Array} operations - ex: [{ op: 'move', source_page: 1, source_position: 0, destination_page: 2, destination_position: 3 }]
+   */
+  async applyOperations(binderId, operations) {
+    try {
+      const response = await this.apiService.post(`/user/binders/${binderId}/ops`, { operations });
+      return response; // apiService.post retourne déjà response.data
+    } catch (error) {
+      console.error('Erreur lors de l\'application des opérations au binder:', error);
+      throw new Error(
+        error.response?.data?.detail || 
+        'Erreur lors de l\'application des opérations'
+      );
+    }
+  }
+
+  /**
+   * Trie et compacte les cartes du binder côté serveur
+   * @param {Object} options - { sort_by: ['set'] | ['rarity', 'name'] | ['date_added'] | [], descending: false }
+   */
+  async reorganizeBinder(binderId, options = {}) {
+    try {
+      const response = await this.apiService.post(`/user/binders/${binderId}/reorganize`, options);
+      return response; // apiService.post retourne déjà response.data
+    } catch (error) {
+      console.error('Erreur lors de la réorganisation du binder:', error);
+      throw new Error(
+        error.response?.data?.detail || 
+        'Erreur lors de la réorganisation du binder'
+      );
+    }
+  }
+
   /**
    * Calcule le nombre de slots par page selon la taille
    */
@@ -47,6 +47,15 @@ class UserCardsService {
     }
   }
 
+  static async getUserCardLocations(cardId) {
+    try {
+      return await apiService.get(`/user/cards/${cardId}/locations`);
+    } catch (error) {
+      console.error('Erreur lors de la récupération des emplacements de la carte:', error);
+      throw error;
+    }
+  }
+
   static formatCardForCollection(card, set, quantity = 1, condition = 'Near Mint') {
     return {
       card_id: card.id,
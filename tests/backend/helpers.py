@@ -0,0 +1,82 @@
+"""
+Doublures MongoDB partagées par les tests du service des binders
+
+Les fichiers de tests importent ces helpers (from tests.backend.helpers import ...)
+puis ne surchargent que ce qui les concerne.
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from pymongo import UpdateOne
+
+
+class FakeCursor:
+    """Curseur Motor minimal (sort/limit/itération asynchrone), itérable plusieurs fois"""
+
+    def __init__(self, documents):
+        self._documents = list(documents)
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def limit(self, *args, **kwargs):
+        return self
+
+    def __aiter__(self):
+        self._iterator = iter(self._documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def binder_document(binder_id, user_id, **fields):
+    """Document binders au format binder_pages (compteurs et aperçu portés par le binder)"""
+    return {
+        "_id": binder_id, "user_id": user_id, "name": "Binder", "size": "3x3", "version": 1,
+        "page_count": 1, "card_count": 0, "preview_cards": [], "preview_through": 0,
+        "created_at": datetime.utcnow(), "updated_at": datetime.utcnow(), **fields,
+    }
+
+
+def make_binder_db(binder=None, pages=(), user_cards=(), locations=()):
+    """Base simulée pour les lectures et écritures du BinderService
+
+    Toutes les écritures réussissent (matched_count=1) ; les tests remplacent les
+    méthodes dont ils contrôlent le résultat ou inspectent les appels.
+    """
+    db = MagicMock()
+    db.binders.find_one = AsyncMock(return_value=binder)
+    db.binders.insert_one = AsyncMock()
+    db.binders.update_one = AsyncMock(return_value=SimpleNamespace(matched_count=1))
+    db.binders.delete_one = AsyncMock(return_value=SimpleNamespace(deleted_count=1))
+    db.binder_pages.find = MagicMock(return_value=FakeCursor(pages))
+    db.binder_pages.insert_many = AsyncMock()
+    db.binder_pages.bulk_write = AsyncMock()
+    db.binder_pages.delete_many = AsyncMock()
+    db.card_locations.find = MagicMock(return_value=FakeCursor(locations))
+    db.card_locations.bulk_write = AsyncMock()
+    db.card_locations.delete_many = AsyncMock()
+    db.user_cards.find = MagicMock(return_value=FakeCursor(user_cards))
+    db.user_cards.find_one = AsyncMock(return_value=None)
+    db.user_cards.update_one = AsyncMock(return_value=SimpleNamespace(matched_count=1))
+    db.users.update_one = AsyncMock()
+    return db
+
+
+def page_write(binder_id, user_id, page_number, cards):
+    """Écriture attendue d'une page dans binder_pages (opération du bulk_write du service)"""
+    return UpdateOne(
+        {"binder_id": binder_id, "page_number": page_number},
+        {"$set": {"user_id": user_id, "cards": list(cards)}},
+        upsert=True
+    )
+
+
+def bulk_operations(collection):
+    """Opérations passées au dernier bulk_write de la collection simulée"""
+    return collection.bulk_write.await_args.args[0]
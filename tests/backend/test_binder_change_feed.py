@@ -0,0 +1,177 @@
+"""
+Tests du flux des modifications de binders (GET /user/binders/changes, SSE)
+"""
+
+import sys
+import os
+import asyncio
+import json
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from main import app
+from dependencies import get_current_user, get_current_active_user, get_database
+from models.user import UserInDB
+from models.binder import BinderOperation
+from routers.binders import parse_known_versions, sse_stream
+from services.binder_service import BinderService
+from services.change_feed import BinderChangeFeed, BinderFeedSession, change_feed
+
+USER_ID = str(ObjectId())
+BINDER_ID = str(ObjectId())
+
+
+class FakeBinderService:
+    """Journal en mémoire : version courante et modifications par version"""
+
+    def __init__(self, version, changes=None):
+        self.version = version
+        self.changes = changes or {}
+
+    async def get_changes_since(self, binder_id, user_id, since_version):
+        if binder_id != BINDER_ID:
+            return None
+        return {
+            "version": self.version,
+            "changes": [self.changes.get(v, {"op": "slot", "version": v}) for v in range(since_version + 1, self.version + 1)]
+        }
+
+
+class FakeRequest:
+    """Requête déconnectée après `polls` vérifications"""
+
+    def __init__(self, polls):
+        self.polls = polls
+
+    async def is_disconnected(self):
+        self.polls -= 1
+        return self.polls < 0
+
+
+class TestChangeFeed:
+    """Tests du pub/sub en mémoire"""
+
+    @pytest.mark.asyncio
+    async def test_notifications_reach_only_the_owner(self):
+        feed = BinderChangeFeed()
+        async with feed.subscribe(USER_ID) as mine, feed.subscribe(str(ObjectId())) as other:
+            feed.notify(USER_ID, BINDER_ID, 4)
+            assert mine.get_nowait() == {"binder_id": BINDER_ID, "version": 4}
+            assert other.empty()
+        assert USER_ID not in feed._subscribers
+
+    @pytest.mark.asyncio
+    async def test_full_queue_is_replaced_by_a_resync(self):
+        feed = BinderChangeFeed(queue_size=2)
+        async with feed.subscribe(USER_ID) as queue:
+            for version in range(1, 4):
+                feed.notify(USER_ID, BINDER_ID, version)
+            assert queue.qsize() == 1 and queue.get_nowait() == {"resync": True}
+
+    @pytest.mark.asyncio
+    async def test_change_stream_event_is_dispatched(self):
+        feed = BinderChangeFeed()
+        async with feed.subscribe(USER_ID) as queue:
+            feed._dispatch({
+                "documentKey": {"_id": ObjectId(BINDER_ID)},
+                "fullDocument": {"user_id": ObjectId(USER_ID)},
+                "updateDescription": {"updatedFields": {"version": 9}},
+            })
+            assert queue.get_nowait() == {"binder_id": BINDER_ID, "version": 9}
+
+    @pytest.mark.asyncio
+    async def test_local_publication_is_skipped_while_watching(self):
+        feed = BinderChangeFeed()
+        feed._task = asyncio.get_running_loop().create_future()
+        async with feed.subscribe(USER_ID) as queue:
+            feed.notify(USER_ID, BINDER_ID, 2)
+            assert queue.empty()
+        feed._task.cancel()
+
+    @pytest.mark.asyncio
+    async def test_standalone_server_does_not_watch(self):
+        feed = BinderChangeFeed()
+        await feed.start(MagicMock())
+        assert not feed.watching
+
+
+@pytest.mark.asyncio
+class TestFeedSession:
+    """Tests de l'envoi des deltas à une connexion"""
+
+    async def test_reconnect_catches_up_from_known_version(self):
+        session = BinderFeedSession(FakeBinderService(7), USER_ID, {BINDER_ID: 5})
+        events = await session.catch_up()
+        assert [c["version"] for c in events[0]["changes"]] == [6, 7]
+        # Les notifications des versions déjà rattrapées ne sont pas renvoyées
+        assert await session.handle({"binder_id": BINDER_ID, "version": 7}) == []
+
+    async def test_untracked_binder_gets_only_the_notified_change(self):
+        session = BinderFeedSession(FakeBinderService(3), USER_ID)
+        events = await session.handle({"binder_id": BINDER_ID, "version": 3})
+        assert events == [{"binder_id": BINDER_ID, "version": 3, "changes": [{"op": "slot", "version": 3}]}]
+
+    async def test_foreign_binder_is_ignored(self):
+        session = BinderFeedSession(FakeBinderService(3), USER_ID)
+        assert await session.handle({"binder_id": str(ObjectId()), "version": 3}) == []
+
+    async def test_deletion_stops_tracking(self):
+        session = BinderFeedSession(FakeBinderService(3), USER_ID, {BINDER_ID: 3})
+        assert await session.handle({"binder_id": BINDER_ID, "deleted": True}) == [{"binder_id": BINDER_ID, "deleted": True}]
+        assert session.known_versions == {}
+
+
+@pytest.mark.asyncio
+class TestSseStream:
+    """Tests du format SSE"""
+
+    async def test_catch_up_then_notifications_then_keepalive(self):
+        queue = asyncio.Queue()
+        session = BinderFeedSession(FakeBinderService(2), USER_ID, {BINDER_ID: 1})
+        queue.put_nowait({"binder_id": BINDER_ID, "version": 2})
+        chunks = [chunk async for chunk in sse_stream(FakeRequest(polls=2), session, queue, keepalive=0.01)]
+
+        assert chunks[0].startswith(f"id: {BINDER_ID}:2\nevent: changes\ndata: ")
+        assert json.loads(chunks[0].split("data: ")[1])["changes"] == [{"op": "slot", "version": 2}]
+        # La notification de la version déjà rattrapée ne produit rien ; puis keepalive
+        assert chunks[1:] == [": keepalive\n\n"]
+
+    async def test_binder_write_is_published(self):
+        db = MagicMock()
+        db.binders.find_one = AsyncMock(return_value={
+            "_id": ObjectId(BINDER_ID), "user_id": ObjectId(USER_ID), "name": "B", "size": "3x3", "version": 4,
+            "page_count": 1, "card_count": 0, "preview_cards": ["a", "b", "c", "d"], "preview_through": 1,
+            "created_at": datetime.utcnow(), "updated_at": datetime.utcnow(),
+        })
+        db.binders.update_one = AsyncMock(return_value=SimpleNamespace(matched_count=1))
+        db.users.update_one = AsyncMock()
+        async with change_feed.subscribe(USER_ID) as queue:
+            await BinderService(db).apply_operations(BINDER_ID, USER_ID, [BinderOperation(op="add_page")])
+            assert queue.get_nowait() == {"binder_id": BINDER_ID, "version": 5}
+
+
+class TestChangesRoute:
+    """Tests des paramètres de GET /user/binders/changes"""
+
+    def setup_method(self):
+        user = UserInDB(_id=ObjectId(USER_ID), email="feed@example.com", username="feeduser", hashed_password="x")
+        app.dependency_overrides[get_current_user] = lambda: user
+        app.dependency_overrides[get_current_active_user] = lambda: user
+        app.dependency_overrides[get_database] = lambda: MagicMock()
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_known_versions_merge_last_event_id(self):
+        assert parse_known_versions([f"{BINDER_ID}:3"], f"{BINDER_ID}:5") == {BINDER_ID: 5}
+
+    def test_invalid_since_returns_400(self):
+        response = self.client.get("/user/binders/changes", params={"since": "abc:1"})
+        assert response.status_code == 400
@@ -0,0 +1,151 @@
+"""
+Tests de la concurrence optimiste sur les binders (version, If-Match, 412/409 avec delta)
+"""
+
+import sys
+import os
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from tests.backend.helpers import binder_document, make_binder_db
+from main import app
+from dependencies import get_current_user, get_current_active_user, get_database
+from models.binder import MoveCardInBinder
+from models.user import UserInDB
+from services.binder_service import BinderService, BinderVersionConflict
+from utils.http_cache import binder_etag, etag_matches, if_match_version
+
+USER_ID = ObjectId()
+BINDER_ID = ObjectId()
+
+
+def make_binder_doc(version=5, changes=None):
+    return binder_document(
+        BINDER_ID, USER_ID, description=None, is_public=False, version=version, card_count=1, changes=changes or []
+    )
+
+
+def make_db(binder_doc, matched=1):
+    db = make_binder_db(binder_doc, pages=[
+        {"page_number": 1, "cards": [{"position": 0, "card_id": "sv1-1", "user_card_id": str(ObjectId())}]}
+    ])
+    db.binders.update_one = AsyncMock(return_value=SimpleNamespace(matched_count=matched))
+    return db
+
+
+MOVE = MoveCardInBinder(source_page=1, source_position=0, destination_page=1, destination_position=4)
+
+
+class TestIfMatchParsing:
+    """Tests de l'extraction de la version depuis If-Match"""
+
+    def test_strong_and_weak_etags(self):
+        binder_id = str(BINDER_ID)
+        assert if_match_version(binder_etag(binder_id, 7), binder_id) == 7
+        assert if_match_version(f"W/{binder_etag(binder_id, 7)}", binder_id) == 7
+
+    def test_absent_or_wildcard(self):
+        assert if_match_version(None, "abc") is None
+        assert if_match_version("*", "abc") is None
+
+    def test_foreign_etag_never_matches(self):
+        assert if_match_version(binder_etag("other", 7), "abc") == -1
+        assert if_match_version('"garbage"', "abc") == -1
+
+
+@pytest.mark.asyncio
+class TestConditionalWrites:
+    """Tests des écritures conditionnelles du BinderService"""
+
+    async def test_write_filters_on_read_version_and_logs_delta(self):
+        """La mise à jour cible {_id, version} lue et journalise les slots modifiés"""
+        db = make_db(make_binder_doc(version=5))
+        await BinderService(db).move_card_in_binder(str(BINDER_ID), str(USER_ID), MOVE)
+
+        query, update = db.binders.update_one.await_args_list[0].args
+        assert query["version"] == 5
+        assert update["$set"]["version"] == 6
+        logged = update["$push"]["changes"]["$each"]
+        assert [(c["position"], c["card_id"], c["version"]) for c in logged] == [(0, None, 6), (4, "sv1-1", 6)]
+
+    async def test_legacy_binder_without_version(self):
+        """Un binder sans champ version est traité comme version 0"""
+        doc = make_binder_doc()
+        del doc["version"]
+        db = make_db(doc)
+        await BinderService(db).move_card_in_binder(str(BINDER_ID), str(USER_ID), MOVE)
+        query, update = db.binders.update_one.await_args_list[0].args
+        assert query["version"] == {"$in": [0, None]}
+        assert update["$set"]["version"] == 1
+
+    async def test_stale_if_match_rejected_before_write(self):
+        """Une version attendue obsolète lève un conflit avec le delta manquant"""
+        changes = [{"version": 5, "op": "slot", "page_number": 1, "position": 2, "card_id": "x", "user_card_id": "y"}]
+        db = make_db(make_binder_doc(version=5, changes=changes))
+
+        with pytest.raises(BinderVersionConflict) as exc:
+            await BinderService(db).move_card_in_binder(str(BINDER_ID), str(USER_ID), MOVE, expected_version=4)
+
+        assert exc.value.current_version == 5
+        assert exc.value.changes == changes
+        db.binders.update_one.assert_not_called()
+
+    async def test_concurrent_write_between_read_and_update(self):
+        """Aucun document ne correspond au filtre de version : conflit au lieu d'un écrasement"""
+        db = make_db(make_binder_doc(version=5), matched=0)
+        with pytest.raises(BinderVersionConflict):
+            await BinderService(db).move_card_in_binder(str(BINDER_ID), str(USER_ID), MOVE)
+        db.users.update_one.assert_not_called()
+
+    async def test_truncated_log_requires_reload(self):
+        """Si le journal ne couvre pas l'intervalle, changes vaut None"""
+        changes = [{"version": 9, "op": "reset"}]
+        db = make_db(make_binder_doc(version=9, changes=changes))
+        delta = await BinderService(db).get_changes_since(str(BINDER_ID), str(USER_ID), 3)
+        assert delta == {"version": 9, "changes": None}
+
+
+class TestIfMatchRoutes:
+    """Tests des routes de mutation avec If-Match"""
+
+    def setup_method(self):
+        self.db = make_db(make_binder_doc(version=5))
+        user = UserInDB(_id=USER_ID, email="cc@example.com", username="ccuser", hashed_password="x")
+        app.dependency_overrides[get_current_user] = lambda: user
+        app.dependency_overrides[get_current_active_user] = lambda: user
+        app.dependency_overrides[get_database] = lambda: self.db
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_stale_if_match_returns_412_with_delta(self):
+        response = self.client.patch(
+            f"/user/binders/{BINDER_ID}/cards/move",
+            json=MOVE.dict(),
+            headers={"If-Match": binder_etag(str(BINDER_ID), 4)}
+        )
+        assert response.status_code == 412
+        detail = response.json()["detail"]
+        assert detail["current_version"] == 5
+        assert etag_matches(response.headers["etag"], binder_etag(str(BINDER_ID), 5))
+
+    def test_matching_if_match_writes_and_returns_etag(self):
+        response = self.client.patch(
+            f"/user/binders/{BINDER_ID}/cards/move",
+            json=MOVE.dict(),
+            headers={"If-Match": binder_etag(str(BINDER_ID), 5)}
+        )
+        assert response.status_code == 200
+        self.db.binder_pages.bulk_write.assert_awaited_once()
+        assert "etag" in response.headers
+
+    def test_race_without_precondition_returns_409(self):
+        self.db.binders.update_one = AsyncMock(return_value=SimpleNamespace(matched_count=0))
+        response = self.client.patch(f"/user/binders/{BINDER_ID}/cards/move", json=MOVE.dict())
+        assert response.status_code == 409
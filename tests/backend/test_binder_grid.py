@@ -0,0 +1,89 @@
+"""
+Tests de la grille BinderGrid (tableaux plats + bitmap des slots)
+"""
+
+import sys
+import os
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from models.binder_grid import BinderGrid
+
+
+def card(name):
+    return {"card_id": name, "user_card_id": f"uc-{name}"}
+
+
+class TestBinderGrid:
+    """Tests des opérations de la grille"""
+
+    def test_first_free_skips_occupied_and_unloaded_pages(self):
+        grid = BinderGrid.from_pages(4, 3, {1: {i: card(f"a{i}") for i in range(4)}, 3: {0: card("c0")}})
+        # Page 2 non chargée : indisponible pour le placement automatique
+        assert grid.first_free() == (3, 1)
+
+    def test_place_first_free_adds_page_when_full(self):
+        grid = BinderGrid.from_pages(2, 1, {1: {0: card("a"), 1: card("b")}})
+        assert grid.place_first_free(card("c")) == (2, 0)
+        assert grid.added_pages == [2]
+        assert grid.dirty_pages() == {2: {0: card("c")}}
+
+    def test_removal_moves_first_free_pointer_back(self):
+        grid = BinderGrid.from_pages(3, 2, {1: {0: card("a"), 1: card("b"), 2: card("c")}, 2: {}})
+        assert grid.first_free() == (2, 0)
+        grid.remove(1, 1)
+        assert grid.first_free() == (1, 1)
+
+    def test_move_validation_messages(self):
+        grid = BinderGrid.from_pages(9, 2, {1: {0: card("a"), 1: card("b")}, 2: {}})
+        with pytest.raises(ValueError, match="Numéro de page invalide"):
+            grid.move(1, 0, 3, 0)
+        with pytest.raises(ValueError, match="Position invalide"):
+            grid.move(1, 0, 1, 9)
+        with pytest.raises(ValueError, match="Aucune carte"):
+            grid.move(2, 0, 2, 1)
+        with pytest.raises(ValueError, match="déjà occupée"):
+            grid.move(1, 0, 1, 1)
+
+    def test_move_across_pages_tracks_dirty_slots_in_order(self):
+        grid = BinderGrid.from_pages(9, 2, {1: {4: card("a")}, 2: {}})
+        grid.move(1, 4, 2, 8)
+        assert grid.dirty_slots == [(1, 4), (2, 8)]
+        assert grid.dirty_pages() == {1: {}, 2: {8: card("a")}}
+        assert grid.card_delta == 0 and grid.count == 1
+
+    def test_swap_with_empty_slot(self):
+        grid = BinderGrid.from_pages(4, 1, {1: {0: card("a"), 1: card("b")}})
+        grid.swap(1, 0, 1, 1)
+        assert grid.page_cards(1) == {0: card("b"), 1: card("a")}
+        grid.swap(1, 1, 1, 3)
+        assert grid.page_cards(1) == {0: card("b"), 3: card("a")}
+
+    def test_unloaded_page_cannot_be_written(self):
+        grid = BinderGrid.from_pages(4, 2, {1: {}})
+        with pytest.raises(RuntimeError):
+            grid.place(2, 0, card("a"))
+
+    def test_cards_in_order_follows_reading_order(self):
+        grid = BinderGrid.from_pages(3, 2, {2: {0: card("c")}, 1: {2: card("b"), 0: card("a")}})
+        assert [c["card_id"] for _, _, c in grid.cards_in_order()] == ["a", "b", "c"]
+        assert grid.page_count_cards(1) == 2
+
+    def test_packed_grid_fills_pages_in_order(self):
+        grid = BinderGrid.packed(4, [card(f"c{i}") for i in range(9)])
+        assert grid.page_count == 3 and grid.count == 9 and grid.card_delta == 9
+        assert list(grid.page_cards(3)) == [0]
+        assert BinderGrid.packed(4, []).page_count == 1
+
+    def test_reserved_slot_is_filled_by_its_card_only(self):
+        grid = BinderGrid.from_pages(4, 1, {1: {2: {"card_id": "sv1-3", "user_card_id": None}}}, reservations=True)
+        assert grid.reserved_slot("sv1-3") == (1, 2)
+        with pytest.raises(ValueError, match="déjà occupé"):
+            grid.place(1, 2, card("sv1-4"))
+        grid.place(1, 2, {"card_id": "sv1-3", "user_card_id": "uc-1"})
+        assert grid.card_delta == 1 and grid.reserved_slot("sv1-3") is None
+        # Retirer la carte rend son emplacement réservé : une carte possédée en moins
+        grid.remove(1, 2)
+        assert grid.page_cards(1) == {2: {"card_id": "sv1-3", "user_card_id": None}}
+        assert grid.card_delta == 0 and grid.count == 1 and grid.card_count == 0
@@ -0,0 +1,145 @@
+"""
+Tests par propriétés de BinderGrid : la grille se comporte comme un simple dict {(page, position): carte}
+"""
+
+import sys
+import os
+import pytest
+
+hypothesis = pytest.importorskip("hypothesis")
+from hypothesis import given, settings, strategies as st
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from models.binder_grid import BinderGrid
+
+SLOTS = st.sampled_from([4, 9, 16, 25])
+PAGE = st.integers(min_value=0, max_value=6)
+POSITION = st.integers(min_value=-1, max_value=26)
+OPERATIONS = st.lists(
+    st.one_of(
+        st.tuples(st.just("place"), PAGE, POSITION),
+        st.tuples(st.just("remove"), PAGE, POSITION),
+        st.tuples(st.just("move"), PAGE, POSITION, PAGE, POSITION),
+        st.tuples(st.just("swap"), PAGE, POSITION, PAGE, POSITION),
+        st.tuples(st.just("auto")),
+        st.tuples(st.just("add_page")),
+    ),
+    max_size=60
+)
+
+
+class ReferenceBinder:
+    """Modèle de référence : parcours de dicts, comme l'ancien code du service"""
+
+    def __init__(self, slots_per_page, page_count):
+        self.slots_per_page = slots_per_page
+        self.page_count = page_count
+        self.cards = {}
+
+    def check(self, page, position):
+        if page < 1 or page > self.page_count:
+            raise ValueError("Numéro de page invalide")
+        if position < 0 or position >= self.slots_per_page:
+            raise ValueError("Position invalide")
+
+    def place(self, page, position, card):
+        self.check(page, position)
+        if (page, position) in self.cards:
+            raise ValueError("Ce slot est déjà occupé")
+        self.cards[(page, position)] = card
+
+    def remove(self, page, position):
+        self.check(page, position)
+        return self.cards.pop((page, position), None)
+
+    def move(self, sp, spos, dp, dpos):
+        self.check(sp, spos)
+        self.check(dp, dpos)
+        if (sp, spos) not in self.cards:
+            raise ValueError("Aucune carte à la position source")
+        if (dp, dpos) in self.cards:
+            raise ValueError("La position de destination est déjà occupée")
+        self.cards[(dp, dpos)] = self.cards.pop((sp, spos))
+
+    def swap(self, pa, posa, pb, posb):
+        self.check(pa, posa)
+        self.check(pb, posb)
+        a, b = self.cards.pop((pa, posa), None), self.cards.pop((pb, posb), None)
+        if a is None and b is None:
+            raise ValueError("Aucune carte à échanger")
+        if b is not None:
+            self.cards[(pa, posa)] = b
+        if a is not None:
+            self.cards[(pb, posb)] = a
+
+    def first_free(self):
+        for page in range(1, self.page_count + 1):
+            for position in range(self.slots_per_page):
+                if (page, position) not in self.cards:
+                    return page, position
+        return None
+
+    def auto(self, card):
+        slot = self.first_free()
+        if slot is None:
+            self.page_count += 1
+            slot = (self.page_count, 0)
+        self.cards[slot] = card
+        return slot
+
+
+def apply(target, operation, counter):
+    name, *args = operation
+    card = {"card_id": f"c{counter}", "user_card_id": f"u{counter}"}
+    try:
+        if name == "place":
+            target.place(*args, card)
+        elif name == "remove":
+            target.remove(*args)
+        elif name == "move":
+            target.move(*args)
+        elif name == "swap":
+            target.swap(*args)
+        elif name == "auto":
+            return target.auto(card) if isinstance(target, ReferenceBinder) else target.place_first_free(card)
+        else:
+            if isinstance(target, ReferenceBinder):
+                target.page_count += 1
+                return target.page_count
+            return target.add_page()
+    except ValueError as e:
+        return ("error", str(e))
+
+
+@settings(max_examples=300, deadline=None)
+@given(slots_per_page=SLOTS, page_count=st.integers(min_value=0, max_value=4), operations=OPERATIONS)
+def test_grid_matches_reference_model(slots_per_page, page_count, operations):
+    grid = BinderGrid.from_pages(slots_per_page, page_count, {n: {} for n in range(1, page_count + 1)})
+    reference = ReferenceBinder(slots_per_page, page_count)
+
+    for counter, operation in enumerate(operations):
+        assert apply(grid, operation, counter) == apply(reference, operation, counter)
+        assert grid.count == len(reference.cards)
+        assert grid.page_count == reference.page_count
+        assert grid.first_free() == reference.first_free()
+
+    for page in range(1, reference.page_count + 1):
+        expected = {pos: card for (p, pos), card in reference.cards.items() if p == page}
+        assert grid.page_cards(page) == expected
+
+
+@settings(max_examples=200, deadline=None)
+@given(slots_per_page=SLOTS, operations=OPERATIONS)
+def test_dirty_pages_cover_every_change(slots_per_page, operations):
+    """Réécrire les pages sales sur l'état initial redonne l'état final"""
+    initial = {1: {0: {"card_id": "x", "user_card_id": "y"}}, 2: {}, 3: {}}
+    grid = BinderGrid.from_pages(slots_per_page, 3, initial)
+    for counter, operation in enumerate(operations):
+        apply(grid, operation, counter)
+
+    stored = {n: dict(cards) for n, cards in initial.items()}
+    stored.update(grid.dirty_pages())
+    for page in range(1, grid.page_count + 1):
+        assert stored.get(page, {}) == grid.page_cards(page)
+    assert sum(len(cards) for cards in stored.values()) == 1 + grid.card_delta
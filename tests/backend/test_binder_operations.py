@@ -0,0 +1,133 @@
+"""
+Tests du lot d'opérations sur un binder (POST /user/binders/{id}/ops)
+"""
+
+import sys
+import os
+import pytest
+from unittest.mock import MagicMock
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from tests.backend.helpers import FakeCursor, binder_document, bulk_operations, make_binder_db, page_write
+from main import app
+from dependencies import get_current_user, get_current_active_user, get_database
+from models.user import UserInDB
+from models.binder import BinderOperation
+from services.binder_service import BinderService
+from utils.http_cache import binder_etag
+
+USER_ID = ObjectId()
+BINDER_ID = ObjectId()
+USER_CARD_ID = ObjectId()
+
+
+def make_db(page_docs, page_count=3):
+    return make_binder_db(
+        binder_document(BINDER_ID, USER_ID, name="Lot", version=5, page_count=page_count, card_count=2),
+        pages=page_docs, user_cards=[{"_id": USER_CARD_ID, "card_id": "sv1-25"}]
+    )
+
+
+def page_doc(page_number, *positions):
+    return {"page_number": page_number, "cards": [
+        {"position": p, "card_id": f"c{page_number}-{p}", "user_card_id": None} for p in positions
+    ]}
+
+
+def ops(*operations):
+    return [BinderOperation(**operation) for operation in operations]
+
+
+@pytest.mark.asyncio
+class TestApplyOperations:
+    """Tests de BinderService.apply_operations"""
+
+    async def test_batch_is_written_once(self):
+        db = make_db([page_doc(1, 0, 1)])
+        await BinderService(db).apply_operations(str(BINDER_ID), str(USER_ID), ops(
+            {"op": "move", "source_page": 1, "source_position": 0, "destination_page": 2, "destination_position": 4},
+            {"op": "swap", "source_page": 1, "source_position": 1, "destination_page": 1, "destination_position": 8},
+            {"op": "add", "user_card_id": str(USER_CARD_ID), "page_number": 1, "position": 0},
+        ))
+
+        # Une seule réservation de version et un seul bulk_write pour tout le lot
+        claim = db.binders.update_one.await_args_list[0]
+        assert claim.args[0]["version"] == 5
+        assert claim.args[1]["$set"]["version"] == 6
+        assert claim.args[1]["$inc"] == {"card_count": 1}
+        db.binder_pages.bulk_write.assert_awaited_once()
+        assert bulk_operations(db.binder_pages) == [
+            page_write(BINDER_ID, USER_ID, 1, [
+                {"position": 0, "card_id": "sv1-25", "user_card_id": str(USER_CARD_ID)},
+                {"position": 8, "card_id": "c1-1", "user_card_id": None},
+            ]),
+            page_write(BINDER_ID, USER_ID, 2, [{"position": 4, "card_id": "c1-0", "user_card_id": None}]),
+        ]
+        # Seules les pages citées sont lues
+        assert db.binder_pages.find.call_args_list[0].args[0]["page_number"] == {"$in": [1, 2]}
+
+    async def test_invalid_operation_rejects_whole_batch(self):
+        db = make_db([page_doc(1, 0)])
+        with pytest.raises(ValueError, match="Opération 2 \\(move\\): Aucune carte à la position source"):
+            await BinderService(db).apply_operations(str(BINDER_ID), str(USER_ID), ops(
+                {"op": "remove", "page_number": 1, "position": 0},
+                {"op": "move", "source_page": 1, "source_position": 0, "destination_page": 1, "destination_position": 1},
+            ))
+        db.binders.update_one.assert_not_called()
+        db.binder_pages.bulk_write.assert_not_called()
+
+    async def test_auto_placement_on_added_page(self):
+        db = make_db([page_doc(1, *range(9))], page_count=1)
+        await BinderService(db).apply_operations(str(BINDER_ID), str(USER_ID), ops(
+            {"op": "add_page"},
+            {"op": "add", "user_card_id": str(USER_CARD_ID)},
+        ))
+        claim = db.binders.update_one.await_args_list[0].args[1]
+        assert claim["$set"]["page_count"] == 2
+        assert claim["$push"]["changes"]["$each"][0] == {"op": "page_added", "page_number": 2, "version": 6}
+        # Placement automatique : tout le binder est chargé
+        assert "page_number" not in db.binder_pages.find.call_args_list[0].args[0]
+
+    async def test_foreign_user_card_is_rejected(self):
+        db = make_db([])
+        db.user_cards.find = MagicMock(return_value=FakeCursor([]))
+        with pytest.raises(ValueError, match="non trouvée ou non autorisée"):
+            await BinderService(db).apply_operations(str(BINDER_ID), str(USER_ID), ops(
+                {"op": "add", "user_card_id": str(ObjectId())},
+            ))
+        assert db.user_cards.find.call_args.args[0]["user_id"] == USER_ID
+
+
+class TestOperationsRoute:
+    """Tests de la route POST /user/binders/{id}/ops"""
+
+    def setup_method(self):
+        self.db = make_db([page_doc(1, 0)])
+        user = UserInDB(_id=USER_ID, email="ops@example.com", username="opsuser", hashed_password="x")
+        app.dependency_overrides[get_current_user] = lambda: user
+        app.dependency_overrides[get_current_active_user] = lambda: user
+        app.dependency_overrides[get_database] = lambda: self.db
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_missing_fields_return_400(self):
+        response = self.client.post(f"/user/binders/{BINDER_ID}/ops", json={"operations": [{"op": "remove", "page_number": 1}]})
+        assert response.status_code == 400
+        assert "position" in response.json()["detail"]
+
+    def test_empty_batch_is_rejected(self):
+        response = self.client.post(f"/user/binders/{BINDER_ID}/ops", json={"operations": []})
+        assert response.status_code == 422
+
+    def test_stale_if_match_returns_412(self):
+        response = self.client.post(
+            f"/user/binders/{BINDER_ID}/ops",
+            json={"operations": [{"op": "add_page"}]},
+            headers={"If-Match": binder_etag(str(BINDER_ID), 4)}
+        )
+        assert response.status_code == 412
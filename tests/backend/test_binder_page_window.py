@@ -0,0 +1,91 @@
+"""
+Tests du chargement fenêtré des pages d'un binder (?pages=3-4, ?around=7&window=1)
+"""
+
+import sys
+import os
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from tests.backend.helpers import FakeCursor
+from main import app
+from dependencies import get_current_user, get_current_active_user, get_database
+from models.user import UserInDB
+from routers.binders import parse_page_range, MAX_PAGE_WINDOW
+
+USER_ID = ObjectId()
+BINDER_ID = ObjectId()
+
+
+def page_doc(page_number):
+    return {"page_number": page_number, "cards": [
+        {"position": 0, "card_id": f"sv1-{page_number}", "user_card_id": str(ObjectId())}
+    ]}
+
+
+class TestParsePageRange:
+    """Tests de l'interprétation des paramètres de fenêtre"""
+
+    def test_explicit_range_and_single_page(self):
+        assert parse_page_range("3-4", None, 1) == (3, 4)
+        assert parse_page_range("5", None, 1) == (5, 5)
+
+    def test_around_window_is_clamped_at_first_page(self):
+        assert parse_page_range(None, 7, 1) == (6, 8)
+        assert parse_page_range(None, 1, 2) == (1, 3)
+
+    def test_no_window_means_all_pages(self):
+        assert parse_page_range(None, None, 1) is None
+
+    def test_invalid_ranges(self):
+        with pytest.raises(ValueError):
+            parse_page_range("4-3", None, 1)
+        with pytest.raises(ValueError):
+            parse_page_range(f"1-{MAX_PAGE_WINDOW + 1}", None, 1)
+
+
+class TestWindowedBinder:
+    """Tests de GET /user/binders/{id} avec une fenêtre de pages"""
+
+    def setup_method(self):
+        self.db = MagicMock()
+        self.db.binders.find_one = AsyncMock(return_value={
+            "_id": BINDER_ID, "user_id": USER_ID, "name": "Gros binder", "size": "3x3",
+            "version": 2, "page_count": 120, "card_count": 800,
+            "created_at": datetime.utcnow(), "updated_at": datetime.utcnow(),
+        })
+        self.db.binder_pages.find = MagicMock(side_effect=lambda query, projection=None: FakeCursor(
+            [page_doc(n) for n in query["page_number"]["$in"]]
+        ))
+        self.db.user_cards.find = MagicMock(return_value=FakeCursor([]))
+        user = UserInDB(_id=USER_ID, email="win@example.com", username="winuser", hashed_password="x")
+        app.dependency_overrides[get_current_user] = lambda: user
+        app.dependency_overrides[get_current_active_user] = lambda: user
+        app.dependency_overrides[get_database] = lambda: self.db
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_page_range_fetches_only_requested_pages(self):
+        response = self.client.get(f"/user/binders/{BINDER_ID}?pages=3-4")
+        assert response.status_code == 200
+        body = response.json()
+        assert [page["page_number"] for page in body["pages"]] == [3, 4]
+        assert body["total_pages"] == 120 and body["total_cards"] == 800
+        assert self.db.binder_pages.find.call_args.args[0]["page_number"] == {"$in": [3, 4]}
+        # Une seule requête d'enrichissement pour toute la fenêtre
+        assert self.db.user_cards.find.call_count == 1
+
+    def test_around_window_is_clamped_at_last_page(self):
+        response = self.client.get(f"/user/binders/{BINDER_ID}?around=120&window=2")
+        assert [page["page_number"] for page in response.json()["pages"]] == [118, 119, 120]
+
+    def test_invalid_range_returns_400(self):
+        assert self.client.get(f"/user/binders/{BINDER_ID}?pages=9-2").status_code == 400
+        assert self.client.get(f"/user/binders/{BINDER_ID}?pages=abc").status_code == 422
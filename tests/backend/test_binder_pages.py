@@ -0,0 +1,179 @@
+"""
+Tests de la collection binder_pages (une page par document, lectures/écritures limitées aux pages touchées)
+"""
+
+import sys
+import os
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from tests.backend.helpers import FakeCursor, binder_document, bulk_operations, make_binder_db, page_write
+from models.binder import AddCardToBinder, MoveCardInBinder, BinderUpdate
+from services.binder_service import BinderService
+from migrations.m002_binder_pages_collection import split_binder
+
+USER_ID = ObjectId()
+BINDER_ID = ObjectId()
+
+
+class FakePages:
+    """Collection binder_pages en mémoire (sous-ensemble des filtres utilisés par le service)"""
+
+    def __init__(self, pages):
+        self.docs = {page["page_number"]: {"binder_id": BINDER_ID, **page} for page in pages}
+        self.queries = []
+        self.bulk_write = AsyncMock()
+        self.delete_many = AsyncMock()
+
+    def _matches(self, doc, query):
+        for key, condition in query.items():
+            if key == "page_number" and isinstance(condition, dict):
+                if doc["page_number"] not in condition["$in"]:
+                    return False
+            elif key.startswith("cards."):
+                index = int(key.split(".")[1])
+                if (len(doc["cards"]) > index) != condition["$exists"]:
+                    return False
+            elif doc.get(key) != condition:
+                return False
+        return True
+
+    def find(self, query, projection=None, session=None):
+        self.queries.append(query)
+        return FakeCursor([doc for _, doc in sorted(self.docs.items()) if self._matches(doc, query)])
+
+
+def full_page(page_number, slots=9):
+    return {"page_number": page_number, "cards": [
+        {"position": i, "card_id": f"c{page_number}-{i}", "user_card_id": None} for i in range(slots)
+    ]}
+
+
+def make_db(page_count, page_docs, **binder_fields):
+    db = make_binder_db(binder_document(
+        BINDER_ID, USER_ID, name="B", version=3, page_count=page_count,
+        preview_cards=["a", "b", "c", "d"], preview_through=1, **binder_fields
+    ))
+    db.binder_pages = FakePages(page_docs)
+    return db
+
+
+@pytest.mark.asyncio
+class TestBinderPagesService:
+    """Tests du BinderService sur la collection binder_pages"""
+
+    async def test_move_reads_and_writes_only_involved_pages(self):
+        db = make_db(40, [full_page(n) for n in range(1, 41)])
+        db.binder_pages.docs[7]["cards"] = db.binder_pages.docs[7]["cards"][:1]
+        move = MoveCardInBinder(source_page=7, source_position=0, destination_page=30, destination_position=0)
+        db.binder_pages.docs[30]["cards"] = []
+
+        await BinderService(db).move_card_in_binder(str(BINDER_ID), str(USER_ID), move)
+
+        assert db.binder_pages.queries[0]["page_number"] == {"$in": [7, 30]}
+        assert bulk_operations(db.binder_pages) == [
+            page_write(BINDER_ID, USER_ID, 7, []),
+            page_write(BINDER_ID, USER_ID, 30, [{"position": 0, "card_id": "c7-0", "user_card_id": None}]),
+        ]
+
+    async def test_auto_placement_skips_full_pages(self):
+        user_card_id = ObjectId()
+        db = make_db(3, [full_page(1), full_page(2)])
+        db.user_cards.find_one = AsyncMock(return_value={"_id": user_card_id, "card_id": "sv1-1"})
+
+        await BinderService(db).add_card_to_binder(str(BINDER_ID), str(USER_ID), AddCardToBinder(user_card_id=str(user_card_id)))
+
+        assert bulk_operations(db.binder_pages) == [
+            page_write(BINDER_ID, USER_ID, 3, [{"position": 0, "card_id": "sv1-1", "user_card_id": str(user_card_id)}])
+        ]
+        claim = db.binders.update_one.await_args_list[0].args[1]
+        assert claim["$inc"] == {"card_count": 1}
+        assert "page_count" not in claim["$set"]
+
+    async def test_full_binder_gets_new_page(self):
+        user_card_id = ObjectId()
+        db = make_db(1, [full_page(1)])
+        db.user_cards.find_one = AsyncMock(return_value={"_id": user_card_id, "card_id": "sv1-1"})
+
+        await BinderService(db).add_card_to_binder(str(BINDER_ID), str(USER_ID), AddCardToBinder(user_card_id=str(user_card_id)))
+
+        assert bulk_operations(db.binder_pages) == [
+            page_write(BINDER_ID, USER_ID, 2, [{"position": 0, "card_id": "sv1-1", "user_card_id": str(user_card_id)}])
+        ]
+        assert db.binders.update_one.await_args_list[0].args[1]["$set"]["page_count"] == 2
+
+    async def test_add_page_writes_no_page_document(self):
+        db = make_db(2, [])
+        await BinderService(db).add_page_to_binder(str(BINDER_ID), str(USER_ID))
+        db.binder_pages.bulk_write.assert_not_called()
+        assert db.binders.update_one.await_args_list[0].args[1]["$set"]["page_count"] == 3
+
+    async def test_response_fills_missing_pages(self):
+        db = make_db(3, [full_page(2)], card_count=9)
+        binder = await BinderService(db).get_binder_by_id(str(BINDER_ID), str(USER_ID))
+        assert [page.page_number for page in binder.pages] == [1, 2, 3]
+        assert binder.total_cards == 9
+        assert binder.pages[0].slots[0].card_id is None
+
+    async def test_summaries_read_no_pages(self):
+        db = make_db(5, [full_page(1)], card_count=9)
+        db.binders.find = MagicMock(return_value=FakeCursor([await db.binders.find_one()]))
+        summaries = await BinderService(db).get_user_binders(str(USER_ID))
+        assert summaries[0].total_cards == 9 and summaries[0].total_pages == 5
+        assert summaries[0].preview_cards == ["a", "b", "c", "d"]
+        assert db.binder_pages.queries == []
+
+    async def test_embedded_binder_split_on_first_write(self):
+        """Un binder à pages embarquées est converti à sa première écriture"""
+        db = make_db(0, [], pages=[
+            {"page_number": 1, "cards": [{"position": 0, "card_id": "x", "user_card_id": None}]},
+            {"page_number": 2, "cards": []},
+        ])
+        await BinderService(db).add_page_to_binder(str(BINDER_ID), str(USER_ID))
+
+        claim = db.binders.update_one.await_args_list[0].args[1]
+        assert claim["$unset"] == {"pages": ""}
+        assert claim["$set"]["page_count"] == 3 and claim["$set"]["card_count"] == 1
+        assert bulk_operations(db.binder_pages) == [
+            page_write(BINDER_ID, USER_ID, 1, [{"position": 0, "card_id": "x", "user_card_id": None}]),
+            page_write(BINDER_ID, USER_ID, 2, []),
+        ]
+
+    async def test_size_change_reflows_cards(self):
+        """Passer de 3x3 à 4x4 conserve les cartes dans l'ordre de lecture"""
+        db = make_db(3, [full_page(1), full_page(3)], card_count=18)
+        db.binder_pages.docs[3]["cards"] = db.binder_pages.docs[3]["cards"][:4]
+
+        await BinderService(db).update_binder(str(BINDER_ID), str(USER_ID), BinderUpdate(size="4x4"))
+
+        claim = db.binders.update_one.await_args_list[0].args[1]
+        assert claim["$set"]["page_count"] == 1 and claim["$set"]["card_count"] == 13
+        db.binder_pages.delete_many.assert_awaited_once_with({"binder_id": BINDER_ID}, session=None)
+        card_ids = [f"c1-{i}" for i in range(9)] + [f"c3-{i}" for i in range(4)]
+        assert bulk_operations(db.binder_pages) == [page_write(BINDER_ID, USER_ID, 1, [
+            {"position": position, "card_id": card_id, "user_card_id": None} for position, card_id in enumerate(card_ids)
+        ])]
+
+    async def test_delete_removes_pages(self):
+        db = make_db(1, [])
+        db.binders.delete_one = AsyncMock(return_value=SimpleNamespace(deleted_count=1))
+        assert await BinderService(db).delete_binder(str(BINDER_ID), str(USER_ID))
+        db.binder_pages.delete_many.assert_awaited_once_with({"binder_id": BINDER_ID})
+        db.card_locations.delete_many.assert_awaited_once_with({"binder_id": BINDER_ID}, session=None)
+
+
+class TestBinderPagesMigration:
+    """Tests du découpage des binders à pages embarquées"""
+
+    def test_split_keeps_only_occupied_pages(self):
+        split = split_binder({"pages": [
+            {"page_number": 1, "slots": [{"position": 0, "card_id": "a"}, {"position": 1, "card_id": None}]},
+            {"page_number": 2, "cards": []},
+            {"page_number": 3, "cards": [{"position": 4, "card_id": "b", "user_card_id": "u"}]},
+        ]})
+        assert [page["page_number"] for page in split["pages"]] == [1, 3]
+        assert split["fields"] == {"page_count": 3, "card_count": 2, "preview_cards": ["a", "b"], "preview_through": 3}
@@ -0,0 +1,107 @@
+"""
+Tests de la réorganisation d'un binder (POST /user/binders/{id}/reorganize)
+"""
+
+import sys
+import os
+import pytest
+from datetime import datetime
+from bson import ObjectId
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from tests.backend.helpers import binder_document, bulk_operations, make_binder_db, page_write
+from models.binder import ReorganizeBinder
+from services.binder_service import BinderService, _card_sort_key, CHANGE_LOG_SIZE
+
+USER_ID = ObjectId()
+BINDER_ID = ObjectId()
+
+
+USER_CARDS = [
+    {"_id": ObjectId(), "set_id": "sv2", "local_id": "10", "rarity": "Rare", "card_name": "Dracaufeu", "created_at": datetime(2024, 3, 1)},
+    {"_id": ObjectId(), "set_id": "sv1", "local_id": "25", "rarity": "Commune", "card_name": "Pikachu", "created_at": datetime(2024, 1, 1)},
+    {"_id": ObjectId(), "set_id": "sv1", "local_id": "3", "rarity": "Holo Rare", "card_name": "Bulbizarre", "created_at": datetime(2024, 2, 1)},
+]
+
+
+def make_db(page_docs):
+    return make_binder_db(
+        binder_document(BINDER_ID, USER_ID, name="Tri", version=2, page_count=2, card_count=4),
+        pages=page_docs, user_cards=USER_CARDS
+    )
+
+
+def slot(position, user_card, card_id=None):
+    return {"position": position, "card_id": card_id or f"{user_card['set_id']}-{user_card['local_id']}", "user_card_id": str(user_card["_id"])}
+
+
+class TestSortKeys:
+    """Tests des clés de tri"""
+
+    def test_set_sort_is_numeric_on_local_id(self):
+        keys = sorted(USER_CARDS, key=lambda c: _card_sort_key(["set"], c))
+        assert [c["local_id"] for c in keys] == ["3", "25", "10"]
+
+    def test_rarity_rank_then_name(self):
+        keys = sorted(USER_CARDS, key=lambda c: _card_sort_key(["rarity", "name"], c))
+        assert [c["card_name"] for c in keys] == ["Pikachu", "Dracaufeu", "Bulbizarre"]
+
+    def test_unknown_rarity_comes_last(self):
+        assert _card_sort_key(["rarity"], {"rarity": "Promo"}) > _card_sort_key(["rarity"], {"rarity": "Secret Rare"})
+
+
+@pytest.mark.asyncio
+class TestReorganizeBinder:
+    """Tests de BinderService.reorganize_binder"""
+
+    async def test_sort_by_set_in_one_write(self):
+        orphan = {"position": 0, "card_id": "old-1", "user_card_id": str(ObjectId())}
+        db = make_db([
+            {"page_number": 1, "cards": [orphan, slot(4, USER_CARDS[0])]},
+            {"page_number": 2, "cards": [slot(2, USER_CARDS[1]), slot(8, USER_CARDS[2])]},
+        ])
+
+        await BinderService(db).reorganize_binder(str(BINDER_ID), str(USER_ID), ReorganizeBinder(sort_by=["set"]))
+
+        # Métadonnées de tri chargées en une seule requête, une seule écriture
+        assert sum("set_id" in call.args[1] for call in db.user_cards.find.call_args_list) == 1
+        db.binder_pages.bulk_write.assert_awaited_once()
+        assert bulk_operations(db.binder_pages) == [
+            page_write(BINDER_ID, USER_ID, 1, [
+                slot(0, USER_CARDS[2]), slot(1, USER_CARDS[1]), slot(2, USER_CARDS[0]), {**orphan, "position": 3}
+            ]),
+            page_write(BINDER_ID, USER_ID, 2, []),
+        ]
+        claim = db.binders.update_one.await_args_list[0].args[1]
+        assert "$inc" not in claim and "page_count" not in claim["$set"]
+
+    async def test_compaction_keeps_reading_order(self):
+        db = make_db([{"page_number": 2, "cards": [slot(5, USER_CARDS[0]), slot(7, USER_CARDS[1])]}])
+
+        await BinderService(db).reorganize_binder(str(BINDER_ID), str(USER_ID), ReorganizeBinder())
+
+        assert not any("set_id" in call.args[1] for call in db.user_cards.find.call_args_list)
+        assert bulk_operations(db.binder_pages) == [
+            page_write(BINDER_ID, USER_ID, 1, [slot(0, USER_CARDS[0]), slot(1, USER_CARDS[1])]),
+            page_write(BINDER_ID, USER_ID, 2, []),
+        ]
+
+    async def test_already_sorted_binder_is_not_written(self):
+        db = make_db([{"page_number": 1, "cards": [slot(0, USER_CARDS[0])]}])
+        await BinderService(db).reorganize_binder(str(BINDER_ID), str(USER_ID), ReorganizeBinder())
+        db.binders.update_one.assert_not_called()
+
+
+@pytest.mark.asyncio
+class TestLargeChangeLog:
+    """Une modification plus grande que le journal est journalisée comme une réinitialisation"""
+
+    async def test_oversized_change_becomes_reset(self):
+        db = make_db([])
+        service = BinderService(db)
+        binder = await db.binders.find_one()
+        changes = [{"op": "slot", "page_number": 1, "position": 0} for _ in range(CHANGE_LOG_SIZE + 1)]
+        await service._commit(binder, str(USER_ID), changes)
+        claim = db.binders.update_one.await_args_list[0].args[1]
+        assert claim["$push"]["changes"]["$each"] == [{"op": "reset", "version": 3}]
@@ -0,0 +1,126 @@
+"""
+Tests du cache des réponses JSON encodées (GET /user/binders et /user/binders/{id})
+"""
+
+import sys
+import os
+from datetime import datetime
+from unittest.mock import MagicMock
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from main import app
+from dependencies import get_current_user, get_current_active_user, get_database
+from models.binder import BinderResponse, BinderSummary
+from models.user import UserInDB
+from routers import binders as binders_router
+from utils.cache import MemoryCache
+from utils.http_cache import binder_etag
+from utils.response_cache import ResponseCache, binder_response_key, encode_json
+
+
+def hits(name):
+    return REGISTRY.get_sample_value("response_cache_requests_total", {"name": name, "result": "hit"}) or 0
+
+
+class CountingBinderService:
+    """Service en mémoire : version courante et nombre de lectures complètes"""
+
+    versions = {}
+    reads = []
+
+    def __init__(self, db):
+        pass
+
+    async def get_binder_version(self, binder_id, user_id):
+        return self.versions.get(binder_id)
+
+    async def get_binder_by_id(self, binder_id, user_id, page_range=None):
+        self.reads.append((binder_id, page_range))
+        return BinderResponse(
+            id=binder_id, user_id=user_id, name="Été", size="3x3", pages=[], total_pages=2,
+            total_cards=0, version=self.versions[binder_id], created_at=datetime(2024, 1, 1), updated_at=datetime(2024, 1, 1)
+        )
+
+    async def get_user_binders(self, user_id):
+        self.reads.append((user_id, "list"))
+        return [BinderSummary(
+            id=binder_id, name="Été", size="3x3", description=None, is_public=False,
+            total_pages=2, total_cards=0, version=version,
+            created_at=datetime(2024, 1, 1), updated_at=datetime(2024, 1, 1)
+        ) for binder_id, version in self.versions.items()]
+
+
+class TestResponseCache:
+    """Tests de l'encodage et de la borne mémoire"""
+
+    def test_encoding_matches_fastapi_json(self):
+        assert encode_json({"name": "Été", "at": datetime(2024, 1, 1)}) == '{"name":"Été","at":"2024-01-01T00:00:00"}'.encode()
+
+    def test_window_is_part_of_the_key(self):
+        assert binder_response_key("b", 3, None) != binder_response_key("b", 3, (1, 1))
+
+    def test_byte_bound_evicts_oldest_body(self):
+        responses = ResponseCache("test_bound", MemoryCache(max_bytes=30))
+        responses.store("a", {"v": "x" * 10})
+        responses.store("b", {"v": "y" * 10})
+        assert responses.get("a") is None and responses.get("b") == b'{"v":"yyyyyyyyyy"}'
+
+
+class TestCachedRoutes:
+    """Tests des routes servies depuis le cache"""
+
+    def setup_method(self):
+        self.user_id = ObjectId()
+        self.binder_id = str(ObjectId())
+        CountingBinderService.versions = {self.binder_id: 3}
+        CountingBinderService.reads = []
+        self.original_service = binders_router.BinderService
+        binders_router.BinderService = CountingBinderService
+        self.user = UserInDB(_id=self.user_id, email="cache@example.com", username="cacheuser", hashed_password="x", binders_version=5)
+        app.dependency_overrides[get_current_user] = lambda: self.user
+        app.dependency_overrides[get_current_active_user] = lambda: self.user
+        app.dependency_overrides[get_database] = lambda: MagicMock()
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        binders_router.BinderService = self.original_service
+        app.dependency_overrides.clear()
+
+    def test_unchanged_binder_is_served_without_reading_pages(self):
+        before = hits("binder")
+        first = self.client.get(f"/user/binders/{self.binder_id}")
+        second = self.client.get(f"/user/binders/{self.binder_id}")
+
+        assert first.status_code == second.status_code == 200
+        assert first.content == second.content and second.json()["name"] == "Été"
+        assert second.headers["etag"] == binder_etag(self.binder_id, 3)
+        assert second.headers["content-type"] == "application/json"
+        assert CountingBinderService.reads == [(self.binder_id, None)]
+        assert hits("binder") == before + 1
+
+    def test_version_bump_and_window_change_recompute(self):
+        self.client.get(f"/user/binders/{self.binder_id}")
+        self.client.get(f"/user/binders/{self.binder_id}?pages=2")
+        CountingBinderService.versions[self.binder_id] = 4
+        response = self.client.get(f"/user/binders/{self.binder_id}")
+
+        assert response.json()["version"] == 4
+        assert CountingBinderService.reads == [(self.binder_id, None), (self.binder_id, (2, 2)), (self.binder_id, None)]
+
+    def test_missing_binder_returns_404(self):
+        response = self.client.get(f"/user/binders/{ObjectId()}")
+        assert response.status_code == 404
+        assert CountingBinderService.reads == []
+
+    def test_binder_list_is_cached_per_list_version(self):
+        first = self.client.get("/user/binders/")
+        second = self.client.get("/user/binders/")
+        self.user.binders_version = 6
+        self.client.get("/user/binders/")
+
+        assert first.content == second.content and first.json()[0]["id"] == self.binder_id
+        assert CountingBinderService.reads == [(str(self.user_id), "list")] * 2
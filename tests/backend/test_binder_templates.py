@@ -0,0 +1,111 @@
+"""
+Tests des binders master set (un emplacement réservé par carte de l'extension)
+"""
+
+import sys
+import os
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from tests.backend.helpers import FakeCursor, bulk_operations, make_binder_db, page_write
+from models.binder import AddCardToBinder, MasterSetBinderCreate, RemoveCardFromBinder
+from services.binder_service import BinderService
+
+USER_ID = ObjectId()
+BINDER_ID = ObjectId()
+
+
+def make_db():
+    return make_binder_db()
+
+
+@pytest.mark.asyncio
+class TestMasterSetBinder:
+    """Tests de BinderService.create_master_set_binder et du remplissage des emplacements"""
+
+    async def test_template_reserves_slots_in_local_id_order(self):
+        owned_id = ObjectId()
+        db = make_db()
+        db.user_cards.find = MagicMock(return_value=FakeCursor([{"_id": owned_id, "card_id": "sv1-10"}]))
+        db.binders.find_one = AsyncMock(return_value=None)
+        template = MasterSetBinderCreate(
+            name="Écarlate et Violet", size="3x3", set_id="sv1",
+            cards=[{"card_id": f"sv1-{n}", "local_id": str(n)} for n in range(12, 0, -1)]
+        )
+
+        await BinderService(db).create_master_set_binder(str(USER_ID), template)
+
+        # Une seule requête sur user_cards pour tout le catalogue
+        assert db.user_cards.find.call_args.args[0]["card_id"]["$in"][:3] == ["sv1-1", "sv1-2", "sv1-3"]
+        document = db.binders.insert_one.await_args.args[0]
+        assert document["set_id"] == "sv1" and "cards" not in document
+        # Seule la carte possédée compte, les emplacements réservés ne sont ni comptés ni en aperçu
+        assert document["page_count"] == 2 and document["card_count"] == 1
+        assert document["preview_cards"] == ["sv1-10"] and document["preview_through"] == 2
+        pages = db.binder_pages.insert_many.await_args.args[0]
+        assert [page["page_number"] for page in pages] == [1, 2]
+        assert pages[1]["cards"][0] == {"position": 0, "card_id": "sv1-10", "user_card_id": str(owned_id)}
+        assert pages[0]["cards"][0]["user_card_id"] is None
+
+    async def test_added_card_fills_its_reserved_slot(self):
+        user_card_id = ObjectId()
+        db = make_db()
+        db.binders.find_one = AsyncMock(return_value={
+            "_id": BINDER_ID, "user_id": USER_ID, "name": "Set", "size": "3x3", "version": 1, "set_id": "sv1",
+            "page_count": 2, "card_count": 0, "preview_cards": [], "preview_through": 0,
+            "created_at": datetime.utcnow(), "updated_at": datetime.utcnow(),
+        })
+        db.user_cards.find_one = AsyncMock(return_value={"_id": user_card_id, "card_id": "sv1-11"})
+        db.binder_pages.find_one = AsyncMock(return_value={"page_number": 2})
+        db.binder_pages.find = MagicMock(return_value=FakeCursor([{"page_number": 2, "cards": [
+            {"position": p, "card_id": f"sv1-{10 + p}", "user_card_id": None} for p in range(3)
+        ]}]))
+
+        await BinderService(db).add_card_to_binder(str(BINDER_ID), str(USER_ID), AddCardToBinder(user_card_id=str(user_card_id)))
+
+        assert db.binder_pages.find_one.await_args.args[0]["cards"]["$elemMatch"] == {"card_id": "sv1-11", "user_card_id": None}
+        assert bulk_operations(db.binder_pages) == [page_write(BINDER_ID, USER_ID, 2, [
+            {"position": 0, "card_id": "sv1-10", "user_card_id": None},
+            {"position": 1, "card_id": "sv1-11", "user_card_id": str(user_card_id)},
+            {"position": 2, "card_id": "sv1-12", "user_card_id": None},
+        ])]
+        # L'emplacement réservé n'était pas compté : la carte possédée l'est
+        assert db.binders.update_one.await_args_list[0].args[1]["$inc"] == {"card_count": 1}
+
+    async def test_removed_card_returns_to_its_reserved_slot(self):
+        user_card_id = ObjectId()
+        db = make_db()
+        db.binders.find_one = AsyncMock(return_value={
+            "_id": BINDER_ID, "user_id": USER_ID, "name": "Set", "size": "3x3", "version": 1, "set_id": "sv1",
+            "page_count": 1, "card_count": 1, "preview_cards": ["sv1-1"], "preview_through": 1,
+            "created_at": datetime.utcnow(), "updated_at": datetime.utcnow(),
+        })
+        db.binder_pages.find = MagicMock(return_value=FakeCursor([{"page_number": 1, "cards": [
+            {"position": 0, "card_id": "sv1-1", "user_card_id": str(user_card_id)},
+            {"position": 1, "card_id": "sv1-2", "user_card_id": None},
+        ]}]))
+        service = BinderService(db)
+
+        await service.remove_card_from_binder(str(BINDER_ID), str(USER_ID), RemoveCardFromBinder(page_number=1, position=0))
+
+        reserved = [
+            {"position": 0, "card_id": "sv1-1", "user_card_id": None},
+            {"position": 1, "card_id": "sv1-2", "user_card_id": None},
+        ]
+        assert bulk_operations(db.binder_pages) == [page_write(BINDER_ID, USER_ID, 1, reserved)]
+        assert db.binders.update_one.await_args_list[0].args[1]["$inc"] == {"card_count": -1}
+
+        # Rajoutée ensuite, la carte reprend son emplacement et non le premier slot libre
+        db.binder_pages.find = MagicMock(return_value=FakeCursor([{"page_number": 1, "cards": reserved}]))
+        db.binder_pages.find_one = AsyncMock(return_value={"page_number": 1})
+        db.user_cards.find_one = AsyncMock(return_value={"_id": user_card_id, "card_id": "sv1-1"})
+        await service.add_card_to_binder(str(BINDER_ID), str(USER_ID), AddCardToBinder(user_card_id=str(user_card_id)))
+
+        assert bulk_operations(db.binder_pages) == [page_write(BINDER_ID, USER_ID, 1, [
+            {"position": 0, "card_id": "sv1-1", "user_card_id": str(user_card_id)},
+            {"position": 1, "card_id": "sv1-2", "user_card_id": None},
+        ])]
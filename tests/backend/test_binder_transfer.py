@@ -0,0 +1,170 @@
+"""
+Tests du déplacement d'une carte entre deux binders (POST /user/binders/move)
+"""
+
+import sys
+import os
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from tests.backend.helpers import FakeCursor, binder_document, make_binder_db, page_write
+from main import app
+from dependencies import get_current_user, get_current_active_user, get_database
+from models.user import UserInDB
+from models.binder import MoveCardBetweenBinders
+from services.binder_service import BinderService, BinderVersionConflict
+
+USER_ID = ObjectId()
+SOURCE_ID = ObjectId()
+DESTINATION_ID = ObjectId()
+USER_CARD_ID = ObjectId()
+
+# Binder répliqué pour le test transactionnel (ex: mongodb://localhost:27017/?replicaSet=rs0)
+REPLICA_SET_URL = os.getenv("TEST_MONGODB_REPLICA_SET_URL")
+
+
+def binder_doc(binder_id, version, **fields):
+    return binder_document(binder_id, USER_ID, name="B", version=version, page_count=2, card_count=1, **fields)
+
+
+def make_db(destination_cards=(), stale=None):
+    binders = {SOURCE_ID: binder_doc(SOURCE_ID, 3), DESTINATION_ID: binder_doc(DESTINATION_ID, 7)}
+    pages = {
+        SOURCE_ID: [{"page_number": 1, "cards": [{"position": 2, "card_id": "sv1-25", "user_card_id": str(USER_CARD_ID)}]}],
+        DESTINATION_ID: [{"page_number": 1, "cards": list(destination_cards)}],
+    }
+    db = make_binder_db(user_cards=[{"_id": USER_CARD_ID, "card_name": "Pikachu", "rarity": "Commune"}])
+    db.binders.find_one = AsyncMock(side_effect=lambda query, *args, **kwargs: binders.get(query["_id"]))
+    # Réservation de version refusée pour le binder stale (écriture concurrente)
+    db.binders.update_one = AsyncMock(side_effect=lambda query, *args, **kwargs: SimpleNamespace(
+        matched_count=0 if query["_id"] == stale and "$set" in args[0] and "changes" in args[0].get("$push", {}) else 1
+    ))
+    db.binder_pages.find = MagicMock(side_effect=lambda query, *args, **kwargs: FakeCursor(pages.get(query["binder_id"], [])))
+    return db
+
+
+def move(**fields):
+    return MoveCardBetweenBinders(**{
+        "source_binder_id": str(SOURCE_ID), "source_page": 1, "source_position": 2,
+        "destination_binder_id": str(DESTINATION_ID), "destination_page": 1, "destination_position": 0,
+        **fields,
+    })
+
+
+@pytest.mark.asyncio
+class TestMoveBetweenBinders:
+    """Tests de BinderService.move_card_between_binders"""
+
+    async def test_both_binders_are_written_and_only_slots_returned(self):
+        db = make_db()
+        moved = await BinderService(db).move_card_between_binders(str(USER_ID), move())
+
+        # Pages écrites, par binder, dans l'ordre des écritures
+        assert [call.args[0] for call in db.binder_pages.bulk_write.await_args_list] == [
+            [page_write(DESTINATION_ID, USER_ID, 1, [{"position": 0, "card_id": "sv1-25", "user_card_id": str(USER_CARD_ID)}])],
+            [page_write(SOURCE_ID, USER_ID, 1, [])],
+        ]
+        assert moved.source.version == 4 and moved.source.slot.card_id is None
+        assert moved.destination.version == 8 and moved.destination.slot.card_name == "Pikachu"
+        # Pas de relecture complète des binders
+        assert db.binders.find_one.await_count == 2
+        db.users.update_one.assert_awaited_once()
+
+    async def test_counter_is_not_enforced_for_a_move(self):
+        db = make_db()
+        await BinderService(db).move_card_between_binders(str(USER_ID), move())
+        assert not any("$expr" in call.args[0] for call in db.user_cards.update_one.await_args_list)
+
+    async def test_occupied_destination_is_rejected_before_any_write(self):
+        db = make_db(destination_cards=[{"position": 0, "card_id": "sv1-1", "user_card_id": str(ObjectId())}])
+        with pytest.raises(ValueError, match="déjà occupé"):
+            await BinderService(db).move_card_between_binders(str(USER_ID), move())
+        db.binders.update_one.assert_not_called()
+
+    async def test_reserved_slot_is_not_a_card(self):
+        db = make_db()
+        db.binder_pages.find = MagicMock(return_value=FakeCursor([{"page_number": 1, "cards": [
+            {"position": 2, "card_id": "sv1-25", "user_card_id": None}
+        ]}]))
+        with pytest.raises(ValueError, match="Aucune carte"):
+            await BinderService(db).move_card_between_binders(str(USER_ID), move())
+
+    async def test_source_conflict_without_transaction_removes_the_copy(self):
+        db = make_db(stale=SOURCE_ID)
+        service = BinderService(db)
+        service._remove_slots = AsyncMock(return_value=1)
+        with pytest.raises(BinderVersionConflict) as conflict:
+            await service.move_card_between_binders(str(USER_ID), move())
+        assert conflict.value.binder_id == str(SOURCE_ID)
+        # La copie écrite dans la destination est retirée : la carte reste dans le binder source
+        service._remove_slots.assert_awaited_once_with(str(DESTINATION_ID), str(USER_ID), str(USER_CARD_ID), [(1, 0)])
+
+    async def test_same_binder_is_rejected(self):
+        with pytest.raises(ValueError, match="identiques"):
+            await BinderService(make_db()).move_card_between_binders(str(USER_ID), move(destination_binder_id=str(SOURCE_ID)))
+
+
+class TestMoveRoute:
+    """Tests de la route POST /user/binders/move"""
+
+    def setup_method(self):
+        self.db = make_db()
+        user = UserInDB(_id=USER_ID, email="move@example.com", username="moveuser", hashed_password="x")
+        app.dependency_overrides[get_current_user] = lambda: user
+        app.dependency_overrides[get_current_active_user] = lambda: user
+        app.dependency_overrides[get_database] = lambda: self.db
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_returns_the_two_slots(self):
+        response = self.client.post("/user/binders/move", json=move().dict())
+        assert response.status_code == 200
+        body = response.json()
+        assert body["source"]["binder_id"] == str(SOURCE_ID)
+        assert body["destination"]["slot"]["user_card_id"] == str(USER_CARD_ID)
+
+    def test_stale_destination_version_returns_412(self):
+        response = self.client.post("/user/binders/move", json=move(destination_version=6).dict())
+        assert response.status_code == 412
+        assert str(DESTINATION_ID) in response.headers["etag"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not REPLICA_SET_URL, reason="TEST_MONGODB_REPLICA_SET_URL non défini (replica set requis)")
+class TestMoveTransaction:
+    """Déplacement sur un replica set local à un nœud : les deux binders sont écrits ou aucun"""
+
+    async def test_conflict_rolls_back_both_binders(self):
+        from motor.motor_asyncio import AsyncIOMotorClient
+        from database import ensure_indexes
+
+        client = AsyncIOMotorClient(REPLICA_SET_URL)
+        database = client.pokemon_binder_transfer_test
+        try:
+            await ensure_indexes(database)
+            await database.binders.insert_many([binder_doc(SOURCE_ID, 3), binder_doc(DESTINATION_ID, 7)])
+            await database.binder_pages.insert_one({
+                "binder_id": SOURCE_ID, "user_id": USER_ID, "page_number": 1,
+                "cards": [{"position": 2, "card_id": "sv1-25", "user_card_id": str(USER_CARD_ID)}]
+            })
+            service = BinderService(database)
+            source = await database.binders.find_one({"_id": SOURCE_ID})
+            # Écriture concurrente sur la source entre la lecture et la transaction
+            service._load_binder = AsyncMock(side_effect=[source, await database.binders.find_one({"_id": DESTINATION_ID})])
+            await database.binders.update_one({"_id": SOURCE_ID}, {"$inc": {"version": 1}})
+
+            with pytest.raises(BinderVersionConflict):
+                await service.move_card_between_binders(str(USER_ID), move())
+
+            assert await database.binder_pages.count_documents({"binder_id": DESTINATION_ID}) == 0
+            assert (await database.binders.find_one({"_id": DESTINATION_ID}))["version"] == 7
+        finally:
+            await client.drop_database(database.name)
+            client.close()
@@ -0,0 +1,156 @@
+"""
+Tests de l'index inverse card_locations (user_card_id -> binder, page, position)
+"""
+
+import sys
+import os
+import asyncio
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from bson import ObjectId
+from pymongo import DeleteMany, InsertOne
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from tests.backend.helpers import FakeCursor, binder_document, bulk_operations, make_binder_db, page_write
+from main import app
+from dependencies import get_cache, get_current_user, get_current_active_user, get_user_card_service
+from models.user import UserInDB
+from models.user_card import CardLocation
+from services.binder_service import BinderService
+from services.card_location_service import CardLocationService
+from services.user_card_service import UserCardService
+from services.version_service import BINDERS_VERSION, VersionService
+from utils.cache import SharedCache
+from migrations.m003_card_locations import migrate
+
+USER_ID = ObjectId()
+BINDER_ID = ObjectId()
+USER_CARD_ID = ObjectId()
+OTHER_CARD_ID = ObjectId()
+
+
+def make_db(**binder_fields):
+    return make_binder_db(
+        binder_document(BINDER_ID, USER_ID, name="Favoris", version=4, page_count=3, card_count=2, **binder_fields),
+        pages=[{"page_number": 2, "cards": [
+            {"position": 0, "card_id": "sv1-1", "user_card_id": str(OTHER_CARD_ID)},
+            {"position": 4, "card_id": "sv1-25", "user_card_id": str(USER_CARD_ID)},
+        ]}],
+        locations=[
+            {"user_card_id": USER_CARD_ID, "binder_id": BINDER_ID, "page_number": 2, "position": 4},
+            # Entrée en retard sur le binder : ignorée
+            {"user_card_id": USER_CARD_ID, "binder_id": BINDER_ID, "page_number": 2, "position": 0},
+        ]
+    )
+
+
+class TestCardLocationService:
+    """Tests de la maintenance de l'index"""
+
+    @pytest.mark.asyncio
+    async def test_replace_pages_scopes_delete_to_written_pages(self):
+        db = MagicMock()
+        db.card_locations.bulk_write = AsyncMock()
+        await CardLocationService(db).replace_pages(BINDER_ID, str(USER_ID), {
+            2: {4: {"card_id": "sv1-25", "user_card_id": str(USER_CARD_ID)}, 5: {"card_id": "sv1-26", "user_card_id": None}},
+            7: {},
+        })
+        # L'emplacement réservé (sans UserCard) n'est pas indexé
+        assert bulk_operations(db.card_locations) == [
+            DeleteMany({"binder_id": BINDER_ID, "page_number": {"$in": [2, 7]}}),
+            InsertOne({"user_card_id": USER_CARD_ID, "user_id": USER_ID, "binder_id": BINDER_ID, "page_number": 2, "position": 4}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_migration_rebuilds_each_binder(self):
+        other = ObjectId()
+        db = MagicMock()
+        db.binders.create_index = AsyncMock()
+        db.binder_pages.create_index = AsyncMock()
+        db.card_locations.create_index = AsyncMock()
+        db.card_locations.bulk_write = AsyncMock()
+        db.binder_pages.find = MagicMock(return_value=FakeCursor([
+            {"binder_id": BINDER_ID, "user_id": USER_ID, "page_number": 1, "cards": [{"position": 0, "card_id": "a", "user_card_id": str(USER_CARD_ID)}]},
+            {"binder_id": BINDER_ID, "user_id": USER_ID, "page_number": 3, "cards": []},
+            {"binder_id": other, "user_id": USER_ID, "page_number": 1, "cards": []},
+        ]))
+        assert await migrate(db) == 2
+        assert db.card_locations.bulk_write.await_args_list[0].args[0] == [
+            DeleteMany({"binder_id": BINDER_ID}),
+            InsertOne({"user_card_id": USER_CARD_ID, "user_id": USER_ID, "binder_id": BINDER_ID, "page_number": 1, "position": 0}),
+        ]
+
+
+@pytest.mark.asyncio
+class TestCascadeRemoval:
+    """Tests du retrait d'une UserCard supprimée des binders"""
+
+    async def test_only_indexed_slot_of_the_card_is_removed(self):
+        db = make_db()
+        removed = await BinderService(db).remove_user_card_everywhere(str(USER_ID), str(USER_CARD_ID))
+
+        assert removed == 1
+        assert db.binder_pages.find.call_args_list[0].args[0]["page_number"] == {"$in": [2]}
+        assert bulk_operations(db.binder_pages) == [page_write(BINDER_ID, USER_ID, 2, [
+            {"position": 0, "card_id": "sv1-1", "user_card_id": str(OTHER_CARD_ID)}
+        ])]
+        assert db.binders.update_one.await_args_list[0].args[1]["$inc"] == {"card_count": -1}
+
+    async def test_master_set_slot_becomes_reserved_again(self):
+        db = make_db(set_id="sv1")
+        await BinderService(db).remove_user_card_everywhere(str(USER_ID), str(USER_CARD_ID))
+        assert bulk_operations(db.binder_pages) == [page_write(BINDER_ID, USER_ID, 2, [
+            {"position": 0, "card_id": "sv1-1", "user_card_id": str(OTHER_CARD_ID)},
+            {"position": 4, "card_id": "sv1-25", "user_card_id": None},
+        ])]
+
+    async def test_delete_user_card_cascades(self):
+        db = make_db()
+        db.user_cards.find_one_and_delete = AsyncMock(return_value={"_id": USER_CARD_ID, "user_id": USER_ID})
+        assert await UserCardService(db).delete_user_card(str(USER_CARD_ID))
+        db.binder_pages.bulk_write.assert_awaited_once()
+
+
+class TestLocationsRoute:
+    """Tests de GET /user/cards/{id}/locations"""
+
+    def setup_method(self):
+        user = UserInDB(_id=USER_ID, email="loc@example.com", username="locuser", hashed_password="x")
+        self.service = MagicMock()
+        self.service.get_user_card_by_id = AsyncMock(return_value=SimpleNamespace(user_id=str(USER_ID)))
+        self.service.get_card_locations = AsyncMock(return_value=[
+            CardLocation(binder_id=str(BINDER_ID), binder_name="Favoris", page_number=2, position=4)
+        ])
+        self.cache = SharedCache()
+        app.dependency_overrides[get_current_user] = lambda: user
+        app.dependency_overrides[get_current_active_user] = lambda: user
+        app.dependency_overrides[get_user_card_service] = lambda: self.service
+        app.dependency_overrides[get_cache] = lambda: self.cache
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_returns_locations(self):
+        response = self.client.get(f"/user/cards/{USER_CARD_ID}/locations")
+        assert response.status_code == 200
+        assert response.json() == [{"binder_id": str(BINDER_ID), "binder_name": "Favoris", "page_number": 2, "position": 4}]
+
+    def test_foreign_card_is_forbidden(self):
+        self.service.get_user_card_by_id = AsyncMock(return_value=SimpleNamespace(user_id=str(ObjectId())))
+        assert self.client.get(f"/user/cards/{USER_CARD_ID}/locations").status_code == 403
+
+    def test_locations_are_cached_until_binders_change(self):
+        self.client.get(f"/user/cards/{USER_CARD_ID}/locations")
+        self.client.get(f"/user/cards/{USER_CARD_ID}/locations")
+        assert self.service.get_card_locations.await_count == 1
+
+        assert len(self.cache.local) == 1
+        db = MagicMock()
+        db.users.update_one = AsyncMock()
+        with patch("services.version_service.cache", self.cache):
+            asyncio.run(VersionService(db).bump(str(USER_ID), BINDERS_VERSION))
+        assert len(self.cache.local) == 0
@@ -0,0 +1,95 @@
+"""
+Tests de la compression négociée des réponses
+"""
+
+import json
+import sys
+import os
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from middleware.compression import CompressionMiddleware, negotiate_encoding, parse_accept_encoding
+
+LARGE_PAYLOAD = [{"position": i, "card_id": None, "set_name": "Neo Destiny"} for i in range(500)]
+
+
+def build_app() -> FastAPI:
+    test_app = FastAPI()
+    test_app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @test_app.get("/large")
+    async def large():
+        return LARGE_PAYLOAD
+
+    @test_app.get("/small")
+    async def small():
+        return {"status": "ok"}
+
+    @test_app.get("/image")
+    async def image():
+        return Response(content=b"\x89PNG" + b"\x00" * 4096, media_type="image/png")
+
+    @test_app.get("/etag")
+    async def etag():
+        return Response(content=json.dumps(LARGE_PAYLOAD), media_type="application/json", headers={"ETag": '"v1"'})
+
+    return test_app
+
+
+class TestNegotiation:
+    """Tests de la négociation Accept-Encoding"""
+
+    def test_parse_q_values(self):
+        assert parse_accept_encoding("gzip;q=0.5, br") == {"gzip": 0.5, "br": 1.0}
+
+    def test_prefers_client_q_then_server_order(self):
+        assert negotiate_encoding("gzip, br, zstd", ["zstd", "br", "gzip"]) == "zstd"
+        assert negotiate_encoding("gzip, br;q=0.5", ["zstd", "br", "gzip"]) == "gzip"
+        assert negotiate_encoding("identity", ["zstd", "br", "gzip"]) is None
+        assert negotiate_encoding("*", ["br", "gzip"]) == "br"
+
+
+class TestCompressionMiddleware:
+    """Tests du middleware de compression"""
+
+    def setup_method(self):
+        self.client = TestClient(build_app())
+
+    def test_large_json_gzip(self):
+        """Les grosses réponses JSON sont compressées avec Content-Length exact"""
+        response = self.client.get("/large", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "accept-encoding" in response.headers["vary"].lower()
+        assert response.json() == LARGE_PAYLOAD
+        assert int(response.headers["content-length"]) < len(json.dumps(LARGE_PAYLOAD))
+
+    def test_zstd_when_available(self):
+        pytest.importorskip("zstandard")
+        response = self.client.get("/large", headers={"Accept-Encoding": "zstd"})
+        assert response.headers["content-encoding"] == "zstd"
+
+    def test_small_response_not_compressed(self):
+        """Sous le seuil, la réponse est envoyée telle quelle"""
+        response = self.client.get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+
+    def test_images_not_compressed(self):
+        """Les images (déjà compressées) ne sont pas recompressées"""
+        response = self.client.get("/image", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert "vary" not in response.headers
+
+    def test_strong_etag_weakened(self):
+        """Un ETag fort devient faible sur la représentation compressée"""
+        response = self.client.get("/etag", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["etag"] == 'W/"v1"'
+
+    def test_no_compression_without_accept_encoding(self):
+        response = self.client.get("/large", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        # Même représentation non compressée : un cache partagé doit distinguer les clients
+        assert response.headers["vary"] == "Accept-Encoding"
@@ -0,0 +1,111 @@
+"""
+Tests des sondes de santé /health/live et /health/ready
+"""
+
+import asyncio
+import sys
+import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from main import app
+import database
+from database import db, on_connect
+from utils import health
+from utils.health import ReadinessChecker, check_mongo, register_warmup, mark_warm, warmup_state
+
+
+class FakeAdmin:
+    """Base admin factice comptant les pings"""
+
+    def __init__(self, fail=False):
+        self.pings = 0
+        self.fail = fail
+
+    async def command(self, name):
+        self.pings += 1
+        if self.fail:
+            raise ConnectionError("MongoDB injoignable")
+        return {"ok": 1}
+
+
+class TestHealthEndpoints:
+    """Tests des endpoints de santé"""
+
+    def setup_method(self):
+        self.client = TestClient(app)
+        self._saved = (db.client, db.connected)
+        health.readiness_checker.invalidate()
+
+    def teardown_method(self):
+        db.client, db.connected = self._saved
+        health.readiness_checker.invalidate()
+
+    def test_liveness(self):
+        """La sonde de liveness répond sans dépendre de MongoDB"""
+        response = self.client.get("/health/live")
+        assert response.status_code == 200
+        assert response.json()["status"] == "alive"
+        assert "lag_ms" in response.json()["loop"]
+
+    def test_not_ready_when_mongo_unreachable(self):
+        """La readiness renvoie 503 si MongoDB ne répond pas"""
+        db.client = SimpleNamespace(admin=FakeAdmin(fail=True))
+        response = self.client.get("/health/ready")
+        assert response.status_code == 503
+        assert response.json()["checks"]["mongo"]["ok"] is False
+
+    def test_ready_when_mongo_responds(self):
+        """La readiness renvoie 200 avec la latence MongoDB mesurée"""
+        db.client = SimpleNamespace(admin=FakeAdmin())
+        response = self.client.get("/health/ready")
+        assert response.status_code == 200
+        assert "latency_ms" in response.json()["checks"]["mongo"]
+
+
+class TestReadinessChecker:
+    """Tests du cache des résultats de readiness"""
+
+    def setup_method(self):
+        self._saved = (db.client, db.database, db.connected, list(database._connect_hooks))
+
+    def teardown_method(self):
+        db.client, db.database, db.connected, database._connect_hooks[:] = self._saved
+
+    def test_results_are_cached(self):
+        """Les sondes rapprochées ne déclenchent qu'un seul ping MongoDB"""
+        admin = FakeAdmin()
+        db.client = SimpleNamespace(admin=admin)
+        checker = ReadinessChecker(ttl_seconds=60)
+
+        async def probe_many():
+            return await asyncio.gather(*(checker.check() for _ in range(5)))
+
+        results = asyncio.run(probe_many())
+        assert admin.pings == 1
+        assert all(result is results[0] for result in results)
+
+    def test_mongo_recovery_marks_component_warm(self):
+        """Un ping réussi après un échec au démarrage initialise la connexion puis rend l'instance prête"""
+        register_warmup("mongo")
+        mark_warm("mongo", False)
+        db.client = SimpleNamespace(admin=FakeAdmin())
+        db.database = MagicMock()
+        db.database.binders.create_index = AsyncMock()
+        db.database.binder_pages.create_index = AsyncMock()
+        db.database.card_locations.create_index = AsyncMock()
+        db.connected = False
+        started = AsyncMock()
+        on_connect(started)
+
+        result = asyncio.run(check_mongo())
+        asyncio.run(check_mongo())
+
+        assert result["ok"] is True
+        assert warmup_state()["mongo"] is True and db.connected
+        db.database.binders.create_index.assert_awaited_once()
+        # Une seule initialisation, même si les sondes suivantes réussissent aussi
+        started.assert_awaited_once_with(db.database)
@@ -0,0 +1,108 @@
+"""
+Tests des ETags et requêtes conditionnelles (If-None-Match -> 304)
+"""
+
+import sys
+import os
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from main import app
+from dependencies import get_current_user, get_current_active_user, get_database, get_user_card_service
+from models.user import UserInDB
+from services.user_card_service import UserCardService
+from utils.http_cache import etag_matches, binder_etag, cards_etag
+
+USER_ID = ObjectId()
+BINDER_ID = ObjectId()
+
+
+def make_user(binders_version=4, cards_version=7):
+    return UserInDB(
+        _id=USER_ID, email="etag@example.com", username="etaguser",
+        hashed_password="x", binders_version=binders_version, cards_version=cards_version
+    )
+
+
+def make_binder_doc(version=3):
+    return {
+        "_id": BINDER_ID, "user_id": USER_ID, "name": "Binder", "size": "3x3",
+        "description": None, "is_public": False, "version": version,
+        "pages": [{"page_number": 1, "slots": [{"position": i} for i in range(9)]}],
+        "created_at": datetime.utcnow(), "updated_at": datetime.utcnow(),
+    }
+
+
+class TestEtagMatching:
+    """Tests de la comparaison If-None-Match"""
+
+    def test_exact_and_weak_match(self):
+        etag = binder_etag("abc", 3)
+        assert etag_matches(etag, etag)
+        assert etag_matches(f"W/{etag}", etag)
+        assert etag_matches(f'"other", {etag}', etag)
+        assert etag_matches("*", etag)
+
+    def test_no_match(self):
+        assert not etag_matches(None, binder_etag("abc", 3))
+        assert not etag_matches(binder_etag("abc", 2), binder_etag("abc", 3))
+
+
+class TestConditionalGet:
+    """Tests des endpoints conditionnels"""
+
+    def setup_method(self):
+        self.db = MagicMock()
+        self.db.binders.find_one = AsyncMock(return_value=make_binder_doc())
+        self.db.user_cards.find_one = AsyncMock(return_value=None)
+        self.db.users.update_one = AsyncMock()
+        user = make_user()
+        app.dependency_overrides[get_current_user] = lambda: user
+        app.dependency_overrides[get_current_active_user] = lambda: user
+        app.dependency_overrides[get_database] = lambda: self.db
+        app.dependency_overrides[get_user_card_service] = lambda: UserCardService(self.db)
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+
+    def test_binder_returns_etag(self):
+        """Une première lecture renvoie l'ETag dérivé de la version du binder"""
+        response = self.client.get(f"/user/binders/{BINDER_ID}")
+        assert response.status_code == 200
+        assert etag_matches(response.headers["etag"], binder_etag(str(BINDER_ID), 3))
+        assert response.json()["version"] == 3
+
+    def test_binder_not_modified_before_enrichment(self):
+        """If-None-Match à jour : 304 après une seule lecture de version projetée"""
+        response = self.client.get(
+            f"/user/binders/{BINDER_ID}",
+            headers={"If-None-Match": binder_etag(str(BINDER_ID), 3)}
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert self.db.binders.find_one.await_count == 1
+        assert self.db.binders.find_one.await_args.args[1] == {"version": 1}
+
+    def test_binder_modified_returns_body(self):
+        """Après une écriture (version incrémentée), le corps complet est renvoyé"""
+        response = self.client.get(
+            f"/user/binders/{BINDER_ID}",
+            headers={"If-None-Match": binder_etag(str(BINDER_ID), 2)}
+        )
+        assert response.status_code == 200
+        assert etag_matches(response.headers["etag"], binder_etag(str(BINDER_ID), 3))
+
+    def test_cards_not_modified_without_query(self):
+        """La collection inchangée ne déclenche aucune requête sur user_cards"""
+        self.db.user_cards.find = MagicMock()
+        response = self.client.get(
+            "/user/cards",
+            headers={"If-None-Match": cards_etag(str(USER_ID), 7)}
+        )
+        assert response.status_code == 304
+        self.db.user_cards.find.assert_not_called()
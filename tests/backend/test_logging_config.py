@@ -0,0 +1,87 @@
+"""
+Tests du pipeline de logs structurés (JSON, échantillonnage, identifiant de requête)
+"""
+
+import json
+import logging
+import random
+import sys
+import os
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from main import app
+from utils.logging_config import (
+    JsonFormatter, RequestContextFilter, SamplingFilter, parse_sample_rates,
+    request_id_var, route_var
+)
+
+
+def _record(level=logging.INFO, msg="message %s", args=("test",)):
+    return logging.LogRecord("binder_service", level, __file__, 1, msg, args, None)
+
+
+class TestJsonFormatter:
+    """Tests du formatage JSON"""
+
+    def test_json_line_with_request_context(self):
+        """Chaque log est une ligne JSON avec request_id et route"""
+        record = _record()
+        token_id = request_id_var.set("req-123")
+        token_route = route_var.set("/user/binders/{binder_id}")
+        try:
+            RequestContextFilter().filter(record)
+        finally:
+            route_var.reset(token_route)
+            request_id_var.reset(token_id)
+
+        payload = json.loads(JsonFormatter().format(record))
+        assert payload["message"] == "message test"
+        assert payload["level"] == "INFO"
+        assert payload["request_id"] == "req-123"
+        assert payload["route"] == "/user/binders/{binder_id}"
+
+
+class TestSamplingFilter:
+    """Tests de l'échantillonnage par route"""
+
+    def test_parse_sample_rates(self):
+        rates = parse_sample_rates("/user/binders/{binder_id}=0.1, /user/cards=0.5")
+        assert rates == {"/user/binders/{binder_id}": 0.1, "/user/cards": 0.5}
+
+    def test_info_logs_sampled_on_configured_route(self):
+        """Les logs INFO d'une route échantillonnée sont en partie écartés"""
+        sampling = SamplingFilter({"/user/cards": 0.1}, rng=random.Random(42))
+        token = route_var.set("/user/cards")
+        try:
+            kept = sum(sampling.filter(_record()) for _ in range(1000))
+        finally:
+            route_var.reset(token)
+        assert 50 < kept < 150
+
+    def test_warnings_never_sampled(self):
+        """Les WARNING et ERROR passent toujours"""
+        sampling = SamplingFilter({"/user/cards": 0.0})
+        token = route_var.set("/user/cards")
+        try:
+            assert sampling.filter(_record(level=logging.WARNING))
+            assert sampling.filter(_record(level=logging.ERROR))
+            assert not sampling.filter(_record(level=logging.INFO))
+        finally:
+            route_var.reset(token)
+
+
+class TestRequestIdHeader:
+    """Tests de l'identifiant de requête"""
+
+    def setup_method(self):
+        self.client = TestClient(app)
+
+    def test_request_id_generated(self):
+        response = self.client.get("/")
+        assert len(response.headers["x-request-id"]) == 32
+
+    def test_request_id_propagated_from_client(self):
+        response = self.client.get("/", headers={"X-Request-ID": "front-abc"})
+        assert response.headers["x-request-id"] == "front-abc"
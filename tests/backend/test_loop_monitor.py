@@ -0,0 +1,85 @@
+"""
+Tests du moniteur de lag de la boucle d'événements et de la détection des blocages
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from middleware.request_context import RequestContextMiddleware
+from utils.loop_monitor import LoopMonitor
+
+
+def blocking_handler_work():
+    """Travail CPU synchrone simulant un appel bloquant (bcrypt, grosse validation...)"""
+    time.sleep(0.4)
+
+
+async def blocking_app(scope, receive, send):
+    blocking_handler_work()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+class TestLoopMonitor:
+    """Tests du LoopMonitor"""
+
+    def test_measures_lag_without_stall(self):
+        """Une boucle libre a un lag faible et aucun blocage"""
+        monitor = LoopMonitor(interval_ms=20, stall_threshold_ms=200)
+
+        async def run():
+            await monitor.start()
+            await asyncio.sleep(0.15)
+            await monitor.stop()
+
+        asyncio.run(run())
+        assert monitor.snapshot()["stalls"] == []
+        assert monitor.recent_max_lag_ms() < 200
+
+    def test_captures_blocking_request(self):
+        """Un blocage est enregistré avec la requête en cours et la pile fautive"""
+        monitor = LoopMonitor(interval_ms=20, stall_threshold_ms=100)
+        middleware = RequestContextMiddleware(blocking_app)
+        scope = {
+            "type": "http", "method": "POST", "path": "/auth/login",
+            "headers": [(b"x-request-id", b"req-stall")],
+        }
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            pass
+
+        async def run():
+            await monitor.start()
+            await asyncio.sleep(0.05)
+            await middleware(scope, receive, send)
+            await asyncio.sleep(0.05)
+            await monitor.stop()
+
+        asyncio.run(run())
+
+        stalls = monitor.snapshot()["stalls"]
+        assert len(stalls) == 1
+        stall = stalls[0]
+        assert stall["captured"] is True
+        assert stall["request_id"] == "req-stall"
+        assert stall["path"] == "/auth/login"
+        assert stall["duration_ms"] >= 100
+        assert any("blocking_handler_work" in line for line in stall["stack"])
+
+    def test_capture_is_not_reused_by_a_later_stall(self):
+        """Une capture consommée par un battement normal n'est pas attribuée au blocage suivant"""
+        monitor = LoopMonitor(interval_ms=20, stall_threshold_ms=100)
+        monitor._pending_stall = {"captured": True, "path": "/ancienne"}
+
+        monitor._record_lag(0.01)
+        monitor._record_lag(0.3)
+
+        stalls = monitor.snapshot()["stalls"]
+        assert len(stalls) == 1 and stalls[0]["captured"] is False
@@ -0,0 +1,87 @@
+"""
+Tests des métriques Prometheus (middleware HTTP et listener de commandes MongoDB)
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from main import app
+from utils.metrics import MONGO_COMMAND_LATENCY
+from utils.mongo_monitoring import CommandMetricsListener, command_collection
+
+
+class TestMetricsEndpoint:
+    """Tests de l'endpoint /metrics et du middleware"""
+
+    def setup_method(self):
+        self.client = TestClient(app)
+
+    def test_metrics_prometheus_format(self):
+        """/metrics retourne le format texte Prometheus"""
+        response = self.client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "http_request_duration_seconds" in response.text
+
+    def test_requests_labelled_by_route_template(self):
+        """Les requêtes sont comptées par modèle de route et non par chemin brut"""
+        self.client.get("/")
+        self.client.get("/user/binders/abc123")  # 403 sans token, route paramétrée
+
+        text = self.client.get("/metrics").text
+        assert 'http_requests_total{method="GET",route="/",status="200"}' in text
+        assert 'route="/user/binders/{binder_id}"' in text
+        assert "abc123" not in text
+
+    def test_unknown_paths_share_one_label(self):
+        """Les chemins inconnus n'explosent pas la cardinalité"""
+        self.client.get("/nope/123")
+        text = self.client.get("/metrics").text
+        assert 'route="unmatched"' in text
+        assert "/nope/123" not in text
+
+
+class TestCommandMetricsListener:
+    """Tests du listener de commandes MongoDB"""
+
+    def test_command_collection_extraction(self):
+        """Le nom de collection est extrait de la commande"""
+        assert command_collection("find", {"find": "binders", "filter": {}}) == "binders"
+        assert command_collection("getMore", {"getMore": 42, "collection": "user_cards"}) == "user_cards"
+        assert command_collection("ping", {"ping": 1}) == ""
+
+    def test_listener_records_duration(self):
+        """Une commande réussie alimente l'histogramme par commande/collection"""
+        listener = CommandMetricsListener()
+        histogram = MONGO_COMMAND_LATENCY.labels("find", "binders")
+        before = histogram._sum.get()
+
+        listener.started(SimpleNamespace(request_id=1, command_name="find", command={"find": "binders"}))
+        listener.succeeded(SimpleNamespace(request_id=1, command_name="find", duration_micros=2500))
+
+        assert abs(histogram._sum.get() - before - 0.0025) < 1e-9
+
+
+class TestGunicornMultiprocess:
+    """Tests du répertoire des métriques multiprocess géré par gunicorn.conf.py"""
+
+    def load_config(self):
+        import importlib.util
+        path = os.path.join(os.path.dirname(__file__), '..', '..', 'backend', 'gunicorn.conf.py')
+        spec = importlib.util.spec_from_file_location("gunicorn_conf", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def test_on_starting_empties_the_directory(self, tmp_path, monkeypatch):
+        stale = tmp_path / "counter_123.db"
+        stale.write_bytes(b"x")
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+        self.load_config().on_starting(server=None)
+
+        assert tmp_path.is_dir() and list(tmp_path.iterdir()) == []
@@ -0,0 +1,103 @@
+"""
+Tests de la configuration du pool MongoDB et des métriques de checkout
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from database import get_client_options, MONGO_INT_OPTIONS
+from utils.mongo_monitoring import PoolMetricsListener
+
+
+class TestClientOptions:
+    """Tests de lecture des options du client depuis l'environnement"""
+
+    def setup_method(self):
+        self._saved = {}
+        for env_var in list(MONGO_INT_OPTIONS.values()) + ["MONGODB_COMPRESSORS", "MONGODB_READ_PREFERENCE", "MONGODB_ZLIB_LEVEL"]:
+            self._saved[env_var] = os.environ.pop(env_var, None)
+
+    def teardown_method(self):
+        for env_var, value in self._saved.items():
+            os.environ.pop(env_var, None)
+            if value is not None:
+                os.environ[env_var] = value
+
+    def test_defaults_are_driver_defaults(self):
+        """Sans variables d'environnement, aucune option n'est forcée"""
+        assert get_client_options() == {}
+
+    def test_pool_options_from_env(self):
+        """Les tailles de pool et timeouts sont lus en entier"""
+        os.environ["MONGODB_MAX_POOL_SIZE"] = "20"
+        os.environ["MONGODB_MIN_POOL_SIZE"] = "2"
+        os.environ["MONGODB_MAX_IDLE_TIME_MS"] = "60000"
+        os.environ["MONGODB_SERVER_SELECTION_TIMEOUT_MS"] = "5000"
+
+        options = get_client_options()
+
+        assert options["maxPoolSize"] == 20
+        assert options["minPoolSize"] == 2
+        assert options["maxIdleTimeMS"] == 60000
+        assert options["serverSelectionTimeoutMS"] == 5000
+
+    def test_compression_and_read_preference(self):
+        """Compression et préférence de lecture sont transmises au driver"""
+        os.environ["MONGODB_COMPRESSORS"] = "zstd,zlib"
+        os.environ["MONGODB_READ_PREFERENCE"] = "secondaryPreferred"
+
+        options = get_client_options()
+
+        assert options["compressors"] == "zstd,zlib"
+        assert options["readPreference"] == "secondaryPreferred"
+
+
+class TestPoolMetricsListener:
+    """Tests des métriques d'utilisation du pool"""
+
+    def test_checkout_utilization(self):
+        """Le listener suit les connexions empruntées et l'utilisation"""
+        listener = PoolMetricsListener()
+        listener.pool_created(SimpleNamespace(options={"maxPoolSize": 4}))
+
+        for _ in range(2):
+            listener.connection_check_out_started(None)
+            listener.connection_checked_out(None)
+
+        stats = listener.snapshot()
+        assert stats["checked_out"] == 2
+        assert stats["max_checked_out"] == 2
+        assert stats["utilization"] == 0.5
+        assert stats["checkouts"] == 2
+
+        listener.connection_checked_in(None)
+        assert listener.snapshot()["checked_out"] == 1
+
+    def test_unset_max_pool_size_uses_driver_default(self):
+        """Sans maxPoolSize, l'utilisation est calculée sur le défaut du driver (100), pas 0"""
+        listener = PoolMetricsListener()
+        listener.pool_created(SimpleNamespace(options={}))
+        listener.connection_check_out_started(None)
+        listener.connection_checked_out(None)
+
+        stats = listener.snapshot()
+        assert stats["max_pool_size"] == 100 and stats["utilization"] == 0.01
+
+    def test_unbounded_pool_has_no_utilization(self):
+        """maxPoolSize=0 (pool non borné) : utilisation non définie"""
+        listener = PoolMetricsListener()
+        listener.pool_created(SimpleNamespace(options={"maxPoolSize": 0}))
+        assert listener.snapshot()["utilization"] is None
+
+    def test_checkout_failure_counted(self):
+        """Les échecs de checkout (timeout d'attente) sont comptés"""
+        listener = PoolMetricsListener()
+        listener.connection_check_out_started(None)
+        listener.connection_check_out_failed(None)
+
+        stats = listener.snapshot()
+        assert stats["checkout_failures"] == 1
+        assert stats["checked_out"] == 0
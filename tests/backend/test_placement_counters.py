@@ -0,0 +1,178 @@
+"""
+Tests du compteur placed des user_cards (exemplaires rangés dans des binders)
+"""
+
+import sys
+import os
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from pymongo import UpdateOne
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from tests.backend.helpers import FakeCursor, binder_document, make_binder_db
+from main import app
+from dependencies import get_current_active_user, get_user_card_service
+from models.binder import BinderOperation
+from models.user import UserInDB
+from models.user_card import UserCardUpdate
+from services.binder_service import BinderService
+from services.card_location_service import CardLocationService
+from services.user_card_service import UserCardService
+from services.version_service import BINDERS_VERSION, CARDS_VERSION
+from migrations.m004_placed_counters import migrate
+
+USER_ID = ObjectId()
+BINDER_ID = ObjectId()
+USER_CARD_ID = ObjectId()
+OTHER_CARD_ID = ObjectId()
+
+
+CARD_DOCUMENT = {
+    "_id": USER_CARD_ID, "user_id": USER_ID, "card_id": "sv1-25", "card_name": "Pikachu",
+    "set_id": "sv1", "set_name": "Écarlate et Violet", "quantity": 3, "placed": 2, "condition": "Near Mint",
+    "created_at": datetime(2024, 1, 1), "updated_at": datetime(2024, 1, 1),
+}
+
+
+def make_db(locations=({"user_card_id": OTHER_CARD_ID},), matched=1):
+    db = make_binder_db(
+        binder_document(BINDER_ID, USER_ID, name="Compteur", version=2, card_count=1),
+        pages=[{"page_number": 1, "cards": [{"position": 0, "card_id": "sv1-1", "user_card_id": str(OTHER_CARD_ID)}]}],
+        user_cards=[{"_id": USER_CARD_ID, "card_id": "sv1-25"}],
+        locations=locations
+    )
+    db.user_cards.update_one = AsyncMock(side_effect=lambda query, update, **kwargs: SimpleNamespace(
+        matched_count=matched if "$expr" in query else 1
+    ))
+    return db
+
+
+def increments(db):
+    return [(call.args[0]["_id"], call.args[1]["$inc"]["placed"]) for call in db.user_cards.update_one.await_args_list]
+
+
+class TestPlacementDeltas:
+    """Tests du calcul des variations par UserCard"""
+
+    @pytest.mark.asyncio
+    async def test_rewritten_pages_net_old_and_new_slots(self):
+        db = make_db(locations=[{"user_card_id": OTHER_CARD_ID}, {"user_card_id": USER_CARD_ID}])
+        deltas = await CardLocationService(db).placement_deltas(BINDER_ID, {1: {
+            0: {"card_id": "sv1-1", "user_card_id": str(OTHER_CARD_ID)},
+            3: {"card_id": "sv1-2", "user_card_id": None},
+        }})
+        # La carte restée en place ne bouge pas, celle retirée libère un exemplaire
+        assert deltas == {str(USER_CARD_ID): -1}
+        assert db.card_locations.find.call_args.args[0] == {"binder_id": BINDER_ID, "page_number": {"$in": [1]}}
+
+    @pytest.mark.asyncio
+    async def test_increment_is_conditional_on_quantity(self):
+        db = make_db(matched=0)
+        with pytest.raises(ValueError, match="déjà placés"):
+            await CardLocationService(db).apply_placements(str(USER_ID), {str(OTHER_CARD_ID): -1, str(USER_CARD_ID): 1})
+        query = db.user_cards.update_one.await_args_list[1].args[0]
+        assert query["$expr"]["$lte"][1] == {"$ifNull": ["$quantity", 1]}
+        # Hors transaction, la baisse déjà appliquée est annulée
+        assert increments(db) == [(OTHER_CARD_ID, -1), (USER_CARD_ID, 1), (OTHER_CARD_ID, 1)]
+
+
+@pytest.mark.asyncio
+class TestBinderWrites:
+    """Tests de la tenue du compteur par BinderService"""
+
+    async def test_add_reserves_a_copy_and_bumps_cards_version(self):
+        db = make_db()
+        await BinderService(db).apply_operations(str(BINDER_ID), str(USER_ID), [
+            BinderOperation(op="add", user_card_id=str(USER_CARD_ID), page_number=1, position=4)
+        ])
+        assert increments(db) == [(USER_CARD_ID, 1)]
+        bumped = db.users.update_one.await_args.args[1]["$inc"]
+        assert set(bumped) == {BINDERS_VERSION, CARDS_VERSION}
+
+    async def test_placement_beyond_quantity_is_rejected(self):
+        db = make_db(matched=0)
+        with pytest.raises(ValueError, match="déjà placés"):
+            await BinderService(db).apply_operations(str(BINDER_ID), str(USER_ID), [
+                BinderOperation(op="add", user_card_id=str(USER_CARD_ID), page_number=1, position=4)
+            ])
+        db.binders.update_one.assert_not_called()
+        db.binder_pages.bulk_write.assert_not_called()
+
+    async def test_version_conflict_releases_reserved_copies(self):
+        db = make_db()
+        db.binders.update_one = AsyncMock(return_value=SimpleNamespace(matched_count=0))
+        with pytest.raises(Exception):
+            await BinderService(db).apply_operations(str(BINDER_ID), str(USER_ID), [
+                BinderOperation(op="add", user_card_id=str(USER_CARD_ID), page_number=1, position=4)
+            ])
+        assert increments(db) == [(USER_CARD_ID, 1), (USER_CARD_ID, -1)]
+
+    async def test_move_inside_binder_leaves_counters_untouched(self):
+        db = make_db()
+        await BinderService(db).apply_operations(str(BINDER_ID), str(USER_ID), [
+            BinderOperation(op="move", source_page=1, source_position=0, destination_page=1, destination_position=8)
+        ])
+        db.user_cards.update_one.assert_not_called()
+
+    async def test_delete_binder_releases_its_copies(self):
+        db = make_db(locations=[{"user_card_id": OTHER_CARD_ID}, {"user_card_id": OTHER_CARD_ID}])
+        assert await BinderService(db).delete_binder(str(BINDER_ID), str(USER_ID))
+        assert increments(db) == [(OTHER_CARD_ID, -2)]
+        assert db.card_locations.find.call_args.args[0] == {"binder_id": BINDER_ID}
+
+
+class TestUserCardResponse:
+    """Tests de l'exposition placed / available"""
+
+    @pytest.mark.asyncio
+    async def test_available_copies_are_computed(self):
+        db = MagicMock()
+        db.user_cards.find = MagicMock(return_value=FakeCursor([CARD_DOCUMENT]))
+        cards = await UserCardService(db).get_user_cards(str(USER_ID))
+        assert (cards[0].placed, cards[0].available) == (2, 1)
+
+    @pytest.mark.asyncio
+    async def test_quantity_cannot_drop_below_placed_copies(self):
+        db = MagicMock()
+        db.user_cards.find_one_and_update = AsyncMock(return_value=None)
+        db.user_cards.find_one = AsyncMock(return_value=CARD_DOCUMENT)
+        with pytest.raises(ValueError, match="2 exemplaire"):
+            await UserCardService(db).update_user_card(str(USER_CARD_ID), UserCardUpdate(quantity=1))
+        # La condition est dans l'écriture elle-même
+        query = db.user_cards.find_one_and_update.await_args.args[0]
+        assert query["$expr"] == {"$lte": [{"$ifNull": ["$placed", 0]}, 1]}
+
+    def test_quantity_below_placed_returns_400(self):
+        db = MagicMock()
+        db.user_cards.find_one_and_update = AsyncMock(return_value=None)
+        db.user_cards.find_one = AsyncMock(return_value=CARD_DOCUMENT)
+        user = UserInDB(_id=USER_ID, email="placed@example.com", username="placeduser", hashed_password="x")
+        app.dependency_overrides[get_current_active_user] = lambda: user
+        app.dependency_overrides[get_user_card_service] = lambda: UserCardService(db)
+        try:
+            response = TestClient(app).patch(f"/user/cards/{USER_CARD_ID}", json={"quantity": 1})
+        finally:
+            app.dependency_overrides.clear()
+        assert response.status_code == 400 and "retirez-les" in response.json()["detail"]
+
+    @pytest.mark.asyncio
+    async def test_migration_corrects_each_card_from_locations(self):
+        unplaced, correct = ObjectId(), ObjectId()
+        db = MagicMock()
+        db.user_cards.aggregate = MagicMock(return_value=FakeCursor([
+            {"_id": USER_CARD_ID, "count": 2},
+            {"_id": unplaced, "placed": 1, "count": 0},
+            {"_id": correct, "placed": 3, "count": 3},
+        ]))
+        db.user_cards.bulk_write = AsyncMock()
+        assert await migrate(db) == 2
+        # Une mise à jour par carte à corriger, conditionnée à la valeur lue ; pas de remise à zéro globale
+        assert db.user_cards.bulk_write.await_args.args[0] == [
+            UpdateOne({"_id": USER_CARD_ID, "placed": None}, {"$set": {"placed": 2}}),
+            UpdateOne({"_id": unplaced, "placed": 1}, {"$set": {"placed": 0}}),
+        ]
@@ -0,0 +1,199 @@
+"""
+Tests du profilage des commandes MongoDB par requête
+"""
+
+import asyncio
+import contextvars
+import functools
+import sys
+import os
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from main import app
+from dependencies import get_current_user, get_database
+from middleware.query_profiler import QueryProfilerMiddleware
+from models.user import UserInDB
+from utils.query_profiler import (
+    QueryProfilerListener, current_profile, profile_queries, assert_max_queries, returned_docs
+)
+
+# Base MongoDB jetable pour les budgets de requêtes (ex: mongodb://localhost:27017)
+MONGODB_URL = os.getenv("TEST_MONGODB_URL")
+
+
+def _started(request_id, command_name, collection):
+    return SimpleNamespace(request_id=request_id, command_name=command_name, command={command_name: collection})
+
+
+def _succeeded(request_id, command_name, reply, duration_micros=1000):
+    return SimpleNamespace(request_id=request_id, command_name=command_name, reply=reply, duration_micros=duration_micros)
+
+
+class TestQueryProfilerListener:
+    """Tests du listener alimentant le profil de la requête"""
+
+    def test_records_commands_in_current_profile(self):
+        """Chaque commande est enregistrée avec sa collection, sa durée et ses documents"""
+        listener = QueryProfilerListener()
+        with profile_queries() as profile:
+            listener.started(_started(1, "find", "binders"))
+            listener.succeeded(_succeeded(1, "find", {"cursor": {"firstBatch": [{}, {}]}}, 1500))
+            listener.started(_started(2, "find", "user_cards"))
+            listener.succeeded(_succeeded(2, "find", {"cursor": {"firstBatch": [{}]}}))
+
+        assert profile.count == 2
+        assert profile.docs == 3
+        assert profile.total_ms == pytest.approx(2.5)
+        assert profile.summary() == "find binders x1, find user_cards x1"
+
+    def test_ignores_commands_outside_request(self):
+        """Sans profil actif, le listener n'enregistre rien"""
+        listener = QueryProfilerListener()
+        listener.started(_started(3, "find", "binders"))
+        listener.succeeded(_succeeded(3, "find", {"cursor": {"firstBatch": []}}))
+
+    def test_ignores_driver_commands(self):
+        """Les commandes internes du driver (ping, hello) ne sont pas comptées"""
+        listener = QueryProfilerListener()
+        with profile_queries() as profile:
+            listener.started(SimpleNamespace(request_id=4, command_name="ping", command={"ping": 1}))
+            listener.succeeded(_succeeded(4, "ping", {"ok": 1}))
+        assert profile.count == 0
+
+    def test_profile_visible_from_executor_thread(self):
+        """Le profil suit la requête dans le thread du driver (contexte copié comme Motor)"""
+        listener = QueryProfilerListener()
+
+        def driver_call():
+            listener.started(_started(5, "update", "binders"))
+            listener.succeeded(_succeeded(5, "update", {"n": 1}))
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            context = contextvars.copy_context()
+            await loop.run_in_executor(None, functools.partial(context.run, driver_call))
+
+        with profile_queries() as profile:
+            asyncio.run(run())
+
+        assert profile.count == 1
+        assert profile.docs == 1
+
+    def test_closed_profile_stops_recording(self):
+        """Après close, les commandes ne sont plus enregistrées, y compris celles déjà commencées"""
+        listener = QueryProfilerListener()
+        with profile_queries() as profile:
+            listener.started(_started(6, "find", "binders"))
+            profile.close()
+            listener.succeeded(_succeeded(6, "find", {"cursor": {"firstBatch": [{}]}}))
+            listener.started(_started(7, "find", "binders"))
+            listener.succeeded(_succeeded(7, "find", {"cursor": {"firstBatch": [{}]}}))
+        assert profile.count == 0 and profile._pending == {}
+
+    def test_returned_docs(self):
+        """Extraction du nombre de documents depuis la réponse du serveur"""
+        assert returned_docs({"cursor": {"nextBatch": [1, 2, 3]}}) == 3
+        assert returned_docs({"n": 4, "ok": 1}) == 4
+        assert returned_docs({"ok": 1}) == 0
+
+
+class TestServerTimingHeader:
+    """Tests de l'en-tête Server-Timing et de l'assertion de nombre de requêtes"""
+
+    def setup_method(self):
+        self.client = TestClient(app)
+
+    def test_server_timing_header_present(self):
+        """Chaque réponse indique le temps passé en base et le nombre de requêtes"""
+        response = self.client.get("/")
+        assert "db;dur=" in response.headers["server-timing"]
+        assert assert_max_queries(response, 0) == 0
+
+    def test_assert_max_queries_fails_when_exceeded(self):
+        """L'assertion échoue si l'endpoint dépasse le budget de requêtes"""
+        response = SimpleNamespace(headers={"server-timing": 'db;dur=3.10;desc="12 queries", app;dur=9.00'})
+        with pytest.raises(AssertionError):
+            assert_max_queries(response, 2)
+
+    def test_streamed_body_is_not_profiled(self):
+        """Le corps d'une réponse en flux (SSE) est émis après l'en-tête : il n'est pas profilé"""
+        listener = QueryProfilerListener()
+        profiles = []
+
+        async def events():
+            profiles.append(current_profile.get())
+            listener.started(_started(8, "find", "binders"))
+            listener.succeeded(_succeeded(8, "find", {"cursor": {"firstBatch": []}}))
+            yield "data: {}\n\n"
+
+        async def stream(request):
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        client = TestClient(QueryProfilerMiddleware(Starlette(routes=[Route("/stream", stream)])))
+        response = client.get("/stream")
+
+        assert response.text == "data: {}\n\n"
+        assert profiles[0].closed and profiles[0].count == 0
+
+
+@pytest.mark.skipif(not MONGODB_URL, reason="TEST_MONGODB_URL non défini (MongoDB requis)")
+class TestQueryBudgets:
+    """Nombre de commandes MongoDB des endpoints chauds, mesuré par le driver sur une vraie base"""
+
+    def setup_method(self):
+        from pymongo import MongoClient
+
+        self.user_id = ObjectId()
+        self.binder_id = ObjectId()
+        self.database_name = f"pokemon_binder_budget_{self.binder_id}"
+        user_card_id = ObjectId()
+        now = datetime.utcnow()
+        with MongoClient(MONGODB_URL) as client:
+            database = client[self.database_name]
+            database.binders.insert_one({
+                "_id": self.binder_id, "user_id": self.user_id, "name": "Budget", "size": "3x3",
+                "version": 1, "page_count": 2, "card_count": 1, "changes": [],
+                "created_at": now, "updated_at": now
+            })
+            database.binder_pages.insert_one({
+                "binder_id": self.binder_id, "user_id": self.user_id, "page_number": 1,
+                "cards": [{"position": 0, "card_id": "sv1-1", "user_card_id": str(user_card_id)}]
+            })
+            database.user_cards.insert_one({"_id": user_card_id, "user_id": self.user_id, "card_id": "sv1-1", "card_name": "Bulbizarre"})
+
+        user = UserInDB(_id=self.user_id, email="budget@example.com", username="budgetuser", hashed_password="x")
+
+        async def database():
+            # Client créé dans la boucle de la requête, avec le listener du profilage
+            from motor.motor_asyncio import AsyncIOMotorClient
+            return AsyncIOMotorClient(MONGODB_URL, event_listeners=[QueryProfilerListener()])[self.database_name]
+
+        app.dependency_overrides[get_current_user] = lambda: user
+        app.dependency_overrides[get_database] = database
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        from pymongo import MongoClient
+
+        app.dependency_overrides.clear()
+        with MongoClient(MONGODB_URL) as client:
+            client.drop_database(self.database_name)
+
+    def test_get_binder_budget(self):
+        """Version, binder, pages et métadonnées des cartes ; une relecture inchangée ne lit que la version"""
+        first = self.client.get(f"/user/binders/{self.binder_id}")
+        second = self.client.get(f"/user/binders/{self.binder_id}")
+
+        assert first.status_code == second.status_code == 200
+        assert first.json()["pages"][0]["slots"][0]["card_name"] == "Bulbizarre"
+        assert_max_queries(first, 4)
+        assert_max_queries(second, 1)
@@ -0,0 +1,173 @@
+"""
+Tests du cache partagé (LRU en mémoire, niveau Redis, invalidation entre workers)
+"""
+
+import sys
+import os
+import json
+import pytest
+from fnmatch import fnmatch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from dependencies import get_cache
+from utils.cache import MemoryCache, RedisCache, SharedCache, cache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class LocalRedis:
+    """Serveur Redis local en mémoire : sous-ensemble des commandes utilisées par RedisCache"""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+        self.ttls = {}
+        self.published = []
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+            self.sets.pop(key, None)
+
+    async def sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member.encode())
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    async def expire(self, key, ttl, nx=False, gt=False):
+        current = self.ttls.get(key)
+        if (nx and current is not None) or (gt and current is not None and ttl <= current):
+            return
+        self.ttls[key] = ttl
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+    def keys(self, pattern):
+        return [key for key in self.values if fnmatch(key, pattern)]
+
+
+class TestMemoryCache:
+    """Tests du niveau en mémoire"""
+
+    def test_ttl_expiry(self):
+        clock = Clock()
+        memory = MemoryCache(clock=clock)
+        memory.set("a", 1, ttl=10)
+        clock.now = 9.9
+        assert memory.get("a") == 1
+        clock.now = 10
+        assert memory.get("a") is None and len(memory) == 0
+
+    def test_lru_eviction_keeps_recently_read(self):
+        memory = MemoryCache(max_entries=2)
+        memory.set("a", 1)
+        memory.set("b", 2)
+        memory.get("a")
+        memory.set("c", 3)
+        assert memory.get("b") is None and memory.get("a") == 1
+
+    def test_byte_bound(self):
+        memory = MemoryCache(max_bytes=10)
+        memory.set("a", b"123456")
+        memory.set("b", b"7890ab")
+        assert memory.get("a") is None and memory.size_bytes == 6
+        # Une valeur plus grande que le cache n'évince rien
+        memory.set("c", b"x" * 11)
+        assert memory.get("b") == b"7890ab" and memory.get("c") is None
+
+    def test_tag_invalidation(self):
+        memory = MemoryCache()
+        memory.set("binder:1", 1, tags=["user:a"])
+        memory.set("binder:2", 2, tags=["user:a", "set:sv1"])
+        memory.set("binder:3", 3, tags=["user:b"])
+        assert memory.invalidate_tags("user:a") == 2
+        assert memory.get("binder:3") == 3 and memory._tags == {"user:b": {"binder:3"}}
+
+
+@pytest.mark.asyncio
+class TestSharedCache:
+    """Tests des deux niveaux et des messages d'invalidation"""
+
+    async def test_remote_hit_fills_local_tier(self):
+        redis = LocalRedis()
+        writer = SharedCache(remote=RedisCache(redis))
+        reader = SharedCache(remote=RedisCache(redis))
+        await writer.set("stats:a", {"cards": 3}, ttl=60, tags=["user:a"])
+
+        assert redis.ttls[writer.remote._key("stats:a")] == 60
+        assert await reader.get("stats:a") == {"cards": 3}
+        assert reader.local.get("stats:a") == {"cards": 3}
+
+    async def test_bytes_round_trip(self):
+        redis = LocalRedis()
+        await SharedCache(remote=RedisCache(redis)).set("raw", b'{"a":1}')
+        assert await SharedCache(remote=RedisCache(redis)).get("raw") == b'{"a":1}'
+
+    async def test_tag_invalidation_reaches_other_workers(self):
+        redis = LocalRedis()
+        first = SharedCache(remote=RedisCache(redis))
+        second = SharedCache(remote=RedisCache(redis))
+        await first.set("binder:1", {"v": 1}, tags=["user:a"])
+        await second.get("binder:1")
+
+        await first.invalidate_tags("user:a")
+
+        assert redis.keys("*binder:1") == []
+        channel, message = redis.published[-1]
+        assert channel == first.channel and json.loads(message)["tags"] == ["user:a"]
+        # Le worker émetteur ignore son propre message, l'autre vide son niveau en mémoire
+        assert not first.handle_message(message)
+        assert second.handle_message(message)
+        assert second.local.get("binder:1") is None
+
+    async def test_overwrite_reaches_other_workers(self):
+        redis = LocalRedis()
+        first = SharedCache(remote=RedisCache(redis))
+        second = SharedCache(remote=RedisCache(redis))
+        await first.set("stats:a", {"cards": 3})
+        await second.get("stats:a")
+
+        await first.set("stats:a", {"cards": 4})
+
+        channel, message = redis.published[-1]
+        assert channel == first.channel and json.loads(message)["keys"] == ["stats:a"]
+        assert second.handle_message(message)
+        assert await second.get("stats:a") == {"cards": 4}
+
+    async def test_get_or_set_computes_once(self):
+        shared = SharedCache()
+        calls = []
+
+        async def factory():
+            calls.append(1)
+            return [1, 2]
+
+        assert await shared.get_or_set("k", factory) == [1, 2]
+        assert await shared.get_or_set("k", factory) == [1, 2]
+        assert len(calls) == 1
+
+    async def test_redis_failure_degrades_to_miss(self):
+        class BrokenRedis(LocalRedis):
+            async def get(self, key):
+                raise ConnectionError("down")
+
+        assert await SharedCache(remote=RedisCache(BrokenRedis())).get("k") is None
+
+    async def test_dependency_returns_process_cache(self):
+        assert await get_cache() is cache
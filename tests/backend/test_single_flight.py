@@ -0,0 +1,139 @@
+"""
+Tests du regroupement des lectures concurrentes identiques (single-flight)
+"""
+
+import sys
+import os
+import asyncio
+import pytest
+import httpx
+from datetime import datetime
+from bson import ObjectId
+from prometheus_client import REGISTRY
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from main import app
+from dependencies import get_current_user, get_current_active_user, get_database
+from models.binder import BinderResponse
+from models.user import UserInDB
+from routers import binders as binders_router
+from utils.single_flight import SingleFlight
+
+USER_ID = ObjectId()
+BINDER_ID = str(ObjectId())
+
+
+def coalesced(name):
+    return REGISTRY.get_sample_value("single_flight_requests_total", {"name": name, "role": "coalesced"}) or 0
+
+
+@pytest.mark.asyncio
+class TestSingleFlight:
+    """Tests de SingleFlight.do"""
+
+    async def test_concurrent_identical_calls_share_one_computation(self):
+        flight = SingleFlight("test_share")
+        release = asyncio.Event()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await release.wait()
+            return {"cards": 3}
+
+        waiters = [asyncio.ensure_future(flight.do(("u", 1), compute)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert len(calls) == 1 and all(result is results[0] for result in results)
+        assert coalesced("test_share") == 4
+        assert len(flight) == 0
+
+    async def test_different_versions_are_not_shared(self):
+        flight = SingleFlight("test_versions")
+        calls = []
+
+        async def compute(version):
+            calls.append(version)
+            await asyncio.sleep(0)
+            return version
+
+        assert await asyncio.gather(flight.do(("u", 1), lambda: compute(1)), flight.do(("u", 2), lambda: compute(2))) == [1, 2]
+        assert calls == [1, 2]
+
+    async def test_cancelled_leader_does_not_cancel_followers(self):
+        flight = SingleFlight("test_cancel")
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return "ok"
+
+        leader = asyncio.ensure_future(flight.do("k", compute))
+        follower = asyncio.ensure_future(flight.do("k", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        release.set()
+        assert await follower == "ok"
+
+    async def test_error_is_shared_then_forgotten(self):
+        flight = SingleFlight("test_error")
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0)
+            raise RuntimeError("mongo indisponible")
+
+        results = await asyncio.gather(flight.do("k", compute), flight.do("k", compute), return_exceptions=True)
+        assert [str(result) for result in results] == ["mongo indisponible"] * 2
+        with pytest.raises(RuntimeError):
+            await flight.do("k", compute)
+        assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+class TestBinderRoute:
+    """GET /user/binders/{id} concurrents : une seule lecture du binder"""
+
+    async def test_overlapping_requests_are_coalesced(self, monkeypatch):
+        reads = []
+        release = asyncio.Event()
+
+        class SlowBinderService:
+            def __init__(self, db):
+                pass
+
+            async def get_binder_version(self, binder_id, user_id):
+                return 2
+
+            async def get_binder_by_id(self, binder_id, user_id, page_range=None):
+                reads.append(page_range)
+                await release.wait()
+                return BinderResponse(
+                    id=binder_id, user_id=user_id, name="B", size="3x3", pages=[], total_pages=1,
+                    total_cards=0, version=2, created_at=datetime.utcnow(), updated_at=datetime.utcnow()
+                )
+
+        monkeypatch.setattr(binders_router, "BinderService", SlowBinderService)
+        user = UserInDB(_id=USER_ID, email="flight@example.com", username="flightuser", hashed_password="x", binders_version=7)
+        app.dependency_overrides[get_current_user] = lambda: user
+        app.dependency_overrides[get_current_active_user] = lambda: user
+        app.dependency_overrides[get_database] = lambda: None
+        try:
+            async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+                requests = [asyncio.ensure_future(client.get(f"/user/binders/{BINDER_ID}")) for _ in range(3)]
+                requests.append(asyncio.ensure_future(client.get(f"/user/binders/{BINDER_ID}?pages=1")))
+                while len(reads) < 2 or len(binders_router.binder_reads) < 2:
+                    await asyncio.sleep(0.01)
+                await asyncio.sleep(0.05)
+                release.set()
+                responses = await asyncio.gather(*requests)
+        finally:
+            app.dependency_overrides.clear()
+
+        assert [response.status_code for response in responses] == [200] * 4
+        # Trois requêtes identiques partagent une lecture, la fenêtre de pages en a une à part
+        assert len(reads) == 2 and set(reads) == {None, (1, 1)}
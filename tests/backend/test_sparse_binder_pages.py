@@ -0,0 +1,138 @@
+"""
+Tests du stockage creux des pages de binder et de la migration associée
+"""
+
+import sys
+import os
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from pymongo import UpdateOne
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from tests.backend.helpers import FakeCursor, bulk_operations, page_write
+from models.binder import BinderInDB, AddCardToBinder, page_cards, compact_page, expand_slots
+from services.binder_service import BinderService
+from migrations.m001_sparse_binder_pages import convert_pages, migrate
+
+USER_ID = ObjectId()
+BINDER_ID = ObjectId()
+
+
+def legacy_page(page_number=1, occupied=None):
+    occupied = occupied or {}
+    return {
+        "page_number": page_number,
+        "slots": [
+            {"position": i, "card_id": occupied.get(i), "user_card_id": "uc" if i in occupied else None,
+             "card_name": None, "card_image": None, "set_name": None, "rarity": None}
+            for i in range(9)
+        ]
+    }
+
+
+class TestSparseFormat:
+    """Tests des conversions entre format creux et grille complète"""
+
+    def test_new_pages_store_no_slots(self):
+        binder = BinderInDB(name="Vide", size="5x5", user_id=ObjectId())
+        binder.initialize_pages(50)
+        stored = binder.dict(by_alias=True)["pages"]
+        assert stored[0] == {"page_number": 1, "cards": []}
+        assert len(binder.expanded_pages()[49].slots) == 25
+
+    def test_legacy_and_sparse_read_identically(self):
+        legacy = legacy_page(occupied={2: "sv1-1", 7: "sv1-2"})
+        sparse = compact_page(1, page_cards(legacy))
+        assert sparse["cards"] == [
+            {"position": 2, "card_id": "sv1-1", "user_card_id": "uc"},
+            {"position": 7, "card_id": "sv1-2", "user_card_id": "uc"},
+        ]
+        assert page_cards(sparse) == page_cards(legacy)
+
+    def test_expand_slots_builds_full_grid(self):
+        slots = expand_slots({4: {"card_id": "a", "user_card_id": "b"}}, 9)
+        assert [slot["position"] for slot in slots] == list(range(9))
+        assert slots[4]["card_id"] == "a" and slots[0]["card_id"] is None
+
+
+@pytest.mark.asyncio
+class TestSparseService:
+    """Tests du BinderService sur le format creux"""
+
+    async def test_add_card_writes_only_occupied_positions(self):
+        user_card_id = ObjectId()
+        db = MagicMock()
+        db.user_cards.find_one = AsyncMock(return_value={"_id": user_card_id, "card_id": "sv1-25"})
+        db.binders.find_one = AsyncMock(return_value={
+            "_id": BINDER_ID, "user_id": USER_ID, "name": "B", "size": "3x3", "version": 2,
+            "pages": [legacy_page(occupied={0: "sv1-1"})],
+            "created_at": datetime.utcnow(), "updated_at": datetime.utcnow(),
+        })
+        db.binders.update_one = AsyncMock(return_value=SimpleNamespace(matched_count=1))
+        db.binder_pages.bulk_write = AsyncMock()
+        db.card_locations.bulk_write = AsyncMock()
+        db.user_cards.update_one = AsyncMock(return_value=SimpleNamespace(matched_count=1))
+        db.binder_pages.find = MagicMock(return_value=FakeCursor([]))
+        db.users.update_one = AsyncMock()
+
+        await BinderService(db).add_card_to_binder(str(BINDER_ID), str(USER_ID), AddCardToBinder(user_card_id=str(user_card_id)))
+
+        assert bulk_operations(db.binder_pages) == [page_write(BINDER_ID, USER_ID, 1, [
+            {"position": 0, "card_id": "sv1-1", "user_card_id": "uc"},
+            {"position": 1, "card_id": "sv1-25", "user_card_id": str(user_card_id)},
+        ])]
+
+    async def test_response_expands_sparse_pages(self):
+        user_card_id = ObjectId()
+        db = MagicMock()
+        db.user_cards.find = MagicMock(return_value=FakeCursor([{"_id": user_card_id, "card_name": "Pikachu"}]))
+        db.binders.find_one = AsyncMock(return_value={
+            "_id": BINDER_ID, "user_id": USER_ID, "name": "B", "size": "4x4", "version": 1,
+            "pages": [{"page_number": 1, "cards": [{"position": 5, "card_id": "sv1-1", "user_card_id": str(user_card_id)}]}],
+            "created_at": datetime.utcnow(), "updated_at": datetime.utcnow(),
+        })
+
+        binder = await BinderService(db).get_binder_by_id(str(BINDER_ID), str(USER_ID))
+
+        assert binder.total_cards == 1
+        assert len(binder.pages[0].slots) == 16
+        assert binder.pages[0].slots[5].card_name == "Pikachu"
+        assert db.user_cards.find.call_count == 1
+
+
+@pytest.mark.asyncio
+class TestSparseMigration:
+    """Tests de la migration vers le format creux"""
+
+    def test_convert_pages_keeps_numbering(self):
+        pages = convert_pages([legacy_page(1, {3: "x"}), {"slots": []}])
+        assert pages == [
+            {"page_number": 1, "cards": [{"position": 3, "card_id": "x", "user_card_id": "uc"}]},
+            {"page_number": 2, "cards": []},
+        ]
+
+    async def test_migrate_bulk_updates_guarded_by_version(self):
+        first, second = ObjectId(), ObjectId()
+        db = MagicMock()
+        db.binders.find = MagicMock(return_value=FakeCursor([
+            {"_id": first, "version": 4, "pages": [legacy_page()]},
+            {"_id": second, "pages": [legacy_page()]},
+        ]))
+        db.binders.bulk_write = AsyncMock(return_value=SimpleNamespace(modified_count=2))
+
+        assert await migrate(db, batch_size=10) == 2
+        assert bulk_operations(db.binders) == [
+            UpdateOne({"_id": first, "version": 4}, {"$set": {"pages": [{"page_number": 1, "cards": []}]}}),
+            UpdateOne({"_id": second, "version": None}, {"$set": {"pages": [{"page_number": 1, "cards": []}]}}),
+        ]
+
+    async def test_dry_run_writes_nothing(self):
+        db = MagicMock()
+        db.binders.find = MagicMock(return_value=FakeCursor([{"_id": ObjectId(), "pages": [legacy_page()]}]))
+        db.binders.bulk_write = AsyncMock()
+        assert await migrate(db, dry_run=True) == 1
+        db.binders.bulk_write.assert_not_called()
@@ -0,0 +1 @@
+# Benchmarks exécutables en script (non collectés par pytest)
@@ -0,0 +1,86 @@
+"""
+Benchmark de la grille BinderGrid contre le parcours de dicts de l'ancien service
+
+Usage : python tests/benchmarks/bench_binder_grid.py
+Binder 5x5 de 50 pages rempli à 95 % : premier slot libre, validation d'un déplacement, comptage.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from models.binder_grid import BinderGrid
+
+ITERATIONS = 2000
+PAGES = 50
+SLOTS_PER_PAGE = 25
+
+
+def binder_pages(fill_ratio=0.95) -> dict:
+    """{page_number: {position: carte}} avec les trous en fin de binder"""
+    filled = int(PAGES * SLOTS_PER_PAGE * fill_ratio)
+    pages = {}
+    for page_number in range(1, PAGES + 1):
+        cards = {}
+        for position in range(SLOTS_PER_PAGE):
+            index = (page_number - 1) * SLOTS_PER_PAGE + position
+            if index < filled:
+                cards[position] = {"card_id": f"neo4-{index}", "user_card_id": f"65f0c0ffee{index:014d}"}
+        pages[page_number] = cards
+    return pages
+
+
+def dict_first_free(pages: dict):
+    for page_number in sorted(pages):
+        for position in range(SLOTS_PER_PAGE):
+            if position not in pages[page_number]:
+                return page_number, position
+    return None
+
+
+def dict_can_move(pages: dict, source: tuple, destination: tuple) -> bool:
+    return source[1] in pages.get(source[0], {}) and destination[1] not in pages.get(destination[0], {})
+
+
+def dict_count(pages: dict) -> int:
+    return sum(len(cards) for cards in pages.values())
+
+
+def bench(function, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        function(*args)
+    return (time.perf_counter() - start) * 1_000_000 / ITERATIONS
+
+
+def main():
+    pages = binder_pages()
+    grid = BinderGrid.from_pages(SLOTS_PER_PAGE, PAGES, pages)
+
+    def grid_first_free():
+        # Sans le pointeur mémorisé : coût d'une recherche complète
+        grid._first_free = 0
+        return grid.first_free()
+
+    def grid_can_move(source, destination):
+        return not grid.is_free(*source) and grid.is_free(*destination)
+
+    assert dict_first_free(pages) == grid_first_free()
+    assert dict_count(pages) == grid.count
+
+    cases = [
+        ("premier slot libre", bench(dict_first_free, pages), bench(grid_first_free)),
+        ("validation déplacement", bench(dict_can_move, pages, (3, 4), (50, 24)), bench(grid_can_move, (3, 4), (50, 24))),
+        ("comptage", bench(dict_count, pages), bench(lambda: grid.count)),
+    ]
+    build_us = bench(BinderGrid.from_pages, SLOTS_PER_PAGE, PAGES, pages)
+
+    print(f"{'opération':24} {'dicts µs':>10} {'grille µs':>10} {'gain':>7}")
+    for name, dict_us, grid_us in cases:
+        print(f"{name:24} {dict_us:>10.2f} {grid_us:>10.2f} {dict_us / grid_us:>7.1f}")
+    print(f"construction de la grille : {build_us:.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
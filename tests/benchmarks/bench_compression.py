@@ -0,0 +1,103 @@
+"""
+Benchmark de compression des réponses : octets sur le réseau et coût CPU par route
+
+Usage : python tests/benchmarks/bench_compression.py
+Les charges simulent GET /user/binders/{id} (gros binder peu rempli) et GET /user/cards.
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
+
+from middleware import compression
+from middleware.compression import available_encodings, compress_bytes
+
+ITERATIONS = 20
+SETS = ["Neo Destiny", "Base Set", "Jungle", "Fossil", "Team Rocket", "Gym Heroes"]
+RARITIES = ["Common", "Uncommon", "Rare", "Holo Rare"]
+
+
+def binder_payload(pages=50, slots_per_page=25, fill_ratio=0.15) -> bytes:
+    """Réponse BinderResponse d'un binder 5x5 de 50 pages rempli à 15 %"""
+    filled_every = int(1 / fill_ratio)
+    binder_pages = []
+    for page_number in range(1, pages + 1):
+        slots = []
+        for position in range(slots_per_page):
+            index = (page_number - 1) * slots_per_page + position
+            if index % filled_every == 0:
+                set_name = SETS[index % len(SETS)]
+                slots.append({
+                    "position": position,
+                    "card_id": f"neo4-{index}",
+                    "user_card_id": f"65f0c0ffee{index:014d}",
+                    "card_name": f"Carte {index}",
+                    "card_image": f"https://assets.tcgdex.net/fr/neo/neo4/{index}",
+                    "set_name": set_name,
+                    "rarity": RARITIES[index % len(RARITIES)],
+                })
+            else:
+                slots.append({
+                    "position": position, "card_id": None, "user_card_id": None,
+                    "card_name": None, "card_image": None, "set_name": None, "rarity": None,
+                })
+        binder_pages.append({"page_number": page_number, "slots": slots})
+    return json.dumps({
+        "id": "65f0c0ffee0000000000beef", "user_id": "65f0c0ffee0000000000cafe",
+        "name": "Collection Neo", "size": "5x5", "description": None, "is_public": False,
+        "pages": binder_pages, "total_pages": pages, "total_cards": pages * slots_per_page // filled_every,
+        "created_at": datetime.utcnow().isoformat(), "updated_at": datetime.utcnow().isoformat(),
+    }).encode()
+
+
+def cards_payload(count=1500) -> bytes:
+    """Réponse GET /user/cards pour une grosse collection"""
+    cards = []
+    for index in range(count):
+        set_name = SETS[index % len(SETS)]
+        cards.append({
+            "card_id": f"neo4-{index}", "card_name": f"Carte {index}",
+            "card_image": f"https://assets.tcgdex.net/fr/neo/neo4/{index}",
+            "set_id": "neo4", "set_name": set_name, "quantity": 1 + index % 3,
+            "condition": "Near Mint", "version": None, "rarity": RARITIES[index % len(RARITIES)],
+            "local_id": str(index), "id": f"65f0c0ffee{index:014d}", "user_id": "65f0c0ffee0000000000cafe",
+            "created_at": datetime.utcnow().isoformat(), "updated_at": datetime.utcnow().isoformat(),
+        })
+    return json.dumps(cards).encode()
+
+
+def bench(payload: bytes, encoding: str) -> tuple:
+    start = time.process_time()
+    for _ in range(ITERATIONS):
+        compressed = compress_bytes(payload, encoding)
+    cpu_ms = (time.process_time() - start) * 1000 / ITERATIONS
+    return len(compressed), cpu_ms
+
+
+def main():
+    routes = {
+        "GET /user/binders/{binder_id}": binder_payload(),
+        "GET /user/cards": cards_payload(),
+    }
+    levels = {
+        "gzip": ("GZIP_LEVEL", [1, 6, 9]),
+        "br": ("BROTLI_QUALITY", [1, 4, 6]),
+        "zstd": ("ZSTD_LEVEL", [1, 3, 6]),
+    }
+
+    print(f"{'route':32} {'encodage':>9} {'niveau':>6} {'octets':>10} {'ratio':>7} {'CPU ms':>8}")
+    for route, payload in routes.items():
+        print(f"{route:32} {'identity':>9} {'-':>6} {len(payload):>10} {1.0:>7.2f} {0.0:>8.2f}")
+        for encoding in available_encodings():
+            setting, values = levels[encoding]
+            for level in values:
+                setattr(compression, setting, level)
+                size, cpu_ms = bench(payload, encoding)
+                print(f"{route:32} {encoding:>9} {level:>6} {size:>10} {size / len(payload):>7.3f} {cpu_ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()